@@ -1,5 +1,64 @@
+import os
+
 from dash import Dash
 
+import metrics
+import warmup
+from cache import memoize
+
+
+# The heavy figure callbacks (parcats, career plot, lap-time chart) can run
+# as Dash background callbacks in worker processes, so a slow figure does
+# not block the request thread. The renderer sends the previous job id with
+# every new request of the same callback and Dash terminates that job, so
+# stale results from e.g. a slider drag are never shown.
+BACKGROUND_CALLBACKS = (os.environ.get("DASHBOARD_BACKGROUND_CALLBACKS", "")
+                        .lower() in ("1", "true", "yes", "on"))
+BACKGROUND_CACHE_DIR = os.environ.get("DASHBOARD_BACKGROUND_CACHE_DIR",
+                                      "./.cache/background")
+# Renderer polling interval for background jobs, in milliseconds
+BACKGROUND_POLL_INTERVAL = int(
+    os.environ.get("DASHBOARD_BACKGROUND_POLL_INTERVAL", "100"))
+
+background_callback_manager = None
+if BACKGROUND_CALLBACKS:
+    # Optional dependencies: pip install "dash[diskcache]"
+    import diskcache
+    import psutil
+    from dash import DiskcacheManager
+
+    class _DiskcacheManager(DiskcacheManager):
+        def terminate_job(self, job):
+            # A job may exit between Dash's pid check and the kill
+            try:
+                super().terminate_job(job)
+            except psutil.NoSuchProcess:
+                pass
+
+    # A sharded cache keeps concurrent jobs from contending on one SQLite
+    # write lock.
+    background_callback_manager = _DiskcacheManager(
+        diskcache.FanoutCache(BACKGROUND_CACHE_DIR, shards=8))
+
+# Extra app.callback keyword arguments for the heavy figure callbacks
+HEAVY_CALLBACK_OPTIONS = ({"background": True,
+                           "interval": BACKGROUND_POLL_INTERVAL}
+                          if BACKGROUND_CALLBACKS
+                          else {})
+
+
+def memoize_heavy(fn):
+    """``memoize`` for a heavy callback, unless those run in the background.
+
+    Background jobs are forked processes: a result cached in one is lost
+    when the job exits, so the cache would never fill and its hit/miss
+    metrics would only count misses. These callbacks are then left
+    uncached, and the startup warming skips them.
+    """
+    return fn if BACKGROUND_CALLBACKS else memoize(fn)
+
 
-app = Dash(__name__)
+app = Dash(__name__, background_callback_manager=background_callback_manager)
 server = app.server
+metrics.init_app(app)
+warmup.init_app(app)
@@ -0,0 +1,60 @@
+// Resolve the career plot's numeric customdata against the lookup table
+// sent once with the layout (see get_career_lookup).
+(function () {
+    var TYPED_ARRAYS = {
+        i1: Int8Array,
+        u1: Uint8Array,
+        i2: Int16Array,
+        u2: Uint16Array,
+        i4: Int32Array,
+        u4: Uint32Array,
+        f4: Float32Array,
+        f8: Float64Array,
+    };
+
+    // Plotly typed array spec {dtype, bdata, shape} -> array of plain rows,
+    // so clickData carries the ids as a normal list.
+    function decodeRows(spec) {
+        if (!spec || !spec.bdata) {
+            return spec;
+        }
+        var binary = atob(spec.bdata);
+        var bytes = new Uint8Array(binary.length);
+        for (var i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        var values = new TYPED_ARRAYS[spec.dtype](bytes.buffer);
+        var columns = spec.shape ? parseInt(spec.shape.split(',')[1], 10) : 1;
+        var rows = [];
+        for (var start = 0; start < values.length; start += columns) {
+            rows.push(Array.from(values.subarray(start, start + columns)));
+        }
+        return rows;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        career: {
+            expand_labels: function (figure, lookup) {
+                if (!figure || !figure.data || !lookup) {
+                    return figure;
+                }
+                var data = figure.data.map(function (trace) {
+                    var rows = decodeRows(trace.customdata);
+                    if (!rows) {
+                        return trace;
+                    }
+                    return Object.assign({}, trace, {
+                        customdata: rows,
+                        hovertext: rows.map(function (row) {
+                            return lookup.drivers[row[0]];
+                        }),
+                        text: rows.map(function (row) {
+                            return lookup.teams[row[3]];
+                        }),
+                    });
+                });
+                return Object.assign({}, figure, {data: data});
+            },
+        },
+    });
+})();
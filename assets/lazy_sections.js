@@ -0,0 +1,41 @@
+// Load a lazy chart section once it comes near the viewport: set its
+// "<name>-loaded" store, which its figure callbacks wait for (see
+// lazy_sections.py). Hidden sections have no box and only intersect once
+// they are shown.
+(function () {
+    var ATTRIBUTE = "data-lazy-section";
+    var WATCHED = "data-lazy-watched";
+
+    function load(element) {
+        window.dash_clientside.set_props(
+            element.getAttribute(ATTRIBUTE) + "-loaded", {data: true});
+    }
+
+    var observer = "IntersectionObserver" in window
+        ? new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    load(entry.target);
+                }
+            });
+        }, {rootMargin: "200px 0px"})
+        : null;
+
+    // Dash renders the layout after the assets run, so pick up the
+    // sections as they are added to the page.
+    function watch() {
+        var selector = "[" + ATTRIBUTE + "]:not([" + WATCHED + "])";
+        document.querySelectorAll(selector).forEach(function (element) {
+            element.setAttribute(WATCHED, "");
+            if (observer) {
+                observer.observe(element);
+            } else {
+                load(element);
+            }
+        });
+    }
+
+    new MutationObserver(watch).observe(document.documentElement,
+                                        {childList: true, subtree: true});
+})();
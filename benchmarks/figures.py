@@ -0,0 +1,105 @@
+"""Benchmark every figure builder against the fixed scenario file.
+
+Run from the repository root:
+
+    python -m benchmarks.figures [--scenarios scenarios/figures.json]
+                                 [--thresholds thresholds.json]
+                                 [--threshold-scale 1.0] [--repeat 5]
+                                 [--output bench_output.txt]
+
+Exits with status 1 when a scenario exceeds its threshold.
+"""
+import argparse
+import sys
+
+from benchmarks.harness import (
+    check_thresholds,
+    json_size,
+    load_json,
+    measure,
+    print_report,
+    summarize,
+)
+
+
+def _update_parcats(selected_circuits=None,
+                    selected_constructors=None,
+                    selected_drivers=None,
+                    season_filter=None,
+                    number_of_records=None,
+                    do_sort=False,
+                    sorting_column="Circuit",
+                    sorting_type="name",
+                    sort_order_clicks=0):
+    from circuit_to_driver import total_values, update_parcats
+
+    fig, _ = update_parcats(selected_circuits,
+                            selected_constructors,
+                            selected_drivers,
+                            season_filter,
+                            number_of_records or total_values,
+                            do_sort,
+                            sorting_column,
+                            sorting_type,
+                            sort_order_clicks)
+    return fig
+
+
+def get_builders():
+    from circuit_map import draw_circuits_map, \
+        draw_fastest_lap_times_line_chart
+    from scatter_plot_drivers import create_career_plot, \
+        create_career_timeline
+
+    return {
+        "create_career_plot": create_career_plot,
+        "create_career_timeline": create_career_timeline,
+        "update_parcats": _update_parcats,
+        "draw_fastest_lap_times_line_chart":
+            draw_fastest_lap_times_line_chart,
+        "draw_circuits_map": draw_circuits_map,
+    }
+
+
+def run(scenarios, repeat=5, warmup=1):
+    builders = get_builders()
+    rows = []
+    for scenario in scenarios:
+        builder = builders[scenario["builder"]]
+        kwargs = scenario.get("kwargs", {})
+        timings, fig = measure(lambda: builder(**kwargs),
+                               repeat=repeat,
+                               warmup=warmup)
+        rows.append(summarize(scenario["name"], timings, json_size(fig)))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="scenarios/figures.json")
+    parser.add_argument("--thresholds", default="thresholds.json")
+    parser.add_argument("--threshold-scale", type=float, default=1.0,
+                        help="multiply every time threshold by this factor")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    rows = run(load_json(args.scenarios), args.repeat, args.warmup)
+    thresholds = load_json(args.thresholds).get("figures", {})
+    failures = check_thresholds(rows, thresholds, args.threshold_scale)
+
+    print_report(rows, "Figure builders")
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_report(rows, "Figure builders", file=file)
+
+    if failures:
+        print(f"\n{len(failures)} scenario(s) over threshold: "
+              + ", ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Row-wise vs vectorised formatting of lap times, hover text and seasons.
+
+Run from the repository root:
+
+    python -m benchmarks.formatting [--repeat 5] [--output bench_output.txt]
+
+The tables are derived from the loaded dataset (DASHBOARD_DATA_DIR):
+
+    lap times    every row of lap_times formatted as m:ss.mmm
+    hover text   every lap with its season's rule change, if any
+    seasons      the race count and season range of every circuit
+
+Each is formatted with the per-row Series.apply/DataFrame.apply code the
+dashboard used before and with the formatting module, and the median
+times are reported. The outputs are checked to be identical.
+"""
+import argparse
+import statistics
+import sys
+
+import pandas as pd
+
+from benchmarks.harness import measure
+
+
+def _lap_time_ms(ms):
+    minutes = ms // 60000
+    seconds = (ms % 60000) / 1000
+    return f"{minutes:.0f}:{seconds:06.3f}"
+
+
+def _hovertext(row):
+    if pd.notna(row["label"]) and pd.notna(row["impact"]):
+        return (f"({row['impact']}) {row['label']}<br />"
+                f"<b>{row['fastest_lap']}</b>")
+    return f"<b>{row['fastest_lap']}</b>"
+
+
+def _seasons(row):
+    if pd.isna(row["min_year"]) or pd.isna(row["max_year"]):
+        return "0"
+    if row["min_year"] == row["max_year"]:
+        return f'{row["race_count"]} ({row["min_year"]})'
+    return f'{row["race_count"]} ({row["min_year"]} - {row["max_year"]})'
+
+
+def tables():
+    from circuit_map import circuits, rule_changes
+    from source import lap_times_df, races_df
+
+    laps = lap_times_df[["raceId", "milliseconds"]].merge(
+        races_df[["raceId", "year"]], on="raceId", how="left")
+    laps = laps.merge(rule_changes[["year", "impact", "label"]],
+                      on="year", how="left")
+    laps["fastest_lap"] = laps["milliseconds"].apply(_lap_time_ms)
+    return laps, circuits[["race_count", "min_year", "max_year"]]
+
+
+def run(repeat=5):
+    import formatting
+
+    laps, circuits = tables()
+    cases = (
+        ("lap times", len(laps),
+         lambda: laps["milliseconds"].apply(_lap_time_ms),
+         lambda: formatting.lap_times_ms(laps["milliseconds"])),
+        ("hover text", len(laps),
+         lambda: laps.apply(_hovertext, axis=1),
+         lambda: formatting.lap_time_hovertext(
+             laps["fastest_lap"], laps["impact"], laps["label"])),
+        ("seasons", len(circuits),
+         lambda: circuits.apply(_seasons, axis=1),
+         lambda: formatting.season_ranges(circuits["race_count"],
+                                          circuits["min_year"],
+                                          circuits["max_year"])),
+    )
+    rows = []
+    for name, size, row_wise, vectorised in cases:
+        row_wise_timings, expected = measure(row_wise, repeat=repeat)
+        vectorised_timings, actual = measure(vectorised, repeat=repeat)
+        if expected.tolist() != actual.tolist():
+            raise AssertionError(f"{name}: vectorised output differs")
+        rows.append({"name": name,
+                     "rows": size,
+                     "apply_ms": statistics.median(row_wise_timings),
+                     "vectorised_ms": statistics.median(vectorised_timings)})
+    return rows
+
+
+def print_formatting_report(rows, file=None):
+    file = file or sys.stdout
+    print(f"{'table':<12}{'rows':>10}{'apply ms':>12}{'vectorised ms':>16}"
+          f"{'speedup':>10}", file=file)
+    for row in rows:
+        speedup = row["apply_ms"] / max(row["vectorised_ms"], 1e-9)
+        print(f"{row['name']:<12}{row['rows']:>10}{row['apply_ms']:>12.1f}"
+              f"{row['vectorised_ms']:>16.1f}{speedup:>9.1f}x", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    rows = run(args.repeat)
+    print_formatting_report(rows)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_formatting_report(rows, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import json
+import os
+import statistics
+import sys
+import time
+
+from plotly.io.json import to_json_plotly
+
+
+__all__ = [
+    "BENCHMARKS_DIR",
+    "check_thresholds",
+    "json_size",
+    "load_json",
+    "measure",
+    "percentile",
+    "print_report",
+    "summarize",
+]
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_json(path):
+    """Load a scenario/threshold file, relative to the benchmarks dir"""
+    if not os.path.isabs(path):
+        path = os.path.join(BENCHMARKS_DIR, path)
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def json_size(value):
+    """Bytes of the JSON Dash would send for a callback return value"""
+    return len(to_json_plotly(value).encode("utf-8"))
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(fn, repeat=5, warmup=1):
+    """Run ``fn`` and return (timings in ms, last result)"""
+    result = None
+    for _ in range(warmup):
+        result = fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+
+def summarize(name, timings, size=None):
+    return {
+        "name": name,
+        "median_ms": statistics.median(timings),
+        "p95_ms": percentile(timings, 95),
+        "min_ms": min(timings),
+        "json_bytes": size,
+    }
+
+
+def check_thresholds(rows, thresholds, scale=1.0):
+    """Mark rows exceeding their thresholds; return the failing names"""
+    failures = []
+    for row in rows:
+        limits = thresholds.get(row["name"], {})
+        problems = []
+        max_ms = limits.get("max_median_ms")
+        if max_ms is not None and row["median_ms"] > max_ms * scale:
+            problems.append(f"median {row['median_ms']:.1f} ms "
+                            f"> {max_ms * scale:.1f} ms")
+        max_bytes = limits.get("max_json_bytes")
+        if (max_bytes is not None
+                and row["json_bytes"] is not None
+                and row["json_bytes"] > max_bytes):
+            problems.append(f"json {row['json_bytes']} B > {max_bytes} B")
+        row["status"] = "FAIL: " + "; ".join(problems) if problems else "ok"
+        if problems:
+            failures.append(row["name"])
+    return failures
+
+
+def print_report(rows, title, file=None):
+    file = file or sys.stdout
+    width = max([len(row["name"]) for row in rows] + [8])
+    print(f"\n{title}", file=file)
+    print(f"{'scenario':<{width}}  {'median ms':>10}  {'p95 ms':>10}  "
+          f"{'min ms':>10}  {'json KB':>9}  status", file=file)
+    for row in rows:
+        size = ("-" if row["json_bytes"] is None
+                else f"{row['json_bytes'] / 1024:.1f}")
+        print(f"{row['name']:<{width}}  {row['median_ms']:>10.2f}  "
+              f"{row['p95_ms']:>10.2f}  {row['min_ms']:>10.2f}  "
+              f"{size:>9}  {row.get('status', '')}", file=file)
@@ -0,0 +1,91 @@
+"""Lap time chart with and without the registered "dashboard" template.
+
+Run from the repository root:
+
+    python -m benchmarks.lap_chart [--scenarios scenarios/figures.json]
+                                   [--repeat 20] [--output bench_output.txt]
+
+For every lap_times scenario the chart is built three ways:
+
+    template   the shipped builder: dict layout on the "dashboard" template
+    inline     the same chart with the fonts and colours merged into every
+               layout and the full default "plotly" template attached
+    validated  the inline chart passed through go.Figure and update_layout,
+               the per-request cost of the graph-object path
+
+and the median build time and JSON size are reported for each.
+"""
+import argparse
+import statistics
+import sys
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from benchmarks.harness import json_size, load_json, measure
+
+
+def run(scenarios, repeat=20):
+    from circuit_map import draw_fastest_lap_times_line_chart
+    from figure_dicts import THEME_LAYOUT, figure, validated
+
+    plotly_template = validated(pio.templates["plotly"])
+
+    def inline(**kwargs):
+        fig = draw_fastest_lap_times_line_chart(**kwargs)
+        layout = {key: value for key, value in fig["layout"].items()
+                  if key != "template"}
+        return figure(fig["data"], THEME_LAYOUT, layout,
+                      template=plotly_template)
+
+    def through_go(**kwargs):
+        fig = inline(**kwargs)
+        return go.Figure(data=fig["data"],
+                         layout=fig["layout"]).update_layout(THEME_LAYOUT)
+
+    variants = (("template", draw_fastest_lap_times_line_chart),
+                ("inline", inline),
+                ("validated", through_go))
+    rows = []
+    for scenario in scenarios:
+        if scenario["builder"] != "draw_fastest_lap_times_line_chart":
+            continue
+        kwargs = scenario.get("kwargs", {})
+        row = {"name": scenario["name"]}
+        for label, builder in variants:
+            timings, fig = measure(lambda: builder(**kwargs), repeat=repeat)
+            row[label] = (statistics.median(timings), json_size(fig))
+        rows.append(row)
+    return rows
+
+
+def print_lap_chart_report(rows, file=None):
+    file = file or sys.stdout
+    width = max([len(row["name"]) for row in rows] + [8])
+    header = "".join(f"  {label + ' ms':>14}  {label + ' KB':>14}"
+                     for label in ("template", "inline", "validated"))
+    print(f"{'scenario':<{width}}{header}", file=file)
+    for row in rows:
+        cells = "".join(f"  {row[label][0]:>14.2f}  "
+                        f"{row[label][1] / 1024:>14.1f}"
+                        for label in ("template", "inline", "validated"))
+        print(f"{row['name']:<{width}}{cells}", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="scenarios/figures.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    rows = run(load_json(args.scenarios), args.repeat)
+    print_lap_chart_report(rows)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_lap_chart_report(rows, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Race slicing and LTTB downsampling of lap_times at a multiple of its size.
+
+Run from the repository root:
+
+    python -m benchmarks.lap_explorer [--scale 10] [--races 60]
+                                      [--repeat 5] [--output bench_output.txt]
+
+The loaded lap_times table (DASHBOARD_DATA_DIR) is repeated ``--scale``
+times with offset raceIds, as benchmarks.synthetic_data does. For a
+few seasons of races it then times:
+
+    mask      a boolean raceId mask over the DataFrame per race
+    store     a RaceLapStore slice through the offsets index per race
+    lttb      reducing each driver's laps over all of those races to
+              lap_explorer.MAX_POINTS
+
+and reports the figure size of the explorer chart with and without the
+downsampling.
+"""
+import argparse
+import statistics
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.harness import json_size, measure
+
+
+def scaled_lap_times(lap_times, scale):
+    offset = int(lap_times["raceId"].max())
+    return pd.concat([lap_times.assign(raceId=lap_times["raceId"]
+                                       + copy * offset)
+                      for copy in range(scale)],
+                     ignore_index=True)
+
+
+def run(scale=10, race_count=60, repeat=5):
+    import lap_explorer
+    from downsample import lttb
+    from race_lap_store import build_race_lap_store
+    from source import lap_times_df
+
+    lap_times = scaled_lap_times(
+        lap_times_df[["raceId", "driverId", "lap", "milliseconds"]], scale)
+    build_timings, store = measure(lambda: build_race_lap_store(lap_times),
+                                   repeat=1, warmup=0)
+
+    # The most recent races of the original data, and their drivers
+    race_ids = lap_explorer.selected_races(
+        list(lap_explorer.race_labels)[:race_count])
+    driver_ids = lap_explorer.drivers_in_races(race_ids)
+
+    def mask():
+        return [lap_times[lap_times["raceId"] == race_id]
+                for race_id in race_ids]
+
+    def sliced():
+        return [store.race(race_id) for race_id in race_ids]
+
+    series = [lap_explorer.driver_laps(race_ids, driver_id)[:2]
+              for driver_id in driver_ids]
+
+    def downsample():
+        return [lttb(x, y, lap_explorer.MAX_POINTS) for x, y in series]
+
+    rows = [{"name": "build store", "median_ms": build_timings[0]}]
+    for name, fn in (("mask", mask), ("store", sliced),
+                     ("lttb", downsample)):
+        timings, _ = measure(fn, repeat=repeat)
+        rows.append({"name": name, "median_ms": statistics.median(timings)})
+
+    full = lap_explorer.draw_race_lap_times(race_ids, driver_ids,
+                                            max_points=np.iinfo(np.int32).max)
+    reduced = lap_explorer.draw_race_lap_times(race_ids, driver_ids)
+    return {
+        "scale": scale,
+        "laps": len(lap_times),
+        "races": len(race_ids),
+        "drivers": len(driver_ids),
+        "points": sum(len(x) for x, _ in series),
+        "rows": rows,
+        "full_bytes": json_size(full),
+        "reduced_bytes": json_size(reduced),
+    }
+
+
+def print_lap_explorer_report(result, file=None):
+    file = file or sys.stdout
+    print(f"lap_times x{result['scale']}: {result['laps']:,} laps, "
+          f"{result['races']} races x {result['drivers']} drivers, "
+          f"{result['points']:,} points", file=file)
+    for row in result["rows"]:
+        print(f"  {row['name']:<12}{row['median_ms']:>10.1f} ms", file=file)
+    print(f"  figure      {result['full_bytes'] / 1024:>10.1f} KB full, "
+          f"{result['reduced_bytes'] / 1024:.1f} KB downsampled", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--races", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    result = run(args.scale, args.races, args.repeat)
+    print_lap_explorer_report(result)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_lap_explorer_report(result, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Initial page cost with eagerly built figures vs lazy chart sections.
+
+Run from the repository root:
+
+    python -m benchmarks.lazy_sections [--repeat 5]
+                                       [--output bench_output.txt]
+
+The dashboard is imported in a fresh interpreter per mode, with
+DASHBOARD_LAZY_SECTIONS off and on. For each it reports
+
+    startup        importing main, including the initial figures
+    layout         /_dash-layout size (raw and gzip), the median time to
+                   serve it through app.server's test client and to parse
+                   the JSON
+    first paint    serve + parse, what the renderer waits for before it
+                   can draw the page (the browser's own rendering of the
+                   layout figures is not included)
+    initial        the callbacks the renderer fires on page load
+    sections       lazy mode only: the callbacks fired once every section
+                   has scrolled into view
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import measure
+
+
+LOADED_SUFFIX = "-loaded.data"
+
+
+def _totals(recorder):
+    return {
+        "requests": sum(len(values)
+                        for values in recorder.latencies.values()),
+        "bytes": sum(sum(sizes) for sizes in recorder.sizes.values()),
+        "ms": sum(sum(values) for values in recorder.latencies.values()),
+    }
+
+
+def _child(repeat):
+    start = time.perf_counter()
+    from main import app
+    startup = time.perf_counter() - start
+
+    from benchmarks.load_test import (
+        Recorder,
+        Transport,
+        VirtualUser,
+        _collect_layout_state,
+    )
+    from lazy_sections import ENABLED
+
+    client = app.server.test_client()
+    fetch_timings, body = measure(
+        lambda: client.get("/_dash-layout").data, repeat=repeat)
+    parse_timings, layout = measure(lambda: json.loads(body), repeat=repeat)
+
+    transport = Transport()
+    _, dependencies = transport.get("/_dash-dependencies")
+    layout_state = {}
+    _collect_layout_state(layout, layout_state)
+    initial = Recorder()
+    user = VirtualUser(transport, dependencies, layout_state, initial)
+    user.load_page()
+
+    result = {
+        "lazy": ENABLED,
+        "startup_s": startup,
+        "layout_bytes": len(body),
+        "layout_gzip_bytes": len(gzip.compress(body)),
+        "fetch_ms": statistics.median(fetch_timings),
+        "parse_ms": statistics.median(parse_timings),
+        "initial": _totals(initial),
+    }
+    if ENABLED:
+        sections = Recorder()
+        user.record = sections
+        user.step({prop: True for prop in layout_state
+                   if prop.endswith(LOADED_SUFFIX)})
+        result["sections"] = _totals(sections)
+    print(json.dumps(result))
+
+
+def measure_mode(lazy, repeat):
+    env = dict(os.environ, DASHBOARD_LAZY_SECTIONS="1" if lazy else "0")
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.lazy_sections", "--child",
+         "--repeat", str(repeat)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _print_callbacks(label, totals, file):
+    print(f"  {label:<14}{totals['requests']:>6} requests "
+          f"{totals['bytes'] / 1024:>9.1f} KB {totals['ms']:>9.1f} ms",
+          file=file)
+
+
+def print_lazy_sections_report(results, file=None):
+    file = file or sys.stdout
+    for result in results:
+        print(f"{'lazy' if result['lazy'] else 'eager'}: "
+              f"startup {result['startup_s']:.2f} s", file=file)
+        print(f"  {'layout':<14}{result['layout_bytes'] / 1024:>9.1f} KB "
+              f"({result['layout_gzip_bytes'] / 1024:.1f} KB gzip), "
+              f"serve {result['fetch_ms']:.1f} ms, "
+              f"parse {result['parse_ms']:.1f} ms", file=file)
+        print(f"  {'first paint':<14}"
+              f"{result['fetch_ms'] + result['parse_ms']:>9.1f} ms",
+              file=file)
+        _print_callbacks("initial", result["initial"], file)
+        if "sections" in result:
+            _print_callbacks("sections", result["sections"], file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also append the report here")
+    parser.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.repeat)
+        return 0
+
+    results = [measure_mode(lazy, args.repeat) for lazy in (False, True)]
+    print_lazy_sections_report(results)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_lazy_sections_report(results, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""Replay recorded interactions against the Dash callback endpoint.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test [--users 8] [--duration 30]
+                                   [--sequences scenarios/interactions.json]
+                                   [--sequence slider-drag ...]
+                                   [--url http://127.0.0.1:8050]
+                                   [--gunicorn "-w 1 --threads 8"
+                                    --gunicorn "-w 8 --threads 1"]
+
+Every virtual user loads the page (firing the initial callbacks), then
+replays the sequences in a loop. Each step sets component properties and
+fires the callbacks depending on them, including chained callbacks, the
+same way the Dash renderer does. Without --url or --gunicorn requests go
+through app.server's test client in this process; every --gunicorn
+option string starts a local gunicorn with those worker settings and
+produces its own report, so thread and process configurations can be
+compared side by side.
+"""
+import argparse
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.harness import load_json, percentile
+
+
+UPDATE_PATH = "/_dash-update-component"
+
+
+class Transport:
+    """POSTs to a running server, or to app.server's test client"""
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+        if base_url:
+            import requests
+
+            self.session = requests.Session()
+        else:
+            from main import app
+
+            self.client = app.server.test_client()
+
+    def get(self, path):
+        if self.base_url:
+            response = self.session.get(self.base_url + path)
+            return response.status_code, response.json()
+        response = self.client.get(path)
+        return response.status_code, response.get_json()
+
+    def post(self, path, body):
+        if self.base_url:
+            response = self.session.post(self.base_url + path, json=body)
+            return (response.status_code,
+                    response.content,
+                    response.json() if response.content else None)
+        response = self.client.post(path, json=body)
+        return (response.status_code,
+                response.data,
+                response.get_json() if response.data else None)
+
+
+def _split_output(output):
+    if output.startswith(".."):
+        return output[2:-2].split("...")
+    return [output]
+
+
+def _collect_layout_state(node, state):
+    if isinstance(node, list):
+        for child in node:
+            _collect_layout_state(child, state)
+    elif isinstance(node, dict):
+        props = node.get("props", {})
+        if "id" in props and isinstance(props["id"], str):
+            for prop, value in props.items():
+                state[f"{props['id']}.{prop}"] = value
+        _collect_layout_state(props.get("children"), state)
+
+
+class VirtualUser:
+    def __init__(self, transport, dependencies, layout_state, record):
+        self.transport = transport
+        self.state = dict(layout_state)
+        self.record = record
+        self.callbacks = []
+        for dependency in dependencies:
+            if dependency.get("clientside_function"):
+                continue
+            outputs = _split_output(dependency["output"])
+            self.callbacks.append({
+                **dependency,
+                "outputs_list": outputs,
+                "input_ids": [f"{item['id']}.{item['property']}"
+                              for item in dependency["inputs"]],
+            })
+
+    def _payload(self, callback, changed):
+        def with_value(items):
+            return [{**item,
+                     "value": self.state.get(
+                         f"{item['id']}.{item['property']}")}
+                    for item in items]
+
+        outputs = [dict(zip(("id", "property"), output.rsplit(".", 1)))
+                   for output in callback["outputs_list"]]
+        return {
+            "output": callback["output"],
+            "outputs": outputs if len(outputs) > 1 else outputs[0],
+            "inputs": with_value(callback["inputs"]),
+            "state": with_value(callback["state"]),
+            "changedPropIds": [prop for prop in callback["input_ids"]
+                               if prop in changed],
+        }
+
+    def _call(self, callback, changed):
+        payload = self._payload(callback, changed)
+        start = time.perf_counter()
+        status, content, body = self.transport.post(UPDATE_PATH, payload)
+        if status == 200 and body and "job" in body:
+            # Background callback: poll for the job result like the
+            # renderer does, at the callback's polling interval.
+            interval = callback["background"].get("interval", 1000) / 1000
+            query = f"?cacheKey={body['cacheKey']}&job={body['job']}"
+            while status == 200 and body and "response" not in body:
+                time.sleep(interval)
+                status, content, body = self.transport.post(
+                    UPDATE_PATH + query, payload)
+        latency = time.perf_counter() - start
+        self.record(callback["output"], latency, len(content), status)
+
+        if status != 200 or not body:
+            return set()
+        updated = set()
+        for component_id, props in body.get("response", {}).items():
+            for prop, value in props.items():
+                self.state[f"{component_id}.{prop}"] = value
+                updated.add(f"{component_id}.{prop}")
+        return updated
+
+    def _run(self, pending, changed):
+        # Fire callbacks whose inputs are not produced by another pending
+        # callback first, then follow the outputs they changed.
+        for _ in range(10):
+            if not pending:
+                return
+            ready = [callback for callback in pending
+                     if not any(set(other["outputs_list"])
+                                & set(callback["input_ids"])
+                                for other in pending
+                                if other is not callback)] or pending
+            updated = set()
+            for callback in ready:
+                updated |= self._call(callback, changed)
+            pending = ([callback for callback in pending
+                        if callback not in ready]
+                       + [callback for callback in self.callbacks
+                          if updated.intersection(callback["input_ids"])
+                          and callback not in pending])
+            changed = updated
+
+    def load_page(self):
+        self._run([callback for callback in self.callbacks
+                   if not callback.get("prevent_initial_call")], set())
+
+    def step(self, values):
+        self.state.update(values)
+        changed = set(values)
+        self._run([callback for callback in self.callbacks
+                   if changed.intersection(callback["input_ids"])], changed)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.sizes = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def __call__(self, output, latency, size, status):
+        with self.lock:
+            self.latencies[output].append(latency * 1000)
+            self.sizes[output].append(size)
+            if status >= 400:
+                self.errors[output] += 1
+
+
+def run_load(transport_factory, sequences, users, duration, think_time):
+    recorder = Recorder()
+    _, dependencies = transport_factory().get("/_dash-dependencies")
+    _, layout = transport_factory().get("/_dash-layout")
+    layout_state = {}
+    _collect_layout_state(layout, layout_state)
+    deadline = time.perf_counter() + duration
+
+    def virtual_user(index):
+        user = VirtualUser(transport_factory(),
+                           dependencies,
+                           layout_state,
+                           recorder)
+        user.load_page()
+        offset = index % len(sequences)
+        while time.perf_counter() < deadline:
+            sequence = sequences[offset % len(sequences)]
+            offset += 1
+            for values in sequence["steps"]:
+                if time.perf_counter() >= deadline:
+                    return
+                user.step(values)
+                if think_time:
+                    time.sleep(think_time)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=virtual_user, args=(index,))
+               for index in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+def print_load_report(title, recorder, elapsed, file=None):
+    file = file or sys.stdout
+    total = sum(len(values) for values in recorder.latencies.values())
+    width = max([len(output) for output in recorder.latencies] + [6])
+    print(f"\n{title}: {total} requests in {elapsed:.1f} s "
+          f"({total / elapsed:.1f} req/s)", file=file)
+    print(f"{'output':<{width}}  {'count':>6}  {'errors':>6}  "
+          f"{'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'mean KB':>8}",
+          file=file)
+    for output, values in sorted(recorder.latencies.items()):
+        sizes = recorder.sizes[output]
+        print(f"{output:<{width}}  {len(values):>6}  "
+              f"{recorder.errors[output]:>6}  "
+              f"{percentile(values, 50):>9.1f}  "
+              f"{percentile(values, 95):>9.1f}  "
+              f"{percentile(values, 99):>9.1f}  "
+              f"{sum(sizes) / len(sizes) / 1024:>8.1f}", file=file)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(options, timeout=300):
+    import requests
+
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:server",
+         "--bind", f"127.0.0.1:{port}", *shlex.split(options)],
+        cwd=os.getcwd(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn {options!r} exited early")
+        try:
+            if requests.get(base_url + "/ready").ok:
+                return process, base_url
+        except requests.ConnectionError:
+            pass
+        # Not listening yet, or still warming (503)
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"gunicorn {options!r} did not start in {timeout} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sequences", default="scenarios/interactions.json")
+    parser.add_argument("--sequence", action="append",
+                        help="only replay the named sequence(s)")
+    parser.add_argument("--users", type=int, default=8,
+                        help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30,
+                        help="seconds to keep replaying")
+    parser.add_argument("--url", help="target an already running server")
+    parser.add_argument("--gunicorn", action="append",
+                        help="start gunicorn with these options, "
+                             "may be repeated to compare configurations")
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    recorded = load_json(args.sequences)
+    sequences = [sequence for sequence in recorded["sequences"]
+                 if not args.sequence or sequence["name"] in args.sequence]
+    think_time = recorded.get("think_time_ms", 0) / 1000
+
+    targets = []
+    if args.gunicorn:
+        targets = [(f"gunicorn {options}", options)
+                   for options in args.gunicorn]
+    else:
+        targets = [(args.url or "test client", None)]
+
+    for title, options in targets:
+        process, base_url = None, args.url
+        if options is not None:
+            process, base_url = start_gunicorn(options)
+        try:
+            recorder, elapsed = run_load(lambda: Transport(base_url),
+                                         sequences,
+                                         args.users,
+                                         args.duration,
+                                         think_time)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+        title = f"{title}, {args.users} users"
+        print_load_report(title, recorder, elapsed)
+        if args.output:
+            with open(args.output, "a", encoding="utf-8") as file:
+                print_load_report(title, recorder, elapsed, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Figure payload size and parse time, typed arrays vs plain JSON lists.
+
+Run from the repository root:
+
+    python -m benchmarks.payload [--scenarios scenarios/figures.json]
+                                 [--repeat 20] [--output bench_output.txt]
+
+For every scenario the figure is serialised the way Dash sends it, with
+numeric arrays as base64 typed arrays ("bdata"), and again with those
+arrays expanded to JSON number lists. Parse time is json.loads plus
+decoding the typed arrays, a stand-in for JSON.parse and plotly.js
+decoding in the browser.
+"""
+import argparse
+import base64
+import gzip
+import json
+import statistics
+import sys
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+from benchmarks.harness import load_json, measure
+
+
+_DTYPES = {"i1": "int8", "u1": "uint8", "i2": "int16", "u2": "uint16",
+           "i4": "int32", "u4": "uint32", "f4": "float32", "f8": "float64"}
+
+
+def _decode(spec):
+    values = np.frombuffer(base64.b64decode(spec["bdata"]),
+                           dtype=_DTYPES[spec["dtype"]])
+    if "shape" in spec:
+        values = values.reshape([int(size)
+                                 for size in spec["shape"].split(",")])
+    return values
+
+
+def _walk(node, typed):
+    if isinstance(node, dict):
+        if "bdata" in node and "dtype" in node:
+            return _decode(node) if typed else _decode(node).tolist()
+        return {key: _walk(value, typed) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_walk(value, typed) for value in node]
+    return node
+
+
+def plain_json(typed_json):
+    """The same figure with every typed array as a JSON number list"""
+    return json.dumps(_walk(json.loads(typed_json), typed=False),
+                      separators=(",", ":"))
+
+
+def parse(payload):
+    return _walk(json.loads(payload), typed=True)
+
+
+def run(scenarios, repeat=20):
+    from benchmarks.figures import get_builders
+
+    builders = get_builders()
+    rows = []
+    for scenario in scenarios:
+        fig = builders[scenario["builder"]](**scenario.get("kwargs", {}))
+        row = {"name": scenario["name"]}
+        typed = to_json_plotly(fig)
+        for label, payload in (("plain", plain_json(typed)),
+                               ("typed", typed)):
+            timings, _ = measure(lambda: parse(payload), repeat=repeat)
+            row[label] = {
+                "bytes": len(payload.encode("utf-8")),
+                "gzip_bytes": len(gzip.compress(payload.encode("utf-8"))),
+                "parse_ms": statistics.median(timings),
+            }
+        rows.append(row)
+    return rows
+
+
+def print_payload_report(rows, file=None):
+    file = file or sys.stdout
+    width = max([len(row["name"]) for row in rows] + [8])
+    print(f"{'scenario':<{width}}  {'plain KB':>9}  {'typed KB':>9}  "
+          f"{'plain gz':>9}  {'typed gz':>9}  {'plain ms':>9}  "
+          f"{'typed ms':>9}", file=file)
+    for row in rows:
+        plain, typed = row["plain"], row["typed"]
+        print(f"{row['name']:<{width}}  {plain['bytes'] / 1024:>9.1f}  "
+              f"{typed['bytes'] / 1024:>9.1f}  "
+              f"{plain['gzip_bytes'] / 1024:>9.1f}  "
+              f"{typed['gzip_bytes'] / 1024:>9.1f}  "
+              f"{plain['parse_ms']:>9.2f}  {typed['parse_ms']:>9.2f}",
+              file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="scenarios/figures.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    rows = run(load_json(args.scenarios), args.repeat)
+    print_payload_report(rows)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_payload_report(rows, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
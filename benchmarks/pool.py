@@ -0,0 +1,93 @@
+"""Figure-building throughput with and without the process pool.
+
+Run from the repository root:
+
+    python -m benchmarks.pool [--workers 0 --workers 2 ...]
+                              [--threads 8] [--duration 10]
+
+Request threads build career plots and parcats figures in a loop, either
+in-process (0 workers) or through figure_pool with the given number of
+forked workers. Throughput should grow with the number of cores.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import figure_pool
+from benchmarks.harness import percentile
+
+
+SCENARIOS = (
+    ("create_career_plot", {"mode": "start"}),
+    ("create_career_plot", {"mode": "both"}),
+    ("create_career_plot", {"mode": "end", "season_filter": [1980, 2010]}),
+    ("update_parcats", {"number_of_records": None, "do_sort": True,
+                        "sorting_column": "Driver",
+                        "sorting_type": "count"}),
+    ("update_parcats", {"number_of_records": 100, "do_sort": True,
+                        "sorting_column": "Circuit",
+                        "sorting_type": "name"}),
+)
+
+
+def run(workers, threads, duration):
+    from benchmarks.figures import get_builders
+
+    builders = get_builders()
+    figure_pool.shutdown()
+    figure_pool.start(workers, queue_size=threads)
+    offloaded = {name: figure_pool.offload(builder)
+                 for name, builder in builders.items()}
+
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def request_thread(index):
+        count = index
+        while time.perf_counter() < deadline:
+            name, kwargs = SCENARIOS[count % len(SCENARIOS)]
+            count += 1
+            start = time.perf_counter()
+            offloaded[name](**kwargs)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    pool_threads = [threading.Thread(target=request_thread, args=(index,))
+                    for index in range(threads)]
+    for thread in pool_threads:
+        thread.start()
+    for thread in pool_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    figure_pool.shutdown()
+    return len(latencies) / elapsed, latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, action="append",
+                        help="pool size to test, may be repeated "
+                             "(0 builds in-process)")
+    parser.add_argument("--threads", type=int, default=8,
+                        help="concurrent request threads")
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({0, 1, max(1, cores // 2), cores})
+    print(f"{cores} cores, {args.threads} request threads")
+    print(f"{'workers':>8}  {'figures/s':>10}  {'p50 ms':>9}  {'p95 ms':>9}")
+    for workers in worker_counts:
+        throughput, latencies = run(workers, args.threads, args.duration)
+        print(f"{workers:>8}  {throughput:>10.2f}  "
+              f"{percentile(latencies, 50):>9.1f}  "
+              f"{percentile(latencies, 95):>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Record startup time, memory and callback latency against dataset size.
+
+Run from the repository root:
+
+    python -m benchmarks.scale [--scale 1 --scale 10 ...]
+                               [--data ./synthetic] [--generate]
+                               [--scenario lap_times/none ...]
+                               [--output scale.json]
+
+Each scale runs in a fresh interpreter with DASHBOARD_DATA_DIR pointing
+at ``<data>/x<scale>``. Scale 1 is generated like the others: ./dataset
+ships without lap_times.csv, which the generator synthesizes.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import load_json
+from benchmarks.synthetic_data import generate, scaled_dir
+
+
+DEFAULT_SCENARIOS = (
+    "career_plot/both",
+    "career_timeline/hamilton",
+    "parcats/count-full",
+    "lap_times/none",
+    "lap_times/many",
+    "circuits_map/default",
+)
+
+
+def _child(scenario_names, repeat):
+    start = time.perf_counter()
+    import main  # noqa: F401
+    startup = time.perf_counter() - start
+
+    from benchmarks.figures import run
+
+    scenarios = [scenario
+                 for scenario in load_json("scenarios/figures.json")
+                 if scenario["name"] in scenario_names]
+    rows = run(scenarios, repeat=repeat)
+    print(json.dumps({
+        "startup_s": startup,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / 1024,
+        "callbacks_ms": {row["name"]: row["median_ms"] for row in rows},
+    }))
+
+
+def measure_scale(data_dir, scenario_names, repeat):
+    env = dict(os.environ, DASHBOARD_DATA_DIR=data_dir)
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.scale", "--child",
+         "--repeat", str(repeat),
+         *(arg for name in scenario_names for arg in ("--scenario", name))],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, action="append")
+    parser.add_argument("--data", default="./synthetic")
+    parser.add_argument("--generate", action="store_true",
+                        help="generate missing scaled datasets first")
+    parser.add_argument("--scenario", action="append",
+                        help="figure scenario to time, may be repeated")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the curves as JSON here")
+    parser.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    scenario_names = args.scenario or list(DEFAULT_SCENARIOS)
+    if args.child:
+        _child(scenario_names, args.repeat)
+        return 0
+
+    curves = []
+    for scale in args.scale or (1, 10, 100):
+        data_dir = scaled_dir(args.data, scale)
+        if not os.path.isdir(data_dir):
+            if not args.generate:
+                parser.error(f"{data_dir} is missing, pass --generate")
+            generate(scale, output=args.data)
+        result = measure_scale(data_dir, scenario_names, args.repeat)
+        curves.append({"scale": scale, **result})
+
+        print(f"x{scale:<6} startup {result['startup_s']:7.2f} s   "
+              f"peak RSS {result['peak_rss_mb']:8.1f} MB")
+        for name, median in result["callbacks_ms"].items():
+            print(f"        {name:<32}{median:10.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(curves, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
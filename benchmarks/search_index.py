@@ -0,0 +1,106 @@
+"""Dropdown search latency over driver names at a multiple of their count.
+
+Run from the repository root:
+
+    python -m benchmarks.search_index [--scale 100] [--queries 200]
+                                      [--repeat 5] [--output bench_output.txt]
+
+The driver options are repeated ``--scale`` times, as the drivers of
+benchmarks.synthetic_data repeat the original names. For random one to
+six character pieces of the names (and some misses) it times, per
+query:
+
+    scan      a substring test over every pre-normalised name
+    index     SearchIndex.search, word prefixes and n-gram postings
+
+and reports the size of the dropdown options in the initial layout:
+every option, as before, and the top options the index serves.
+"""
+import argparse
+import statistics
+import sys
+
+import numpy as np
+
+from benchmarks.harness import json_size, measure
+
+
+def run(scale=100, query_count=200, repeat=5):
+    from search_index import DEFAULT_LIMIT, SearchIndex, normalize
+    from source import driver_names, results_df
+
+    starts = results_df["driverId"].value_counts()
+    options = [{"label": name, "value": driver_id + copy * len(driver_names)}
+               for copy in range(scale)
+               for driver_id, name in driver_names.items()]
+    relevance = [int(starts.get(option["value"] % len(driver_names), 0))
+                 for option in options]
+    build_timings, index = measure(lambda: SearchIndex(options, relevance),
+                                   repeat=1, warmup=0)
+
+    rng = np.random.default_rng(0)
+    names = list(driver_names.values())
+    queries = []
+    for _ in range(query_count):
+        name = names[rng.integers(len(names))]
+        start = int(rng.integers(len(name)))
+        queries.append(name[start:start + int(rng.integers(1, 7))])
+    queries[::10] = ["zzq"] * len(queries[::10])
+
+    def scan():
+        matches = []
+        for query in queries:
+            query = normalize(query).strip()
+            matches.append([position
+                            for position, name in enumerate(index.names)
+                            if query in name][:DEFAULT_LIMIT])
+        return matches
+
+    def search():
+        return [index.search(query) for query in queries]
+
+    rows = [{"name": "build index", "median_ms": build_timings[0]}]
+    for name, fn in (("scan", scan), ("index", search)):
+        timings, _ = measure(fn, repeat=repeat)
+        rows.append({"name": name,
+                     "median_ms": statistics.median(timings) / query_count})
+    return {
+        "scale": scale,
+        "options": len(options),
+        "queries": query_count,
+        "rows": rows,
+        "all_bytes": json_size(options),
+        "top_bytes": json_size(index.options_for(None)),
+    }
+
+
+def print_search_index_report(result, file=None):
+    file = file or sys.stdout
+    print(f"drivers x{result['scale']}: {result['options']:,} options, "
+          f"{result['queries']} queries", file=file)
+    for row in result["rows"]:
+        unit = "ms" if row["name"] == "build index" else "ms per query"
+        print(f"  {row['name']:<12}{row['median_ms']:>10.3f} {unit}",
+              file=file)
+    print(f"  options     {result['all_bytes'] / 1024:>10.1f} KB all, "
+          f"{result['top_bytes'] / 1024:.1f} KB top", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    result = run(args.scale, args.queries, args.repeat)
+    print_search_index_report(result)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_search_index_report(result, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Check that the figure builders still produce the recorded figure JSON.
+
+Run from the repository root:
+
+    python -m benchmarks.snapshots --update   # record, e.g. before a change
+    python -m benchmarks.snapshots            # compare against the record
+
+Every scenario of scenarios/figures.json is built and serialised the way
+Dash sends it. Typed arrays are decoded before comparing, so a change of
+dtype alone is not a difference; floats are compared with --tolerance.
+The career plot jitter uses hash(), so the check re-runs itself with a
+fixed PYTHONHASHSEED. Snapshots depend on the dataset and are written
+to benchmarks/snapshots/ (not versioned). Exits with status 1 when a
+figure differs.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+from plotly.io.json import to_json_plotly
+
+from benchmarks.harness import BENCHMARKS_DIR, load_json
+from benchmarks.payload import plain_json
+
+
+SNAPSHOTS_DIR = os.path.join(BENCHMARKS_DIR, "snapshots")
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOTS_DIR, name.replace("/", "__") + ".json")
+
+
+def normalize(fig):
+    """Figure as plain JSON data, with typed arrays as number lists"""
+    return json.loads(plain_json(to_json_plotly(fig)))
+
+
+def differences(expected, actual, tolerance, path=""):
+    """Paths where ``actual`` differs from ``expected``"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        found = []
+        for key in sorted(set(expected) | set(actual)):
+            if key not in actual:
+                found.append(f"{path}.{key}: missing")
+            elif key not in expected:
+                found.append(f"{path}.{key}: unexpected")
+            else:
+                found += differences(expected[key], actual[key], tolerance,
+                                     f"{path}.{key}")
+        return found
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f"{path}: length {len(actual)} != {len(expected)}"]
+        found = []
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            found += differences(left, right, tolerance, f"{path}[{index}]")
+        return found
+    numbers = (int, float)
+    if (isinstance(expected, numbers) and isinstance(actual, numbers)
+            and not isinstance(expected, bool)
+            and not isinstance(actual, bool)):
+        if math.isclose(expected, actual, rel_tol=tolerance,
+                        abs_tol=tolerance):
+            return []
+    elif expected == actual:
+        return []
+    return [f"{path}: {actual!r} != {expected!r}"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="scenarios/figures.json")
+    parser.add_argument("--update", action="store_true",
+                        help="record the current figures")
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args(argv)
+
+    if "PYTHONHASHSEED" not in os.environ:
+        os.environ["PYTHONHASHSEED"] = "0"
+        os.execv(sys.executable, [sys.executable, "-m", __spec__.name,
+                                  *(sys.argv[1:] if argv is None else argv)])
+
+    from benchmarks.figures import get_builders
+
+    builders = get_builders()
+    failures = []
+    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    for scenario in load_json(args.scenarios):
+        name = scenario["name"]
+        fig = normalize(
+            builders[scenario["builder"]](**scenario.get("kwargs", {})))
+        path = snapshot_path(name)
+        if args.update:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(fig, file, indent=1, sort_keys=True)
+            print(f"{name}: recorded")
+            continue
+        if not os.path.exists(path):
+            print(f"{name}: no snapshot")
+            failures.append(name)
+            continue
+        with open(path, encoding="utf-8") as file:
+            found = differences(json.load(file), fig, args.tolerance)
+        print(f"{name}: {'ok' if not found else 'DIFFERS'}")
+        for line in found[:10]:
+            print(f"    {line}")
+        if len(found) > 10:
+            print(f"    ... {len(found) - 10} more")
+        if found:
+            failures.append(name)
+
+    if failures:
+        print(f"\n{len(failures)} figure(s) differ: " + ", ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
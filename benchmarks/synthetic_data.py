@@ -0,0 +1,234 @@
+"""Generate an Ergast-schema dataset N times the size of ./dataset.
+
+Run from the repository root:
+
+    python -m benchmarks.synthetic_data --scale 10 [--scale 100 ...]
+                                        [--source ./dataset]
+                                        [--output ./synthetic] [--seed 0]
+
+Every season keeps its real years, but each copy adds its own set of
+races (extra rounds on the original circuits), drivers and constructors,
+so per-race field sizes and result distributions stay realistic while
+every id still resolves. Finishing orders are shuffled per race and
+times get a little noise, so copies are not identical. Tables that are
+only referenced (circuits, status, rule changes, ...) are copied as is.
+"""
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "generate",
+    "scaled_dir",
+]
+
+
+NA = "\\N"
+
+# Primary keys that are renumbered per copy next to raceId/driverId/
+# constructorId, which are offset consistently across all tables.
+ROW_ID_COLUMNS = (
+    "resultId",
+    "driverStandingsId",
+    "constructorStandingsId",
+    "constructorResultsId",
+    "qualifyId",
+)
+SCALED_TABLES = (
+    "races",
+    "drivers",
+    "constructors",
+    "results",
+    "sprint_results",
+    "driver_standings",
+    "constructor_standings",
+    "constructor_results",
+    "qualifying",
+    "pit_stops",
+    "lap_times",
+)
+COPIED_TABLES = (
+    "circuits",
+    "circuits_extra",
+    "rule_changes",
+    "seasons",
+    "status",
+)
+# Ergast only has lap-by-lap data from this season on
+FIRST_LAP_TIMES_YEAR = 1996
+
+
+def scaled_dir(output, scale):
+    return os.path.join(output, f"x{scale}")
+
+
+def _read(source, table):
+    path = os.path.join(source, f"{table}.csv")
+    if not os.path.exists(path):
+        return None
+    return (pd.read_csv(path, na_values=[NA], keep_default_na=False)
+            .convert_dtypes())
+
+
+def _format_lap_time(ms):
+    ms = np.asarray(ms, dtype=np.int64)
+    minutes = (ms // 60000).astype(str)
+    seconds = ((ms % 60000) // 1000).astype(str)
+    millis = (ms % 1000).astype(str)
+    return (pd.Series(minutes) + ":" + pd.Series(seconds).str.zfill(2)
+            + "." + pd.Series(millis).str.zfill(3))
+
+
+def _parse_lap_time(values):
+    parts = values.astype(str).str.extract(r"^(?:(\d+):)?(\d+(?:\.\d+)?)$")
+    minutes = pd.to_numeric(parts[0], errors="coerce").fillna(0)
+    seconds = pd.to_numeric(parts[1], errors="coerce")
+    return (minutes * 60_000 + seconds * 1000).round()
+
+
+def synthesize_lap_times(results, races, circuits_extra, rng):
+    """Lap-by-lap rows for every classified result since 1996"""
+    base_ms = (races[["raceId", "circuitId", "year"]]
+               .merge(circuits_extra[["circuitId", "fastest_race_lap"]],
+                      on="circuitId",
+                      how="left"))
+    base_ms["base_ms"] = (_parse_lap_time(base_ms["fastest_race_lap"])
+                          .fillna(90_000)
+                          * (1 + (2024 - base_ms["year"]).clip(0) * 0.002))
+
+    entries = results.merge(base_ms[["raceId", "year", "base_ms"]],
+                            on="raceId")
+    entries = entries[(entries["year"] >= FIRST_LAP_TIMES_YEAR)
+                      & (entries["laps"] > 0)]
+    laps = entries["laps"].astype(int).to_numpy()
+    rows = np.repeat(np.arange(len(entries)), laps)
+    lap = np.arange(len(rows)) - np.repeat(np.cumsum(laps) - laps, laps) + 1
+
+    base = entries["base_ms"].to_numpy()[rows]
+    pace = rng.gamma(shape=2.0, scale=0.01, size=len(rows))
+    first_lap = np.where(lap == 1, 0.08, 0.0)
+    milliseconds = (base * (1.01 + pace + first_lap)).astype(np.int64)
+
+    return pd.DataFrame({
+        "raceId": entries["raceId"].to_numpy()[rows],
+        "driverId": entries["driverId"].to_numpy()[rows],
+        "lap": lap,
+        "position": entries["positionOrder"].to_numpy()[rows],
+        "time": _format_lap_time(milliseconds),
+        "milliseconds": milliseconds,
+    })
+
+
+def _shuffle_finishing_order(results, rng):
+    # Permute which entry gets which classification inside each race, so
+    # every race keeps the original position/points/status distribution.
+    results = results.sort_values(["raceId", "positionOrder"])
+    keys = rng.random(len(results))
+    order = np.lexsort((keys, results["raceId"].to_numpy()))
+    entrants = results[["driverId", "constructorId", "number", "grid"]]
+    shuffled = results.copy()
+    shuffled[entrants.columns] = entrants.iloc[order].to_numpy()
+    return shuffled
+
+
+def _offset_copy(df, copy, offsets, rounds, rng):
+    df = df.copy()
+    for column, offset in offsets.items():
+        if column in df.columns:
+            df[column] = df[column] + copy * offset
+    if copy == 0:
+        return df
+
+    if "round" in df.columns:
+        df["round"] = df["round"] + copy * df["year"].map(rounds)
+        df["name"] = df["name"] + f" {copy + 1}"
+    if "driverRef" in df.columns:
+        df["driverRef"] = df["driverRef"] + f"_{copy + 1}"
+        df["surname"] = df["surname"] + f" {copy + 1}"
+        df["code"] = NA
+        dob = pd.to_datetime(df["dob"], errors="coerce")
+        shift = pd.to_timedelta(rng.integers(-365, 366, len(df)), unit="D")
+        df["dob"] = (dob + shift).dt.strftime("%Y-%m-%d").fillna(NA)
+    if "constructorRef" in df.columns:
+        df["constructorRef"] = df["constructorRef"] + f"_{copy + 1}"
+        df["name"] = df["name"] + f" {copy + 1}"
+    if "milliseconds" in df.columns:
+        noise = rng.normal(1.0, 0.01, len(df))
+        df["milliseconds"] = ((df["milliseconds"] * noise)
+                              .round()
+                              .astype("Int64"))
+    return df
+
+
+def generate(scale, source="./dataset", output="./synthetic", seed=0):
+    """Write a dataset ``scale`` times the size of ``source``"""
+    rng = np.random.default_rng(seed)
+    target = scaled_dir(output, scale)
+    os.makedirs(target, exist_ok=True)
+
+    for table in COPIED_TABLES:
+        path = os.path.join(source, f"{table}.csv")
+        if os.path.exists(path):
+            shutil.copy(path, target)
+
+    tables = {table: _read(source, table) for table in SCALED_TABLES}
+    if tables["lap_times"] is None:
+        tables["lap_times"] = synthesize_lap_times(
+            tables["results"],
+            tables["races"],
+            _read(source, "circuits_extra"),
+            rng,
+        )
+
+    offsets = {
+        "raceId": int(tables["races"]["raceId"].max()),
+        "driverId": int(tables["drivers"]["driverId"].max()),
+        "constructorId": int(tables["constructors"]["constructorId"].max()),
+    }
+    for column in ROW_ID_COLUMNS:
+        offsets[column] = max(
+            int(df[column].max())
+            for df in tables.values()
+            if df is not None and column in df.columns
+        )
+    rounds = tables["races"].groupby("year")["round"].max()
+
+    for table, df in tables.items():
+        if df is None:
+            continue
+        path = os.path.join(target, f"{table}.csv")
+        for copy in range(scale):
+            part = df
+            if copy and table in ("results", "sprint_results"):
+                part = _shuffle_finishing_order(df, rng)
+            part = _offset_copy(part, copy, offsets, rounds, rng)
+            part.to_csv(path,
+                        mode="w" if copy == 0 else "a",
+                        header=copy == 0,
+                        index=False,
+                        na_rep=NA)
+        print(f"{table:<24}{len(df) * scale:>14,} rows -> {path}")
+
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, action="append",
+                        help="size multiplier, may be repeated "
+                             "(default: 10, 100 and 1000)")
+    parser.add_argument("--source", default="./dataset")
+    parser.add_argument("--output", default="./synthetic")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for scale in args.scale or (10, 100, 1000):
+        generate(scale, args.source, args.output, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Teammate graph queries on a generated dataset.
+
+Run from the repository root:
+
+    python -m benchmarks.teammate_graph [--scale 100] [--data ./synthetic]
+                                        [--generate] [--queries 50]
+                                        [--repeat 3]
+                                        [--output bench_output.txt]
+
+The results and races of ``<data>/x<scale>`` (see
+benchmarks.synthetic_data; --generate writes it when missing) are read
+directly, whatever DASHBOARD_DATA_DIR points at. Every copy in that
+dataset has its own drivers and constructors, so it is a teammate
+network of its own. Between random distinct drivers of the same copy it
+then times, per query:
+
+    dataframe   a BFS that finds each level's teammates with isin
+                masks and a merge over the results table
+    graph       TeammateGraph.shortest_path over the CSR adjacency
+    neighbours  TeammateGraph.neighbourhood within 2 links
+"""
+import argparse
+import os
+import statistics
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.harness import measure
+from benchmarks.synthetic_data import NA, generate, scaled_dir
+
+
+COLUMNS = ["raceId", "driverId", "constructorId", "positionOrder"]
+
+
+def dataframe_path_length(results, source_id, target_id):
+    """Teammate links between two drivers, by BFS over the DataFrame"""
+    seen = {source_id}
+    frontier = [source_id]
+    links = 0
+    while frontier:
+        links += 1
+        cars = results.loc[results["driverId"].isin(frontier),
+                           ["raceId", "constructorId"]].drop_duplicates()
+        teammates = set(results.merge(cars)["driverId"].unique()) - seen
+        if target_id in teammates:
+            return links
+        seen |= teammates
+        frontier = list(teammates)
+    return None
+
+
+def random_pairs(driver_ids, copy_size, scale, count, rng):
+    """``count`` pairs of distinct drivers within the same copy"""
+    copies = (driver_ids - 1) // copy_size
+    pairs = []
+    while len(pairs) < count:
+        copy = rng.integers(scale)
+        source_id, target_id = rng.choice(driver_ids[copies == copy], 2)
+        if source_id != target_id:
+            pairs.append([int(source_id), int(target_id)])
+    return pairs
+
+
+def run(data_dir, scale, query_count=50, repeat=3):
+    from teammate_graph import build_teammate_graph
+
+    def read(table, columns):
+        return pd.read_csv(os.path.join(data_dir, f"{table}.csv"),
+                           usecols=columns, na_values=[NA])
+
+    results = read("results", COLUMNS)
+    races = read("races", ["raceId", "year", "date"])
+    # Copies offset driverIds by the original largest driverId
+    copy_size = int(read("drivers", ["driverId"])["driverId"].max()) // scale
+    build_timings, graph = measure(
+        lambda: build_teammate_graph(results, races), repeat=1, warmup=0)
+
+    pairs = random_pairs(np.unique(results["driverId"]), copy_size, scale,
+                         query_count, np.random.default_rng(0))
+
+    def graph_paths():
+        return [graph.shortest_path(*pair) for pair in pairs]
+
+    def dataframe_paths():
+        return [dataframe_path_length(results, *pair) for pair in pairs]
+
+    def neighbours():
+        return [graph.neighbourhood(source_id, 2) for source_id, _ in pairs]
+
+    rows = [{"name": "build graph", "median_ms": build_timings[0]}]
+    lengths = {}
+    for name, fn, runs in (("dataframe", dataframe_paths, 1),
+                           ("graph", graph_paths, repeat),
+                           ("neighbours", neighbours, repeat)):
+        timings, result = measure(fn, repeat=runs, warmup=0)
+        rows.append({"name": name,
+                     "median_ms": statistics.median(timings) / query_count})
+        lengths[name] = result
+
+    # Both searches must find paths of the same length
+    assert lengths["dataframe"] == [
+        None if path is None else len(path) - 1
+        for path in lengths["graph"]]
+    return {
+        "scale": scale,
+        "results": len(results),
+        "drivers": len(graph.driver_ids),
+        "links": len(graph.indices),
+        "queries": query_count,
+        "rows": rows,
+    }
+
+
+def print_teammate_graph_report(result, file=None):
+    file = file or sys.stdout
+    print(f"results x{result['scale']}: {result['results']:,} rows, "
+          f"{result['drivers']:,} drivers, {result['links']:,} links, "
+          f"{result['queries']} queries", file=file)
+    for row in result["rows"]:
+        unit = "ms" if row["name"] == "build graph" else "ms per query"
+        print(f"  {row['name']:<12}{row['median_ms']:>10.2f} {unit}",
+              file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--data", default="./synthetic")
+    parser.add_argument("--generate", action="store_true",
+                        help="generate the scaled dataset if it is missing")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="also append the report here")
+    args = parser.parse_args(argv)
+
+    data_dir = scaled_dir(args.data, args.scale)
+    if not os.path.isdir(data_dir):
+        if not args.generate:
+            parser.error(f"{data_dir} is missing, pass --generate")
+        generate(args.scale, output=args.data)
+    result = run(data_dir, args.scale, args.queries, args.repeat)
+    print_teammate_graph_report(result)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            print_teammate_graph_report(result, file=file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from metrics import record_cache
+
+
+__all__ = [
+    "cached_callbacks",
+    "memoize",
+]
+
+
+# Number of results kept per memoized callback
+CACHE_SIZE = int(os.environ.get("DASHBOARD_FIGURE_CACHE_SIZE", "128"))
+# When set, every cache miss is appended to this JSON-lines file so real
+# traffic can later drive the startup warming (see warmup.py).
+RECORD_PATH = os.environ.get("DASHBOARD_WARMUP_RECORD")
+
+_registry = {}
+_record_lock = threading.Lock()
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item))
+                            for key, item in value.items()))
+    return value
+
+
+def _record(name, args):
+    line = json.dumps({"callback": name, "args": list(args)})
+    with _record_lock, open(RECORD_PATH, "a", encoding="utf-8") as file:
+        file.write(line + "\n")
+
+
+def memoize(fn=None, *, name=None, maxsize=CACHE_SIZE):
+    """Keep the last ``maxsize`` results of a callback, keyed by its inputs.
+
+    Returned figures are shared between requests and must not be mutated.
+    Memoized callbacks are registered under ``name`` so the startup
+    warming can call them.
+    """
+    if fn is None:
+        return lambda f: memoize(f, name=name, maxsize=maxsize)
+
+    cache_name = name or fn.__name__
+    entries = OrderedDict()
+    lock = threading.Lock()
+
+    @wraps(fn)
+    def wrapper(*args):
+        key = _freeze(args)
+        with lock:
+            hit = key in entries
+            if hit:
+                entries.move_to_end(key)
+                value = entries[key]
+        record_cache(cache_name, hit)
+        if hit:
+            return value
+
+        if RECORD_PATH:
+            _record(cache_name, args)
+        value = fn(*args)
+        with lock:
+            entries[key] = value
+            while len(entries) > maxsize:
+                entries.popitem(last=False)
+        return value
+
+    _registry[cache_name] = wrapper
+    return wrapper
+
+
+def cached_callbacks():
+    """Memoized callbacks by name"""
+    return dict(_registry)
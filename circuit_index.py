@@ -0,0 +1,95 @@
+from collections import defaultdict
+from math import cos, floor, radians
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "CircuitIndex",
+    "EARTH_RADIUS_KM",
+]
+
+
+EARTH_RADIUS_KM = 6371.0
+_KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+
+class CircuitIndex:
+    """Row positions of the circuits table by name/circuitRef and location.
+
+    Positions are the iloc positions in the table the index was built
+    from. Locations are bucketed into a grid of ``cell_degrees`` squares,
+    so a radius query only measures the circuits of the cells around it.
+    """
+
+    def __init__(self, circuits: pd.DataFrame, cell_degrees=5.0):
+        self.positions_by_name = {name: position for position, name
+                                  in enumerate(circuits["name"])}
+        self.positions_by_ref = {ref: position for position, ref
+                                 in enumerate(circuits["circuitRef"])}
+        self.cell_degrees = cell_degrees
+        self.lat = np.radians(circuits["lat"].to_numpy(dtype=float))
+        self.lng = np.radians(circuits["lng"].to_numpy(dtype=float))
+
+        cells = defaultdict(list)
+        for position, (lat, lng) in enumerate(zip(circuits["lat"],
+                                                  circuits["lng"])):
+            cells[self._cell(lat, lng)].append(position)
+        self.cells = {cell: np.array(positions)
+                      for cell, positions in cells.items()}
+
+    def _cell(self, lat, lng):
+        return (floor(lat / self.cell_degrees),
+                floor((lng + 180) % 360 / self.cell_degrees))
+
+    def position(self, key):
+        """Position of the circuit with this name or circuitRef, or None"""
+        position = self.positions_by_name.get(key)
+        if position is None:
+            position = self.positions_by_ref.get(key)
+        return position
+
+    def positions(self, keys):
+        """Positions of the known circuits among ``keys``, in order"""
+        positions = (self.position(key) for key in keys or ())
+        return [position for position in positions if position is not None]
+
+    def _candidates(self, lat, lng, radius_km):
+        lat_span = radius_km / _KM_PER_DEGREE
+        max_lat = min(abs(lat) + lat_span, 90)
+        rows = range(floor((lat - lat_span) / self.cell_degrees),
+                     floor((lat + lat_span) / self.cell_degrees) + 1)
+        columns_total = round(360 / self.cell_degrees)
+        if max_lat >= 89:
+            columns = range(columns_total)
+        else:
+            lng_span = lat_span / cos(radians(max_lat))
+            first = floor((lng - lng_span + 180) / self.cell_degrees)
+            last = floor((lng + lng_span + 180) / self.cell_degrees)
+            columns = {column % columns_total
+                       for column in range(first, last + 1)}
+        found = [self.cells[(row, column)]
+                 for row in rows for column in columns
+                 if (row, column) in self.cells]
+        return (np.concatenate(found) if found
+                else np.empty(0, dtype=np.intp))
+
+    def nearby(self, position, radius_km):
+        """Other circuits within ``radius_km`` as (position, km), nearest
+        first"""
+        lat = np.degrees(self.lat[position])
+        lng = np.degrees(self.lng[position])
+        candidates = self._candidates(lat, lng, radius_km)
+        candidates = candidates[candidates != position]
+        # Haversine distance to the candidates
+        half_dlat = (self.lat[candidates] - self.lat[position]) / 2
+        half_dlng = (self.lng[candidates] - self.lng[position]) / 2
+        a = (np.sin(half_dlat) ** 2
+             + np.cos(self.lat[position]) * np.cos(self.lat[candidates])
+             * np.sin(half_dlng) ** 2)
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+        within = distances <= radius_km
+        order = np.argsort(distances[within], kind="stable")
+        return [(int(candidate), float(distance)) for candidate, distance
+                in zip(candidates[within][order], distances[within][order])]
@@ -1,10 +1,26 @@
 from dash import Input, Output, State, callback_context, html, dcc, no_update
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 from country import alpha2_codes
+from functools import lru_cache
 from math import ceil, floor
 import numpy as np
-from app import app
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from circuit_index import CircuitIndex
+from encoding import typed_array
+from filter_search import circuit_search
+from formatting import (
+    lap_time_hovertext,
+    lap_times_ms,
+    lap_times_s,
+    season_ranges,
+)
+from figure_dicts import TEMPLATE, figure, validated, vline
+from lap_time_store import ALL_CIRCUITS, build_lap_time_store
+from lazy_sections import gate, initial, loaded, section
+from metrics import instrument
+from profiling import step
 from source import (
     circuits_df,
     circuits_extras_df,
@@ -12,7 +28,7 @@ from source import (
     races_df,
     rule_changes_df,
 )
-from utils import Colors
+from utils import Colors, rgba
 
 def get_circuits_info(circuits, races, circuits_extras) -> pd.DataFrame:
     # Count number of races per circuitId
@@ -37,36 +53,16 @@ def get_circuits_info(circuits, races, circuits_extras) -> pd.DataFrame:
     circuits_with_counts["race_count"] = \
         circuits_with_counts["race_count"].fillna(0).astype(int)
 
-    seasons = \
-        circuits_with_counts.apply(
-            lambda row: ("0"
-                         if (pd.isna(row["min_year"])
-                             or pd.isna(row["max_year"]))
-                         else f'{row["race_count"]} ({row["min_year"]})'
-                         if row["min_year"] == row["max_year"]
-                         else (f'{row["race_count"]} ({row["min_year"]} - '
-                               + f'{row["max_year"]})')),
-            axis=1
-        )
-    circuits_with_counts["seasons"] = seasons
+    circuits_with_counts["seasons"] = season_ranges(
+        circuits_with_counts["race_count"],
+        circuits_with_counts["min_year"],
+        circuits_with_counts["max_year"])
 
     circuits_with_counts.set_index("circuitId", inplace=True)
 
     return circuits_with_counts
 
 
-def format_lap_time_ms(ms):
-    minutes = ms // 60000
-    seconds = (ms % 60000) / 1000
-    return f"{minutes:.0f}:{seconds:06.3f}"
-
-
-def format_lap_time_s(ms):
-    minutes = ms // 60000
-    seconds = (ms % 60000) // 1000
-    return f"{minutes}:{seconds:02d}"
-
-
 def get_fastest_lap_times(circuits: pd.DataFrame,
                           races: pd.DataFrame,
                           lap_times: pd.DataFrame,
@@ -96,10 +92,8 @@ def get_fastest_lap_times(circuits: pd.DataFrame,
         .sort_values(["year", "circuitId"])
     )
 
-    fastest_per_circuit_year["fastest_lap"] = \
-        fastest_per_circuit_year["fastest_milliseconds"].apply(
-            format_lap_time_ms
-    )
+    fastest_per_circuit_year["fastest_lap"] = lap_times_ms(
+        fastest_per_circuit_year["fastest_milliseconds"])
 
     fastest_per_circuit_year = fastest_per_circuit_year.merge(
         rule_changes[["year", "impact", "label"]],
@@ -107,18 +101,40 @@ def get_fastest_lap_times(circuits: pd.DataFrame,
         how="left"
     )
 
-    fastest_per_circuit_year["hovertext"] = fastest_per_circuit_year.apply(
-        lambda row: (
-            (f"({row['impact']}) {row['label']}<br />"
-             f"<b>{row['fastest_lap']}</b>")
-            if pd.notna(row["label"]) and pd.notna(row["impact"])
-            else f"<b>{row['fastest_lap']}</b>"),
-        axis=1,
-    )
+    fastest_per_circuit_year["hovertext"] = lap_time_hovertext(
+        fastest_per_circuit_year["fastest_lap"],
+        fastest_per_circuit_year["impact"],
+        fastest_per_circuit_year["label"])
 
     return fastest_per_circuit_year
 
 
+def get_season_average_lap_times(fastest_lap_times: pd.DataFrame,
+                                 rule_changes: pd.DataFrame) -> pd.DataFrame:
+    """Mean of the per-circuit fastest laps for every season"""
+    season_averages = (fastest_lap_times
+                       .groupby("year", as_index=False)
+                       .agg(fastest_milliseconds=("fastest_milliseconds",
+                                                  "mean"))
+                       .sort_values("year"))
+    # Whole milliseconds, so y is sent as an int32 typed array
+    season_averages["fastest_milliseconds"] = (
+        season_averages["fastest_milliseconds"].round().astype("int32"))
+    season_averages["fastest_lap"] = lap_times_ms(
+        season_averages["fastest_milliseconds"])
+
+    season_averages = season_averages.merge(
+        rule_changes[["year", "impact", "label"]],
+        on="year",
+        how="left"
+    )
+    season_averages["hovertext"] = lap_time_hovertext(
+        season_averages["fastest_lap"],
+        season_averages["impact"],
+        season_averages["label"])
+    return season_averages
+
+
 def transform_rule_changes(rule_changes: pd.DataFrame) -> pd.DataFrame:
     rule_changes["impact"] = rule_changes["impact"].apply(
         lambda x: x.capitalize() if pd.notna(x) else x
@@ -137,10 +153,24 @@ def get_circuits_data():
                                               lap_times_df,
                                               rule_changes)
 
-    return circuits_info, fastest_lap_times, rule_changes
+    season_averages = get_season_average_lap_times(fastest_lap_times,
+                                                   rule_changes)
+
+    return circuits_info, fastest_lap_times, season_averages, rule_changes
+
 
+with step("get_circuits_data"):
+    (circuits,
+     fastest_lap_times,
+     season_average_lap_times,
+     rule_changes) = get_circuits_data()
 
-circuits, fastest_lap_times, rule_changes = get_circuits_data()
+with step("lap time store"):
+    lap_time_store = build_lap_time_store(fastest_lap_times,
+                                          season_average_lap_times)
+
+with step("circuit index"):
+    circuit_index = CircuitIndex(circuits)
 
 
 selected_circuit = None
@@ -151,9 +181,7 @@ def circuit_index_from_map_click(clickData):
         return None
 
     point = clickData["points"][0]
-    row = circuits[circuits["name"] == point["hovertext"]].iloc[0]
-    index = circuits.index.get_loc(row.name)
-    return index
+    return circuit_index.position(point["hovertext"])
 
 
 def circuit_from_map_click(clickData):
@@ -163,160 +191,145 @@ def circuit_from_map_click(clickData):
     return circuits.iloc[index]
 
 
-def draw_fastest_lap_times_line_chart(filterValue, season_filter=None):
-    if (filterValue is None or len(filterValue) == 0):
-        filterValue = []
+# Layout shared by every lap time chart, validated once; fonts and
+# colours come from the "dashboard" template and the rule change lines
+# are the same for all selections.
+LAP_CHART_LAYOUT = validated(go.Layout(
+    xaxis=dict(anchor="y", domain=[0, 1], title_text="Year", dtick=2),
+    yaxis=dict(anchor="x", domain=[0, 1], title_text="Fastest Lap Time",
+               tickmode="array"),
+    legend_tracegroupgap=0,
+    hovermode="x unified",
+    hoverlabel_font_color=Colors.SECONDARY,
+    shapes=[vline(year, color=Colors.SECONDARY, dash="dash")
+            for year in rule_changes["year"]],
+))
+COLORWAY = TEMPLATE["layout"]["colorway"]
 
-    selected_circuits = (circuits[circuits["name"].isin(filterValue)]
-                         if filterValue is not None and len(filterValue) > 0
-                         else pd.DataFrame(columns=circuits.columns))
-    if len(selected_circuits) == 0:
-        if season_filter:
-            circuit_lap_times = fastest_lap_times[
-                (fastest_lap_times["year"] >= season_filter[0])
-                & (fastest_lap_times["year"] <= season_filter[1])
-            ]
-        else:
-            circuit_lap_times = fastest_lap_times
-
-        circuit_lap_times = (circuit_lap_times
-                             .groupby("year", as_index=False)
-                             .agg(fastest_milliseconds=("fastest_milliseconds",
-                                                        "mean"))
-                             .sort_values("year"))
-        circuit_lap_times["fastest_lap"] = \
-            circuit_lap_times["fastest_milliseconds"].apply(
-                format_lap_time_ms
-        )
 
-        circuit_lap_times = circuit_lap_times.merge(
-            rule_changes[["year", "impact", "label"]],
-            on="year",
-            how="left"
-        )
+@lru_cache(maxsize=256)
+def _lap_time_ticks(min_time, max_time, step_ms):
+    tick_values = np.arange(min_time, max_time + 1, step_ms)
+    return (typed_array(tick_values),
+            tuple(lap_times_s(tick_values).tolist()))
 
-        circuit_lap_times["hovertext"] = circuit_lap_times.apply(
-            lambda row: (
-                (f"({row['impact']}) {row['label']}<br />"
-                 f"<b>{row['fastest_lap']}</b>")
-                if pd.notna(row["label"]) and pd.notna(row["impact"])
-                else f"<b>{row['fastest_lap']}</b>"),
-            axis=1,
-        )
-        first_circuit = None
-    else:
-        first_circuit = selected_circuits.iloc[0]["circuitRef"]
-
-        lap_times_mask = (fastest_lap_times["circuitRef"]
-                          .isin(selected_circuits["circuitRef"]))
-        circuit_lap_times = fastest_lap_times[lap_times_mask]
-        if season_filter:
-            circuit_lap_times = circuit_lap_times[
-                (circuit_lap_times["year"] >= season_filter[0])
-                & (circuit_lap_times["year"] <= season_filter[1])
-            ]
-
-    times_with_format = circuit_lap_times[
-        ["fastest_lap", "fastest_milliseconds"]
-    ].sort_values(
-        by="fastest_milliseconds",
-    )
-    fig = px.line(
-        circuit_lap_times,
-        x="year",
-        y="fastest_milliseconds",
-        color=("circuitRef" if len(selected_circuits) > 0 else None),
-        title=("Fastest Lap Times at selected circuits"
-               if len(selected_circuits) > 0
-               else "Average Fastest Lap Times Across All Circuits"),
-        labels={
-            "year": "Year",
-            "fastest_milliseconds": "Fastest Lap Time",
-            "circuitRef": "Circuit",
-        },
-        markers=True,
-        category_orders={
-            "fastest_lap": times_with_format["fastest_lap"].values.tolist()
-        },
-        range_x=[circuit_lap_times["year"].min() - 1,
-                 circuit_lap_times["year"].max() + 1],
-        custom_data=["fastest_lap", "hovertext"],
-    )
 
-    min_time_raw = circuit_lap_times["fastest_milliseconds"].min()
+def lap_time_ticks(min_time_raw, max_time_raw, step_ms=4000):
+    """Whole-second y ticks every ``step_ms`` over a lap time range"""
     min_time = (floor(min_time_raw / 1000) * 1000
                 if not np.isnan(min_time_raw) else 60_000)
-
-    max_time_raw = circuit_lap_times["fastest_milliseconds"].max()
     max_time = (ceil(max_time_raw / 1000) * 1000
                 if not np.isnan(max_time_raw) else 120_000)
 
-    # Change the step value here (currently 1000 for 1 second)
-    step_ms = 4000  # For 2-second intervals
-    ticks_vals = np.arange(min_time, max_time + 1, step_ms)
-    ticks_texts = list(map(format_lap_time_s, ticks_vals))
+    tick_values, tick_texts = _lap_time_ticks(int(min_time),
+                                              int(max_time),
+                                              step_ms)
+    return tick_values, list(tick_texts)
+
+
+def lap_time_trace(series, ref, name, color, hovertemplate):
+    return {
+        "type": "scatter",
+        "x": typed_array(series.years),
+        "y": typed_array(series.milliseconds),
+        "customdata": series.customdata.tolist(),
+        "hovertemplate": hovertemplate,
+        "legendgroup": ref,
+        "line": {"color": color, "dash": "solid"},
+        "marker": {"symbol": "circle"},
+        "mode": "lines+markers",
+        "name": name,
+        "orientation": "v",
+        "showlegend": ref != ALL_CIRCUITS,
+        "xaxis": "x",
+        "yaxis": "y",
+    }
 
-    for _, rule_change in rule_changes.iterrows():
-        fig.add_vline(
-            x=rule_change["year"],
-            line_dash="dash",
-            line_color=Colors.SECONDARY,
-        )
-    fig.update_layout(
-        xaxis=dict(
-            dtick=2,
-            tick0=circuit_lap_times["year"].min()
-        ),
-        yaxis=dict(
-            tickmode="array",
-            tickvals=ticks_vals,
-            ticktext=ticks_texts,
-        ),
-        hovermode="x unified",
-        font_family="Poppins",
-        plot_bgcolor="#FFFFFF",
-        title_font_color=Colors.BLACK,
-        xaxis_title_font_color=Colors.SECONDARY,
-        yaxis_title_font_color=Colors.SECONDARY,
-        yaxis_tickfont_color=Colors.SECONDARY,
-        xaxis_tickfont_color=Colors.SECONDARY,
-        legend_font_color=Colors.SECONDARY,
-        legend_title_font_color=Colors.BLACK,
-        hoverlabel_font_color=Colors.SECONDARY,
-    )
-    
-    if len(selected_circuits) == 0:
-        fig.update_traces(line_color=Colors.BLACK)
-        
-    fig.update_traces(
-        hovertemplate="%{customdata[1]}<br><extra></extra>",
-    )
 
-    if first_circuit is None:
-        return fig
+def draw_fastest_lap_times_line_chart(filterValue, season_filter=None):
+    if (filterValue is None or len(filterValue) == 0):
+        filterValue = []
 
-    fig.for_each_trace(
-        lambda trace: trace.update(
-            hovertemplate=("<b>%{customdata[0]}</b><br><extra></extra>"
-                           if trace.name != first_circuit
-                           else "%{customdata[1]}<br><extra></extra>"),
-            name=selected_circuits[
-                selected_circuits["circuitRef"] == trace.name
-            ]["name"].values[0],
-        )
-    )
+    selected_circuits = circuits[circuits["name"].isin(filterValue)]
+    if len(selected_circuits) == 0:
+        selected = {ALL_CIRCUITS: lap_time_store[ALL_CIRCUITS].between(
+            season_filter)}
+    else:
+        selected = {ref: lap_time_store[ref].between(season_filter)
+                    for ref in selected_circuits["circuitRef"]
+                    if ref in lap_time_store}
+        # Order the lines by their first season, then circuitId
+        selected = dict(sorted(
+            ((ref, series) for ref, series in selected.items()
+             if len(series.years)),
+            key=lambda item: (item[1].years[0], item[1].circuit_id)))
+
+    years = [series.years for series in selected.values()
+             if len(series.years)]
+    milliseconds = [series.milliseconds for series in selected.values()
+                    if len(series.milliseconds)]
+    min_year = min(year[0] for year in years) if years else np.nan
+    max_year = max(year[-1] for year in years) if years else np.nan
+    tick_values, tick_texts = lap_time_ticks(
+        min(ms.min() for ms in milliseconds) if milliseconds else np.nan,
+        max(ms.max() for ms in milliseconds) if milliseconds else np.nan)
+
+    layout = {
+        "title": {"text": ("Fastest Lap Times at selected circuits"
+                           if len(selected_circuits) > 0
+                           else "Average Fastest Lap Times Across All "
+                                "Circuits")},
+        "xaxis": {"range": [min_year - 1, max_year + 1],
+                  "tick0": min_year},
+        "yaxis": {"tickvals": tick_values, "ticktext": tick_texts},
+    }
 
-    return fig
+    if len(selected_circuits) == 0:
+        return figure([lap_time_trace(selected[ALL_CIRCUITS],
+                                      ALL_CIRCUITS,
+                                      "",
+                                      Colors.BLACK,
+                                      "%{customdata[1]}<br><extra></extra>")],
+                      LAP_CHART_LAYOUT, layout)
+
+    first_circuit = selected_circuits.iloc[0]["circuitRef"]
+    names = selected_circuits.set_index("circuitRef")["name"]
+    traces = [
+        lap_time_trace(series, ref, names[ref],
+                       COLORWAY[index % len(COLORWAY)],
+                       ("<b>%{customdata[0]}</b><br><extra></extra>"
+                        if ref != first_circuit
+                        else "%{customdata[1]}<br><extra></extra>"))
+        for index, (ref, series) in enumerate(selected.items())
+    ]
+    if not traces:
+        # Without data add_vline added no rule change lines either
+        return figure([], {key: value
+                           for key, value in LAP_CHART_LAYOUT.items()
+                           if key != "shapes"}, layout)
+    return figure(traces, LAP_CHART_LAYOUT, layout,
+                  {"legend": {"title": {"text": "Circuit"}}})
 
 
 app.callback(
     Output("circuits-lap-times", "figure"),
+    loaded("circuits"),
     Input("circuit-filter", "value"),
-    Input("year-range-slider", "value")
-)(draw_fastest_lap_times_line_chart)
+    Input("year-range-slider", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(draw_fastest_lap_times_line_chart))))
+
 
+def nearby_circuit_positions(filterValue, radius_km):
+    """Circuits within ``radius_km`` of the last selected circuit"""
+    selected = circuit_index.positions(filterValue)
+    if not selected or not radius_km:
+        return []
+    return circuit_index.nearby(selected[-1], radius_km)
 
-def draw_circuits_map(clickData=None, filterValue=None, inContext=False):
+
+def draw_circuits_map(clickData=None, filterValue=None, inContext=False,
+                      radius_km=None):
     fig = px.scatter_geo(
         circuits,
         lat="lat",
@@ -372,14 +385,12 @@ def draw_circuits_map(clickData=None, filterValue=None, inContext=False):
         selected_idx = circuit_index_from_map_click(clickData)
         if selected_idx is not None:
             colors[selected_idx] = Colors.PRIMARY
-    elif (trigger == "circuit-filter"
-          and filterValue is not None
-          and len(filterValue) > 0):
-        for value in filterValue:
-            row = circuits[circuits["name"] == value].iloc[0]
-            selected_idx = circuits.index.get_loc(row.name)
-            if selected_idx is not None:
-                colors[selected_idx] = Colors.PRIMARY
+    elif filterValue:
+        # Also when the section loads with circuits already selected
+        for position, _ in nearby_circuit_positions(filterValue, radius_km):
+            colors[position] = rgba(Colors.PRIMARY, 0.5)
+        for selected_idx in circuit_index.positions(filterValue):
+            colors[selected_idx] = Colors.PRIMARY
     else:
         return fig
 
@@ -390,15 +401,20 @@ def draw_circuits_map(clickData=None, filterValue=None, inContext=False):
 
 app.callback(
     Output("circuits-map", "figure"),
+    loaded("circuits"),
     Input("circuit-filter", "value"),
-)(lambda filterValue: draw_circuits_map(filterValue=filterValue,
-                                        inContext=True))
+    Input("nearby-radius", "value"),
+)(instrument(
+    gate(lambda filterValue, radius_km: draw_circuits_map(
+        filterValue=filterValue, inContext=True, radius_km=radius_km)),
+    name="draw_circuits_map",
+))
 
 
 def select_circuit_filter_from_map(clickData, filterValue):
     row = circuit_from_map_click(clickData)
     if row is None:
-        return no_update
+        return no_update, no_update
 
     circuit_name = row["name"]
     if filterValue is None:
@@ -406,15 +422,20 @@ def select_circuit_filter_from_map(clickData, filterValue):
 
     if circuit_name in filterValue:
         filterValue.remove(circuit_name)
-        return filterValue
-    return filterValue + [circuit_name]
+    else:
+        filterValue = filterValue + [circuit_name]
+    # The dropdown drops values missing from its options, and the layout
+    # only carries the top circuits
+    return filterValue, circuit_search.options_for(None, filterValue)
 
 
 app.callback(
     Output("circuit-filter", "value"),
+    Output("circuit-filter", "options", allow_duplicate=True),
     Input("circuits-map", "clickData"),
     State("circuit-filter", "value"),
-)(select_circuit_filter_from_map)
+    prevent_initial_call=True,
+)(instrument(select_circuit_filter_from_map))
 
 
 def _draw_circuit_info_children(title: str,
@@ -485,10 +506,20 @@ DEFAULT_CIRCUIT_INFO = [
 ]
 
 
-def draw_circuit_info_children(filterValue):
-    row = (None
-           if filterValue is None or len(filterValue) == 0
-           else circuits[circuits["name"] == filterValue[-1]].iloc[0])
+def nearby_circuits_text(filterValue, radius_km, shown=3):
+    nearby = nearby_circuit_positions(filterValue, radius_km)
+    if not nearby:
+        return "None"
+    names = [f"{circuits.iloc[position]['name']} ({distance:.0f} km)"
+             for position, distance in nearby[:shown]]
+    if len(nearby) > shown:
+        names.append(f"+{len(nearby) - shown} more")
+    return ", ".join(names)
+
+
+def draw_circuit_info_children(filterValue, radius_km=None):
+    positions = circuit_index.positions(filterValue)
+    row = circuits.iloc[positions[-1]] if positions else None
 
     if row is None:
         return _draw_circuit_info_children(*DEFAULT_CIRCUIT_INFO)
@@ -504,6 +535,10 @@ def draw_circuit_info_children(filterValue):
             ("Fastest Lap", f"{row['fastest_lap']}"),
             ("Fastest Race Lap", f"{row['fastest_race_lap']}"),
             ("Seasons", f"{row['seasons']}"),
+            *([] if not radius_km else [
+                (f"Within {radius_km} km",
+                 nearby_circuits_text(filterValue, radius_km)),
+            ]),
         ],
         alpha2_codes.get(row["country"])
     )
@@ -512,16 +547,24 @@ def draw_circuit_info_children(filterValue):
 app.callback(
     Output("circuit-info", "children"),
     Input("circuit-filter", "value"),
-)(draw_circuit_info_children)
+    Input("nearby-radius", "value"),
+)(instrument(draw_circuit_info_children))
+
 
+with step("initial circuit map figures"):
+    initial_map_figure = initial(draw_circuits_map)
+    initial_lap_times_figure = initial(draw_fastest_lap_times_line_chart,
+                                       None)
 
-layout = html.Div(
-    [   
+
+layout = section(
+    "circuits",
+    [
         html.H1("Circuit Locations"),
         html.Div(
             [
                 dcc.Graph(
-                    figure=draw_circuits_map(),
+                    figure=initial_map_figure,
                     id="circuits-map",
                     className="circuits-map",
                 ),
@@ -533,8 +576,27 @@ layout = html.Div(
             ],
             className="circuits-map-info_container",
         ),
+        html.Div(
+            [
+                html.Span("Nearby circuits (km)",
+                          className="circuits-nearby_label"),
+                html.Div(
+                    dcc.Slider(
+                        min=0,
+                        max=2000,
+                        step=100,
+                        value=0,
+                        marks={0: "Off", 500: "500", 1000: "1000",
+                               1500: "1500", 2000: "2000"},
+                        id="nearby-radius",
+                    ),
+                    className="circuits-nearby_slider",
+                ),
+            ],
+            className="circuits-nearby",
+        ),
         dcc.Graph(
-            figure=draw_fastest_lap_times_line_chart(None),
+            figure=initial_lap_times_figure,
             id="circuits-lap-times",
         )
     ],
@@ -1,9 +1,15 @@
 from dash import html, dcc, Input, Output
 import dash_daq as daq
+import numpy as np
 import pandas as pd
-import plotly.express as px
-
-from app import app
+import plotly.graph_objects as go
+
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from encoding import category_codes, compact_ints, discrete_colorscale
+from figure_pool import offload
+from lazy_sections import gate, loaded, section
+from metrics import instrument
+from profiling import step
 from source import (
     circuit_names_wrapped,
     circuit_names,
@@ -14,67 +20,41 @@ from source import (
 )
 from teams import map_team, team_colors
 from utils import Colors
+from win_cube import build_win_cube
 
 """
 ================================================================================
-                Create circuit-constructor-driver finalists dataframe,
-                grouped by count
+                Race wins per circuit, constructor and driver
 ================================================================================
 """
 
 
-PARCATS_CACHE = (None, None)
-
-
-def get_parcats_data(season_filter=None):
-    global PARCATS_CACHE
-    (cache_data, cache_season) = PARCATS_CACHE
-    if cache_data is not None:
-        if season_filter is None and cache_season is None:
-            return cache_data
-        if season_filter is not None and cache_season is not None:
-            if (cache_season[0] == season_filter[0]
-                    and cache_season[1] == season_filter[1]):
-                return cache_data
-
-    results_winners = results_df[results_df["position"] == 1][[
-        "raceId", "constructorId", "driverId"]].dropna()
-
-    if season_filter is not None:
-        races = races_df[races_df["year"].between(
-            season_filter[0], season_filter[1])]
-    else:
-        races = races_df
-    races = races[["raceId", "circuitId"]].dropna()
-
-    df_plot = pd.merge(
-        results_winners,
-        races,
-        on="raceId",
-        how="inner"
-    ).dropna(subset=["circuitId", "constructorId", "driverId"]).astype({
-        "circuitId": int,
-        "constructorId": int,
-        "driverId": int,
-    })
-
-    # Calculate total number of values in the dataframe
-    total_values = len(df_plot)
-
-    # Add labels
-    df_plot["Circuit"] = df_plot["circuitId"].map(circuit_names)
-    df_plot["Circuit_labels"] = df_plot["circuitId"].map(circuit_names_wrapped)
-    df_plot["Constructor"] = df_plot["constructorId"].map(constructor_names)
-    df_plot["Driver"] = df_plot["driverId"].map(driver_names)
-    df_plot["team_group"] = df_plot["Constructor"].apply(map_team)
-    df_plot["color"] = df_plot["team_group"].map(team_colors)
-
-    PARCATS_CACHE = ((df_plot, total_values), season_filter)
-
-    return df_plot, total_values
+with step("win cube"):
+    win_cube = build_win_cube(results_df, races_df)
+
+# Labels and line colors of the cube rows, by parcats column
+cube_labels = {
+    "Circuit": np.array([circuit_names.get(circuit_id, str(circuit_id))
+                         for circuit_id in win_cube.circuit_ids],
+                        dtype=object),
+    "Circuit_labels": np.array([
+        circuit_names_wrapped.get(circuit_id, str(circuit_id))
+        for circuit_id in win_cube.circuit_ids], dtype=object),
+    "Constructor": np.array([
+        constructor_names.get(constructor_id, str(constructor_id))
+        for constructor_id in win_cube.constructor_ids], dtype=object),
+    "Driver": np.array([driver_names.get(driver_id, str(driver_id))
+                        for driver_id in win_cube.driver_ids],
+                       dtype=object),
+}
+cube_colors = np.array([team_colors.get(map_team(name), "#A0A0A0")
+                        for name in cube_labels["Constructor"]],
+                       dtype=object)
 
+total_values = int(win_cube.wins().sum())
 
-_, total_values = get_parcats_data()
+# Initial value of the "First N values" slider
+default_number_of_records = int(total_values/8)
 
 
 """
@@ -87,7 +67,7 @@ MAIN_DROPDOWN_STYLE = {
     "flex": "1",
 }
 
-layout = html.Div([
+layout = section("parcats", [
     html.H1(
         "Driver↔Team↔Circuit Win Relationships",
         style={"padding": "10px"}
@@ -153,7 +133,7 @@ layout = html.Div([
                         min=1,
                         max=total_values,
                         step=1,
-                        value=int(total_values/8),
+                        value=default_number_of_records,
                         marks=None,
                         tooltip={
                             "placement": "bottom",
@@ -196,6 +176,14 @@ layout = html.Div([
 """
 
 
+def selected_ids(names, selected):
+    """Ids whose name is selected, None when nothing is"""
+    if not selected:
+        return None
+    selected = set(selected)
+    return [item_id for item_id, name in names.items() if name in selected]
+
+
 def update_parcats(selected_circuits,
                    selected_constructors,
                    selected_drivers,
@@ -205,67 +193,66 @@ def update_parcats(selected_circuits,
                    sorting_column,
                    sorting_type,
                    sort_order_clicks):
-    dff, _ = get_parcats_data(season_filter)
-
     # ---- FILTERING ----
-    if selected_circuits:
-        dff = dff[dff["Circuit"].isin(selected_circuits)]
-
-    if selected_constructors:
-        dff = dff[dff["Constructor"].isin(selected_constructors)]
-
-    if selected_drivers:
-        dff = dff[dff["driverId"].isin(selected_drivers)]
+    rows, wins = win_cube.cells(
+        season_filter,
+        selected_ids(circuit_names, selected_circuits),
+        selected_ids(constructor_names, selected_constructors),
+        selected_drivers or None,
+    )
+    wins = wins.astype(np.int64)
 
     # ---- SORTING ----
     sort_ascending = (sort_order_clicks % 2) == 0
     arrow_text = "↓" if sort_ascending else "↑"
 
     if do_sort:
+        labels = pd.Series(cube_labels[sorting_column][rows])
         if sorting_type == "count":
-            circuit_constructor_driver_counts = dff.groupby(
-                ["circuitId", "constructorId", "driverId"]
-            ).size().reset_index(name="count")
-            circuit_constructor_driver_counts["Circuit"] = \
-                circuit_constructor_driver_counts["circuitId"].map(
-                    circuit_names
-            )
-            circuit_constructor_driver_counts["Circuit_labels"] = \
-                circuit_constructor_driver_counts["circuitId"].map(
-                    circuit_names_wrapped
-            )
-            circuit_constructor_driver_counts["Constructor"] = \
-                circuit_constructor_driver_counts["constructorId"].map(
-                    constructor_names
-            )
-            circuit_constructor_driver_counts["Driver"] = \
-                circuit_constructor_driver_counts["driverId"].map(
-                    driver_names
-            )
-            column_order = circuit_constructor_driver_counts.groupby(
-                sorting_column
-            )["count"].sum().sort_values(ascending=sort_ascending)
-            dff[sorting_column] = pd.Categorical(
-                dff[sorting_column],
-                categories=column_order.index,
-                ordered=True,
-            )
-            dff = dff.sort_values(by=sorting_column)
+            column_order = pd.Series(wins).groupby(labels).sum().sort_values(
+                ascending=sort_ascending)
+            ranks = labels.map(pd.Series(np.arange(len(column_order)),
+                                         index=column_order.index))
+            order = np.argsort(ranks.to_numpy(), kind="stable")
         else:
-            dff = dff.sort_values(by=sorting_column, ascending=sort_ascending)
+            order = labels.sort_values(ascending=sort_ascending,
+                                       kind="stable").index.to_numpy()
+        rows, wins = rows[order], wins[order]
 
-    # ---- FIRST number_of_records RECORDS ----
-    dff = dff.head(number_of_records)
+    # ---- FIRST number_of_records WINS ----
+    # The cell reaching the limit only contributes its first wins
+    before = np.cumsum(wins) - wins
+    kept = before < number_of_records
+    rows = rows[kept]
+    wins = np.minimum(wins[kept], number_of_records - before[kept])
 
     # ---- CREATING PARALLEL CATEGORIES FIGURE ----
-    fig = px.parallel_categories(
-        dff,
-        dimensions=["Driver", "Constructor", "Circuit_labels"],
-        color="color",
-        labels={
-            "Circuit_labels": "Circuit",
-        },
-    )
+    # Rows are sent as integer category codes (typed arrays) with the
+    # labels listed once per dimension, and colors as codes into a
+    # discrete colorscale.
+    dimensions = []
+    for column, label in (("Driver", "Driver"),
+                          ("Constructor", "Constructor"),
+                          ("Circuit_labels", "Circuit")):
+        codes, labels = category_codes(cube_labels[column][rows])
+        dimensions.append(go.parcats.Dimension(
+            label=label,
+            values=codes,
+            categoryorder="array",
+            categoryarray=list(range(len(labels))),
+            ticktext=labels,
+        ))
+    color_codes, colors = category_codes(cube_colors[rows])
+    fig = go.Figure(go.Parcats(
+        dimensions=dimensions,
+        counts=compact_ints(wins),
+        line=dict(
+            color=color_codes,
+            colorscale=discrete_colorscale(colors or ["#A0A0A0"]),
+            cmin=0,
+            cmax=max(len(colors) - 1, 1),
+        ),
+    ))
 
     fig.update_traces(
         labelfont=dict(size=16, color=Colors.BLACK),
@@ -290,6 +277,7 @@ app.callback(
     Output("parcats-graph", "figure"),
     Output("sort-order", "children"),
     # INPUTS
+    loaded("parcats"),
     Input("circuit-filter", "value"),
     Input("constructor-filter", "value"),
     Input("driver-filter", "value"),
@@ -298,5 +286,6 @@ app.callback(
     Input("sort-enable", "on"),
     Input("sort-by-column", "value"),
     Input("sort-by-parameter", "value"),
-    Input("sort-order", "n_clicks")
-)(update_parcats)
+    Input("sort-order", "n_clicks"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(offload(update_parcats)))))
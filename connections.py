@@ -0,0 +1,160 @@
+from dash import Input, Output, dcc, html
+from flask import jsonify, request
+
+from app import app
+from filter_search import driver_index, register_search
+from metrics import instrument
+from profiling import step
+from source import constructor_names, driver_names, races_df, results_df
+from teammate_graph import build_teammate_graph
+
+
+MAX_HOPS = 4
+
+with step("teammate graph"):
+    teammate_graph = build_teammate_graph(results_df, races_df)
+    # Only drivers in the graph can be picked
+    connections_search = driver_index(teammate_graph.slots)
+
+
+def driver_name(driver_id):
+    return driver_names.get(driver_id, str(driver_id))
+
+
+def connection_links(path):
+    """(first year, constructor name) of every link along ``path``"""
+    links = []
+    for driver_id, teammate_id in zip(path, path[1:]):
+        year, constructor_id = teammate_graph.link(driver_id, teammate_id)
+        links.append((year, constructor_names.get(constructor_id,
+                                                  str(constructor_id))))
+    return links
+
+
+def draw_connection(source_id, target_id):
+    if source_id is None or target_id is None:
+        return html.P("Pick two drivers to see how they are connected.",
+                      className="connections-hint")
+    path = teammate_graph.shortest_path(source_id, target_id)
+    if path is None:
+        return html.P(f"{driver_name(source_id)} and "
+                      f"{driver_name(target_id)} are not connected "
+                      "through teammates.", className="connections-hint")
+
+    steps = [html.Li(driver_name(path[0]), className="connections-driver")]
+    for driver_id, (year, constructor) in zip(path[1:],
+                                              connection_links(path)):
+        steps.append(html.Li(f"{constructor}, {year}",
+                             className="connections-link"))
+        steps.append(html.Li(driver_name(driver_id),
+                             className="connections-driver"))
+    links = len(path) - 1
+    return html.Div([
+        html.P(f"{links} teammate link{'s' if links != 1 else ''}",
+               className="connections-summary"),
+        html.Ol(steps, className="connections-path"),
+    ])
+
+
+def draw_neighbourhood(driver_id, hops):
+    if driver_id is None:
+        return None
+    driver_ids, distances = teammate_graph.neighbourhood(driver_id, hops)
+    counts = [int((distances == hop).sum()) for hop in range(1, hops + 1)]
+    return html.P(
+        f"{len(driver_ids)} drivers within {hops} teammate "
+        f"link{'s' if hops != 1 else ''} of {driver_name(driver_id)} ("
+        + ", ".join(f"{count} at {hop}"
+                    for hop, count in enumerate(counts, start=1))
+        + ")",
+        className="connections-summary")
+
+
+def update_connections(source_id, target_id, hops):
+    return (draw_connection(source_id, target_id),
+            draw_neighbourhood(source_id, hops or 1))
+
+
+app.callback(
+    Output("connections-path", "children"),
+    Output("connections-neighbourhood", "children"),
+    Input("connections-from", "value"),
+    Input("connections-to", "value"),
+    Input("connections-hops", "value"),
+)(instrument(update_connections))
+
+
+def _driver_json(driver_id):
+    return {"driverId": int(driver_id), "name": driver_name(int(driver_id))}
+
+
+def _path_endpoint():
+    """``/api/teammates/path?from=<driverId>&to=<driverId>``"""
+    source_id = request.args.get("from", type=int)
+    target_id = request.args.get("to", type=int)
+    if (source_id not in teammate_graph.slots
+            or target_id not in teammate_graph.slots):
+        return jsonify(error="unknown driverId"), 404
+    path = teammate_graph.shortest_path(source_id, target_id)
+    if path is None:
+        return jsonify(path=None, links=[])
+    return jsonify(
+        path=[_driver_json(driver_id) for driver_id in path],
+        links=[{"year": year, "constructor": constructor}
+               for year, constructor in connection_links(path)],
+    )
+
+
+def _neighbours_endpoint(driver_id):
+    """``/api/teammates/<driverId>/neighbours?hops=<1..MAX_HOPS>``"""
+    if driver_id not in teammate_graph.slots:
+        return jsonify(error="unknown driverId"), 404
+    hops = min(max(request.args.get("hops", 1, type=int), 1), MAX_HOPS)
+    driver_ids, distances = teammate_graph.neighbourhood(driver_id, hops)
+    return jsonify(
+        driver=_driver_json(driver_id),
+        hops=hops,
+        drivers=[dict(_driver_json(neighbour_id), hops=int(distance))
+                 for neighbour_id, distance in zip(driver_ids, distances)],
+    )
+
+
+app.server.add_url_rule("/api/teammates/path", "teammate_path",
+                        _path_endpoint)
+app.server.add_url_rule("/api/teammates/<int:driver_id>/neighbours",
+                        "teammate_neighbours", _neighbours_endpoint)
+
+
+register_search("connections-from", connections_search)
+register_search("connections-to", connections_search)
+
+layout = html.Div(
+    [
+        html.H1("Teammate Connections"),
+        html.Div([
+            dcc.Dropdown(
+                id="connections-from",
+                options=connections_search.options_for(None),
+                placeholder="From driver",
+                style={"flex": "1"},
+            ),
+            dcc.Dropdown(
+                id="connections-to",
+                options=connections_search.options_for(None),
+                placeholder="To driver",
+                style={"flex": "1"},
+            ),
+        ], className="connections-controls"),
+        html.Div(id="connections-path", children=draw_connection(None, None)),
+        html.H3("Teammate links away"),
+        dcc.Slider(
+            id="connections-hops",
+            min=1,
+            max=MAX_HOPS,
+            step=1,
+            value=2,
+        ),
+        html.Div(id="connections-neighbourhood"),
+    ],
+    className="connections-container",
+)
@@ -0,0 +1,108 @@
+from dash import Input, Output, dcc, html
+import numpy as np
+import plotly.graph_objects as go
+
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from constructor_progression import build_constructor_progression
+from encoding import typed_array
+from figure_dicts import TEMPLATE, figure, validated
+from lazy_sections import gate, initial, loaded, section
+from metrics import instrument
+from profiling import step
+from source import constructor_names, constructor_standings_df, races_df
+from teams import map_team, team_colors
+from utils import Colors
+
+
+with step("constructor progression"):
+    constructor_progression = build_constructor_progression(
+        constructor_standings_df, races_df)
+
+constructor_ids_by_name = {name: constructor_id for constructor_id, name
+                           in constructor_names.items()}
+# Race names of every season in round order, for the x axis
+race_names = {
+    int(year): [name.replace(" Grand Prix", "")
+                for name in races.sort_values("round")["name"]]
+    for year, races in races_df[races_df["raceId"].isin(
+        constructor_standings_df["raceId"])].groupby("year")
+}
+
+CONSTRUCTOR_CHAMPIONSHIP_LAYOUT = validated(go.Layout(
+    xaxis=dict(title_text="Round", tickmode="array", tickangle=-45,
+               showgrid=False),
+    yaxis=dict(title_text="Points"),
+    hovermode="x unified",
+    hoverlabel_font_color=Colors.SECONDARY,
+    legend_title_text="Constructor",
+))
+COLORWAY = TEMPLATE["layout"]["colorway"]
+
+
+def draw_constructor_championship(year=None, constructor_filter=None):
+    year = year or max(constructor_progression.years)
+    constructor_ids, points = constructor_progression.season(
+        year,
+        [constructor_ids_by_name.get(name) for name in constructor_filter]
+        if constructor_filter else None)
+    rounds = np.arange(1, points.shape[0] + 1, dtype=np.int16)
+
+    # Leader first in the legend
+    order = (np.argsort(-np.nan_to_num(points[-1]), kind="stable")
+             if len(rounds) else [])
+    traces = []
+    for index, column in enumerate(order):
+        name = constructor_names.get(constructor_ids[column],
+                                     str(constructor_ids[column]))
+        traces.append({
+            "type": "scatter",
+            "x": typed_array(rounds),
+            "y": typed_array(points[:, column]),
+            "mode": "lines+markers",
+            "line": {"color": team_colors.get(
+                map_team(name, year), COLORWAY[index % len(COLORWAY)])},
+            "marker": {"size": 5},
+            "name": name,
+            "hovertemplate": "%{fullData.name}: %{y} pts<extra></extra>",
+        })
+
+    return figure(traces, CONSTRUCTOR_CHAMPIONSHIP_LAYOUT, {
+        "title": {"text": f"{year} Constructors' Championship"},
+        "xaxis": {"tickvals": typed_array(rounds),
+                  "ticktext": race_names.get(year, [])[:len(rounds)]},
+    })
+
+
+app.callback(
+    Output("constructor-championship-chart", "figure"),
+    loaded("constructor-championship"),
+    Input("constructor-championship-season", "value"),
+    Input("constructor-filter", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(draw_constructor_championship))))
+
+
+with step("initial constructor championship figure"):
+    initial_constructor_championship_figure = initial(
+        draw_constructor_championship)
+
+layout = section(
+    "constructor-championship",
+    [
+        html.H1("Constructors' Championship"),
+        dcc.Dropdown(
+            id="constructor-championship-season",
+            options=[{"label": str(year), "value": year}
+                     for year in sorted(constructor_progression.years,
+                                        reverse=True)],
+            value=max(constructor_progression.years),
+            clearable=False,
+            style={"width": "10rem"},
+        ),
+        dcc.Graph(
+            figure=initial_constructor_championship_figure,
+            id="constructor-championship-chart",
+        ),
+    ],
+    className="constructor-championship-container",
+)
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "ConstructorProgression",
+    "build_constructor_progression",
+]
+
+
+def _grow(array, axis, size):
+    """``array`` with at least ``size`` slots along ``axis``, NaN filled"""
+    if array.shape[axis] >= size:
+        return array
+    shape = list(array.shape)
+    # Double, so appending one round or constructor at a time is amortised
+    shape[axis] = max(size, 2 * shape[axis])
+    grown = np.full(shape, np.nan, dtype=array.dtype)
+    grown[tuple(slice(0, length) for length in array.shape)] = array
+    return grown
+
+
+class ConstructorProgression:
+    """Championship points of every constructor after every round.
+
+    ``points[season, round, slot]`` holds the cumulative points after
+    round ``round + 1``, NaN before a constructor's first standing. Slots
+    number the constructors of each season separately, so the array stays
+    dense. The build allocates exactly the observed seasons, rounds and
+    constructors; ``append`` writes in place where a season still has
+    room and otherwise grows the full axis by doubling, so adding rounds
+    one at a time costs amortised constant time.
+    """
+
+    def __init__(self, points, season_years, rounds, constructor_ids):
+        self.points = points
+        self.season_slots = {year: slot
+                             for slot, year in enumerate(season_years)}
+        self.rounds = list(rounds)
+        self.constructor_ids = [list(ids) for ids in constructor_ids]
+        self.constructor_slots = [{constructor_id: slot
+                                   for slot, constructor_id in enumerate(ids)}
+                                  for ids in self.constructor_ids]
+
+    @property
+    def years(self):
+        return list(self.season_slots)
+
+    def _season_slot(self, year):
+        slot = self.season_slots.get(year)
+        if slot is None:
+            slot = len(self.season_slots)
+            self.season_slots[year] = slot
+            self.rounds.append(0)
+            self.constructor_ids.append([])
+            self.constructor_slots.append({})
+            self.points = _grow(self.points, 0, slot + 1)
+        return slot
+
+    def append(self, year, points_by_constructor):
+        """Add the standings after the next round of ``year``"""
+        season = self._season_slot(year)
+        ids, slots = (self.constructor_ids[season],
+                      self.constructor_slots[season])
+        for constructor_id in points_by_constructor:
+            if constructor_id not in slots:
+                slots[constructor_id] = len(ids)
+                ids.append(constructor_id)
+        round_index = self.rounds[season]
+        self.points = _grow(self.points, 1, round_index + 1)
+        self.points = _grow(self.points, 2, len(ids))
+        self.points[season, round_index,
+                    [slots[constructor_id]
+                     for constructor_id in points_by_constructor]] = list(
+            points_by_constructor.values())
+        self.rounds[season] += 1
+
+    def season(self, year, constructor_ids=None):
+        """(constructor ids, rounds x constructors points) of ``year``.
+
+        The points are a view of the array, optionally only the columns
+        of ``constructor_ids`` that raced that season.
+        """
+        season = self.season_slots.get(year)
+        if season is None:
+            return [], np.empty((0, 0), dtype=self.points.dtype)
+        ids = self.constructor_ids[season]
+        points = self.points[season, :self.rounds[season], :len(ids)]
+        if constructor_ids is not None:
+            slots = self.constructor_slots[season]
+            columns = [slots[constructor_id]
+                       for constructor_id in constructor_ids
+                       if constructor_id in slots]
+            return [ids[column] for column in columns], points[:, columns]
+        return ids, points
+
+
+def build_constructor_progression(
+        standings: pd.DataFrame,
+        races: pd.DataFrame) -> ConstructorProgression:
+    standings = standings[["raceId", "constructorId", "points"]].merge(
+        races[["raceId", "year", "round"]], on="raceId", how="inner")
+    season_years, seasons = np.unique(standings["year"],
+                                      return_inverse=True)
+    # Rounds without standings (cancelled) do not leave gaps
+    rounds = (standings.groupby("year")["round"].rank(method="dense")
+              .to_numpy(dtype=np.intp) - 1)
+    slots = standings.groupby("year")["constructorId"].transform(
+        lambda ids: pd.factorize(ids)[0]).to_numpy(dtype=np.intp)
+
+    season_rounds = np.zeros(len(season_years), dtype=np.intp)
+    np.maximum.at(season_rounds, seasons, rounds + 1)
+    constructor_ids = [[] for _ in season_years]
+    for season, slot, constructor_id in sorted(
+            set(zip(seasons, slots, standings["constructorId"]))):
+        constructor_ids[season].append(int(constructor_id))
+
+    points = np.full((len(season_years),
+                      int(season_rounds.max(initial=0)),
+                      int(slots.max(initial=-1)) + 1),
+                     np.nan, dtype=np.float32)
+    points[seasons, rounds, slots] = standings["points"].to_numpy()
+    return ConstructorProgression(points, season_years.tolist(),
+                                  season_rounds.tolist(), constructor_ids)
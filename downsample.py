@@ -0,0 +1,44 @@
+import numpy as np
+
+
+__all__ = [
+    "lttb",
+]
+
+
+def lttb(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; the points between are
+    split into ``threshold - 2`` buckets and from each the point forming
+    the largest triangle with the previously kept point and the mean of
+    the next bucket is kept. Series with at most ``threshold`` points
+    are returned whole.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    # Bucket i covers the points edges[i]:edges[i + 1]
+    edges = np.floor(np.linspace(1, size - 1, threshold - 1)).astype(np.intp)
+    counts = np.diff(edges)
+    # Mean of every bucket, and the last point as the "next bucket" of the
+    # final one
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0], kept[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # Twice the triangle area, up to sign
+        areas = np.abs((x[previous] - mean_x[bucket + 1])
+                       * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop])
+                       * (mean_y[bucket + 1] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
@@ -41,7 +41,36 @@ def get_wikipedia_image(wiki_url):
     return None
 
 
-def create_driver_card(driver_data, link):
+def create_teammate_table(teammates):
+    """Head-to-head table, wins-losses against every teammate"""
+    def seasons(row):
+        if row['first_year'] == row['last_year']:
+            return str(row['first_year'])
+        return f"{row['first_year']}-{str(row['last_year'])[2:]}"
+
+    def score(wins, total):
+        return f"{wins}-{total - wins}" if total else "-"
+
+    return html.Div([
+        html.P("Teammate Head-to-Head:", className="teams-label"),
+        html.Table([
+            html.Thead(html.Tr([html.Th("Teammate"), html.Th("Seasons"),
+                                html.Th("Race"), html.Th("Quali")])),
+            html.Tbody([
+                html.Tr([
+                    html.Td(row['teammate']),
+                    html.Td(seasons(row)),
+                    html.Td(score(row['race_wins'], row['races'])),
+                    html.Td(score(row['qualifying_wins'],
+                                  row['qualifyings'])),
+                ])
+                for _, row in teammates.iterrows()
+            ]),
+        ], className="teammates-table"),
+    ], className="teammates-section")
+
+
+def create_driver_card(driver_data, link, teammates=None):
     """Create enhanced driver card with photo and career timeline button"""
     driver_name = driver_data['driver_name']
     # Get Wikipedia image
@@ -74,6 +103,8 @@ def create_driver_card(driver_data, link):
             html.P(f"Wins: {driver_data['wins']}"),
             html.P(f"Podiums: {driver_data['podiums']}"),
             html.P(f"Championships: {driver_data['championships']}"),
+            *([html.P(f"Sprints: {driver_data['sprints']}")]
+              if driver_data.get('sprints') else []),
         ], className="stats-grid"),
 
         html.Div([
@@ -82,6 +113,9 @@ def create_driver_card(driver_data, link):
                 ", ".join(driver_data['teams_list']), className="teams-list")
         ], className="teams-section"),
 
+        create_teammate_table(teammates)
+        if teammates is not None and not teammates.empty else html.Div(),
+
         # html.Button(
         #     "Show Career Timeline",
         #     id="show-career-timeline",
@@ -0,0 +1,91 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "category_codes",
+    "compact_floats",
+    "compact_ints",
+    "discrete_colorscale",
+    "typed_array",
+]
+
+
+# Plotly serialises numpy arrays as base64 typed arrays ("bdata") in the
+# figure JSON, so figure builders hand it numpy arrays in the smallest
+# dtype that holds the data instead of Python lists or tuples. Figures
+# built as plain dicts (figure_dicts.py) encode them with typed_array.
+
+_TYPED_ARRAY_CODES = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "float32": "f4",
+    "float64": "f8",
+}
+
+
+def _smallest_int_dtype(values):
+    if values.size == 0:
+        return np.int8
+    return np.result_type(np.min_scalar_type(values.min()),
+                          np.min_scalar_type(values.max()))
+
+
+def compact_floats(values, decimals=2):
+    """Round to ``decimals`` and store as float32 (4 bytes per point)"""
+    return np.round(np.asarray(values, dtype=float), decimals).astype(
+        np.float32)
+
+
+def compact_ints(*columns):
+    """Stack integer columns into the smallest integer dtype.
+
+    One column gives a 1-D array, several give a 2-D array with one row
+    per point, which Plotly reads like a list of customdata tuples.
+    """
+    values = np.column_stack([np.asarray(column, dtype=np.int64)
+                              for column in columns])
+    values = values.astype(_smallest_int_dtype(values))
+    return values[:, 0] if len(columns) == 1 else values
+
+
+def typed_array(values):
+    """Plotly.js typed array spec for numeric ``values``.
+
+    Like Plotly's own figure serialisation: 64-bit integers are narrowed,
+    empty and non-numeric arrays stay JSON lists.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iu" and values.dtype.itemsize == 8:
+        values = values.astype(_smallest_int_dtype(values))
+    code = _TYPED_ARRAY_CODES.get(str(values.dtype))
+    if code is None or values.size == 0:
+        return values.tolist()
+    spec = {
+        "dtype": code,
+        "bdata": base64.b64encode(np.ascontiguousarray(values)).decode(
+            "ascii"),
+    }
+    if values.ndim > 1:
+        spec["shape"] = ", ".join(str(size) for size in values.shape)
+    return spec
+
+
+def category_codes(values):
+    """Integer codes in order of first appearance and their labels"""
+    codes, labels = pd.factorize(np.asarray(values), use_na_sentinel=False)
+    return compact_ints(codes), [str(label) for label in labels]
+
+
+def discrete_colorscale(colors):
+    """Colorscale mapping the codes 0..len(colors)-1 to ``colors``"""
+    if len(colors) == 1:
+        return [[0, colors[0]], [1, colors[0]]]
+    last = len(colors) - 1
+    return [[index / last, color] for index, color in enumerate(colors)]
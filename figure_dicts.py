@@ -0,0 +1,104 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils import Colors
+
+
+__all__ = [
+    "TEMPLATE",
+    "THEME_LAYOUT",
+    "figure",
+    "merge",
+    "validated",
+    "vline",
+]
+
+
+# go.Figure runs every property through Plotly's validators on each
+# update_layout/add_trace/add_vline call, which dominates the cost of the
+# hot figure builders. They assemble plain figure dicts instead: the
+# constant parts are validated once at import through the graph objects,
+# per-call values (arrays, titles, ranges) are filled in directly. Arrays
+# must already be encoded (encoding.typed_array). The resulting dicts are
+# shared between requests and must not be mutated.
+
+
+def validated(obj):
+    """Plain JSON data of a graph object, e.g. ``go.Layout(...)``"""
+    return obj.to_plotly_json()
+
+
+def merge(*parts):
+    """Deep-merge layout dicts, later parts winning, without mutating any"""
+    merged = {}
+    for part in parts:
+        for key, value in part.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                value = merge(merged[key], value)
+            merged[key] = value
+    return merged
+
+
+# The Poppins font and colours every dashboard chart uses
+THEME_LAYOUT = validated(go.Layout(
+    font_family="Poppins",
+    plot_bgcolor="#FFFFFF",
+    title_font_color=Colors.BLACK,
+    xaxis_title_font_color=Colors.SECONDARY,
+    yaxis_title_font_color=Colors.SECONDARY,
+    yaxis_tickfont_color=Colors.SECONDARY,
+    xaxis_tickfont_color=Colors.SECONDARY,
+    legend_font_color=Colors.SECONDARY,
+    legend_title_font_color=Colors.BLACK,
+))
+
+# Parts of the default "plotly" template that cartesian scatter charts use
+_BASE_LAYOUT_KEYS = (
+    "annotationdefaults",
+    "autotypenumbers",
+    "colorway",
+    "font",
+    "hoverlabel",
+    "hovermode",
+    "paper_bgcolor",
+    "plot_bgcolor",
+    "shapedefaults",
+    "title",
+    "xaxis",
+    "yaxis",
+)
+
+
+def _dashboard_template():
+    base = validated(pio.templates["plotly"])
+    return go.layout.Template(
+        data={"scatter": base["data"]["scatter"]},
+        layout=merge({key: base["layout"][key]
+                      for key in _BASE_LAYOUT_KEYS},
+                     THEME_LAYOUT),
+    )
+
+
+# Registered as "dashboard": the default template trimmed to what the
+# dict-built scatter charts draw, with the theme on top. Figures only
+# carry their own layout on top of it.
+pio.templates["dashboard"] = _dashboard_template()
+TEMPLATE = validated(pio.templates["dashboard"])
+
+
+def figure(data, *layouts, template=TEMPLATE):
+    """Figure dict using the dashboard template"""
+    return {"data": list(data),
+            "layout": merge(*layouts, {"template": template})}
+
+
+def vline(x, **line):
+    """Full-height vertical line shape, as fig.add_vline(x) adds it"""
+    return {"type": "line",
+            "x0": x,
+            "x1": x,
+            "xref": "x",
+            "y0": 0,
+            "y1": 1,
+            "yref": "y domain",
+            "line": line}
@@ -0,0 +1,90 @@
+import json
+import multiprocessing
+import os
+import signal
+import threading
+from functools import wraps
+
+from dash.exceptions import PreventUpdate
+from plotly.io.json import to_json_plotly
+
+
+__all__ = [
+    "WORKERS",
+    "offload",
+    "shutdown",
+    "start",
+]
+
+
+# Figure building is mostly pure Python (Plotly validation, customdata,
+# per-team trace loops), so threaded workers serialise on the GIL. With
+# DASHBOARD_FIGURE_POOL=<n> the offloaded builders run in n processes
+# forked once the precomputed frames are loaded; children inherit them,
+# build the figure and return its JSON.
+WORKERS = int(os.environ.get("DASHBOARD_FIGURE_POOL", "0"))
+# Maximum builds queued or running before new requests wait
+QUEUE_SIZE = int(os.environ.get("DASHBOARD_FIGURE_POOL_QUEUE",
+                                str(2 * WORKERS)))
+# Seconds to wait for a queue slot and again for the built figure
+TIMEOUT = float(os.environ.get("DASHBOARD_FIGURE_POOL_TIMEOUT", "30"))
+
+_pool = None
+_slots = None
+
+
+def _initialize():
+    # Ctrl+C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _build(fn, args, kwargs):
+    return to_json_plotly(fn(*args, **kwargs))
+
+
+def start(workers=WORKERS, queue_size=None):
+    """Fork the pool; call after all precomputation is done"""
+    global _pool, _slots
+    if workers <= 0 or _pool is not None:
+        return
+    _slots = threading.BoundedSemaphore(queue_size or QUEUE_SIZE
+                                        or 2 * workers)
+    _pool = multiprocessing.get_context("fork").Pool(workers,
+                                                     initializer=_initialize)
+
+
+def shutdown():
+    global _pool, _slots
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+    _pool = _slots = None
+
+
+def offload(fn):
+    """Run ``fn`` in the figure pool when it is started.
+
+    ``fn`` must be a module-level function so it can be sent to the
+    workers. The result comes back as plain JSON data (figures become
+    dicts). When no slot frees up or the build does not finish within
+    TIMEOUT the callback raises PreventUpdate and the browser keeps the
+    current figure.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        pool, slots = _pool, _slots
+        if pool is None:
+            return fn(*args, **kwargs)
+
+        if not slots.acquire(timeout=TIMEOUT):
+            raise PreventUpdate
+        try:
+            result = pool.apply_async(_build, (fn, args, kwargs))
+            try:
+                return json.loads(result.get(TIMEOUT))
+            except multiprocessing.TimeoutError:
+                raise PreventUpdate
+        finally:
+            slots.release()
+
+    return wrapper
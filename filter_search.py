@@ -0,0 +1,78 @@
+from dash import Input, Output, State
+
+from app import app
+from metrics import instrument
+from profiling import step
+from search_index import SearchIndex, normalize
+from source import (
+    circuit_names,
+    constructor_names,
+    driver_names,
+    races_df,
+    results_df,
+)
+
+
+__all__ = [
+    "circuit_search",
+    "constructor_search",
+    "driver_index",
+    "driver_search",
+    "register_search",
+]
+
+
+def _option(label, value):
+    """Dropdown option, with the folded label for the client-side filter.
+
+    The dropdown filters the returned options again in the browser, by
+    lowercase substring of label, value and search; without the folded
+    ``search`` it would hide e.g. "Sergio Pérez" when "perez" is typed.
+    """
+    return {"label": label, "value": value, "search": normalize(label)}
+
+
+def _named_index(names, counts):
+    """Index over the distinct names, ranked by the summed id counts"""
+    relevance = {}
+    for item_id, name in names.items():
+        relevance[name] = relevance.get(name, 0) + int(counts.get(item_id, 0))
+    return SearchIndex([_option(name, name) for name in relevance],
+                       list(relevance.values()))
+
+
+def driver_index(driver_ids):
+    """Index over the named drivers among ``driver_ids``, ranked by starts"""
+    driver_ids = [driver_id for driver_id in driver_ids
+                  if driver_id in driver_names]
+    return SearchIndex(
+        [_option(driver_names[driver_id], driver_id)
+         for driver_id in driver_ids],
+        [int(driver_starts.get(driver_id, 0)) for driver_id in driver_ids])
+
+
+with step("search indexes"):
+    # Ranked by race starts, entries and races held
+    driver_starts = results_df["driverId"].value_counts()
+    driver_search = driver_index(driver_names)
+    constructor_search = _named_index(
+        constructor_names, results_df["constructorId"].value_counts())
+    circuit_search = _named_index(circuit_names,
+                                  races_df["circuitId"].value_counts())
+
+
+def register_search(dropdown_id, index):
+    """Fill the options of ``dropdown_id`` from ``index`` as the user types.
+
+    The layout only carries the top options; the selected values keep
+    their options whatever is typed.
+    """
+    def search_options(search_value, value):
+        return index.options_for(search_value, value)
+
+    app.callback(
+        Output(dropdown_id, "options"),
+        Input(dropdown_id, "search_value"),
+        State(dropdown_id, "value"),
+        prevent_initial_call=True,
+    )(instrument(search_options, name=f"search_options[{dropdown_id}]"))
@@ -0,0 +1,109 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "lap_time_hovertext",
+    "lap_times_ms",
+    "lap_times_s",
+    "parse_lap_times",
+    "season_ranges",
+]
+
+
+# Display strings for whole columns at once: the numbers are split with
+# NumPy integer arithmetic, the pieces looked up in small tables of
+# preformatted strings and joined with the np.strings ufuncs, instead of
+# calling an f-string per row through Series.apply. Results are NumPy
+# string arrays, one string per input value; parse_lap_times goes back.
+
+
+def _digits(values, width=1):
+    return np.strings.zfill(values.astype(str), width)
+
+
+def _join(*parts):
+    joined = parts[0]
+    for part in parts[1:]:
+        joined = np.strings.add(joined, part)
+    return joined
+
+
+@lru_cache(maxsize=None)
+def _seconds_texts(with_milliseconds):
+    """ss.mmm for each millisecond of a minute, or ss for each second"""
+    if with_milliseconds:
+        return np.array([f"{ms // 1000:02d}.{ms % 1000:03d}"
+                         for ms in range(60_000)])
+    return np.array([f"{second:02d}" for second in range(60)])
+
+
+def _minutes_and_rest(milliseconds):
+    milliseconds = np.rint(np.asarray(milliseconds, dtype=float))
+    minutes, rest = np.divmod(milliseconds.astype(np.int64), 60_000)
+    # Few distinct minute values: format each once
+    minute_texts = np.array([f"{minute}:"
+                             for minute in range(minutes.max(initial=0) + 1)])
+    return minute_texts[minutes], rest
+
+
+def lap_times_ms(milliseconds):
+    """Lap times as m:ss.mmm, e.g. 83456 ms as 1:23.456"""
+    minutes, rest = _minutes_and_rest(milliseconds)
+    return np.strings.add(minutes, _seconds_texts(True)[rest])
+
+
+def lap_times_s(milliseconds):
+    """Lap times as m:ss, in whole seconds for the axis ticks"""
+    minutes, rest = _minutes_and_rest(milliseconds)
+    return np.strings.add(minutes, _seconds_texts(False)[rest // 1000])
+
+
+def parse_lap_times(texts):
+    """Integer milliseconds of "m:ss.mmm" / "ss.mmm" times, 0 if missing.
+
+    The inverse of lap_times_ms; used for the Ergast time columns (q1/q2/q3,
+    pit stop durations), where a missing time is empty, NaN or "\\N".
+    """
+    texts = pd.Series(texts, copy=False).fillna("").to_numpy(dtype=str)
+    missing = (texts == "") | (texts == "\\N")
+    minutes, _, seconds = np.strings.rpartition(
+        np.where(missing, "0", texts), ":")
+    minutes = np.where(minutes == "", "0", minutes).astype(float)
+    milliseconds = np.rint((minutes * 60 + seconds.astype(float)) * 1000)
+    return np.where(missing, 0, milliseconds).astype(np.int32)
+
+
+def lap_time_hovertext(lap_times, impacts, labels):
+    """Lap time in bold, after "(impact) label" where the season has one"""
+    bold = _join("<b>", np.asarray(lap_times, dtype=str), "</b>")
+    # Few distinct rule changes: format each (impact, label) pair once
+    impact_codes, impact_values = pd.factorize(
+        np.asarray(impacts, dtype=object))
+    label_codes, label_values = pd.factorize(
+        np.asarray(labels, dtype=object))
+    pair_codes, pairs = pd.factorize(
+        (impact_codes + 1) * (len(label_values) + 1) + label_codes + 1)
+    prefixes = []
+    for pair in pairs:
+        impact, label = divmod(int(pair), len(label_values) + 1)
+        prefixes.append(
+            f"({impact_values[impact - 1]}) {label_values[label - 1]}<br />"
+            if impact and label else "")
+    return np.strings.add(np.array(prefixes, dtype=str)[pair_codes], bold)
+
+
+def season_ranges(race_counts, first_years, last_years):
+    """Race count and first - last season, or "0" without any race"""
+    first_years = np.asarray(first_years, dtype=float)
+    last_years = np.asarray(last_years, dtype=float)
+    raced = ~(np.isnan(first_years) | np.isnan(last_years))
+    first = _digits(np.where(raced, first_years, 0).astype(np.int64))
+    last = _digits(np.where(raced, last_years, 0).astype(np.int64))
+    years = np.where(first_years == last_years, first,
+                     _join(first, " - ", last))
+    ranges = _join(_digits(np.asarray(race_counts, dtype=np.int64)), " (",
+                   years, ")")
+    return np.where(raced, ranges, "0")
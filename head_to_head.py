@@ -0,0 +1,116 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "HeadToHead",
+    "build_head_to_head",
+    "teammate_pairs",
+]
+
+
+COUNTS = ["races", "race_wins", "qualifyings", "qualifying_wins"]
+
+
+class HeadToHead(NamedTuple):
+    """Race and qualifying record of every driver against each teammate.
+
+    One row per (driverId, teammate, season), sorted in that order. The
+    rows of the driver in slot ``i`` of ``driver_ids`` are
+    ``offsets[i]:offsets[i + 1]``; ``slots`` maps a driverId to its slot.
+    ``race_wins`` counts the races finished ahead of the teammate,
+    ``qualifying_wins`` the sessions qualified ahead.
+    """
+    driver_ids: np.ndarray
+    offsets: np.ndarray
+    slots: dict
+    teammate_ids: np.ndarray
+    years: np.ndarray
+    races: np.ndarray
+    race_wins: np.ndarray
+    qualifyings: np.ndarray
+    qualifying_wins: np.ndarray
+
+    def driver(self, driver_id):
+        """The teammate rows of ``driver_id`` as a DataFrame"""
+        slot = self.slots.get(driver_id)
+        rows = (slice(self.offsets[slot], self.offsets[slot + 1])
+                if slot is not None else slice(0, 0))
+        return pd.DataFrame({
+            "teammateId": self.teammate_ids[rows],
+            "year": self.years[rows],
+            **{name: getattr(self, name)[rows] for name in COUNTS},
+        })
+
+
+def teammate_pairs(entries: pd.DataFrame) -> pd.DataFrame:
+    """Both orderings of every two drivers sharing (raceId, constructorId).
+
+    ``won`` is whether the driver placed ahead of the teammate.
+    """
+    race_ids = entries["raceId"].to_numpy()
+    constructor_ids = entries["constructorId"].to_numpy()
+    order = np.lexsort((constructor_ids, race_ids))
+    race_ids, constructor_ids = race_ids[order], constructor_ids[order]
+    driver_ids = entries["driverId"].to_numpy()[order]
+    positions = entries["position"].to_numpy()[order]
+
+    # Rows of a car share are adjacent once sorted: pair every row with
+    # the ones 1, 2, ... rows further on while they stay in its group
+    group_starts = np.flatnonzero(
+        np.diff(race_ids, prepend=-1) | np.diff(constructor_ids, prepend=-1))
+    group_sizes = np.diff(np.append(group_starts, len(race_ids)))
+    firsts, seconds = [], []
+    for distance in range(1, group_sizes.max(initial=1)):
+        rows = np.arange(len(race_ids) - distance)
+        same = ((race_ids[rows] == race_ids[rows + distance])
+                & (constructor_ids[rows] == constructor_ids[rows + distance]))
+        firsts.append(rows[same])
+        seconds.append(rows[same] + distance)
+    firsts = np.concatenate(firsts or [np.empty(0, dtype=np.intp)])
+    seconds = np.concatenate(seconds or [np.empty(0, dtype=np.intp)])
+
+    drivers = np.concatenate([firsts, seconds])
+    teammates = np.concatenate([seconds, firsts])
+    pairs = pd.DataFrame({
+        "raceId": race_ids[drivers],
+        "constructorId": constructor_ids[drivers],
+        "driverId": driver_ids[drivers],
+        "teammateId": driver_ids[teammates],
+        "won": positions[drivers] < positions[teammates],
+    })
+    # Drivers sharing a car with themselves (early shared drives)
+    return pairs[pairs["driverId"] != pairs["teammateId"]]
+
+
+def build_head_to_head(results: pd.DataFrame,
+                       qualifying: pd.DataFrame,
+                       races: pd.DataFrame) -> HeadToHead:
+    race_pairs = teammate_pairs(results[
+        ["raceId", "constructorId", "driverId", "positionOrder"]].rename(
+        columns={"positionOrder": "position"}))
+    qualifying_pairs = teammate_pairs(qualifying[
+        ["raceId", "constructorId", "driverId", "position"]].dropna())
+
+    keys = ["driverId", "teammateId", "year"]
+    years = races[["raceId", "year"]]
+    record = pd.concat([
+        race_pairs.merge(years, on="raceId").groupby(keys)["won"].agg(
+            races="size", race_wins="sum"),
+        qualifying_pairs.merge(years, on="raceId").groupby(keys)["won"].agg(
+            qualifyings="size", qualifying_wins="sum"),
+    ], axis=1).fillna(0).astype(np.int16).sort_index().reset_index()
+
+    driver_ids = record["driverId"].to_numpy(dtype=np.int32)
+    unique_driver_ids, starts = np.unique(driver_ids, return_index=True)
+    return HeadToHead(
+        driver_ids=unique_driver_ids,
+        offsets=np.append(starts, len(driver_ids)),
+        slots={int(driver_id): slot
+               for slot, driver_id in enumerate(unique_driver_ids)},
+        teammate_ids=record["teammateId"].to_numpy(dtype=np.int32),
+        years=record["year"].to_numpy(dtype=np.int16),
+        **{name: record[name].to_numpy() for name in COUNTS},
+    )
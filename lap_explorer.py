@@ -0,0 +1,194 @@
+from math import ceil
+
+from dash import Input, Output, dcc, html
+import numpy as np
+import plotly.graph_objects as go
+
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from circuit_map import lap_time_ticks
+from downsample import lttb
+from encoding import typed_array
+from figure_dicts import TEMPLATE, figure, validated, vline
+from formatting import lap_times_ms
+from lazy_sections import gate, initial, loaded, section
+from metrics import instrument
+from profiling import step
+from race_lap_store import build_race_lap_store
+from source import driver_names, lap_times_df, races_df
+from utils import Colors
+
+
+# Points kept per driver line, about one per horizontal pixel of the chart.
+# Longer series (several races) are reduced with LTTB before sending.
+MAX_POINTS = 1000
+
+with step("race lap store"):
+    race_lap_store = build_race_lap_store(lap_times_df)
+
+# Races with lap data, most recent first
+_races = (races_df[races_df["raceId"].isin(race_lap_store.race_ids)]
+          .sort_values(["year", "round"], ascending=False))
+race_labels = {int(race_id): f"{year} {name}" for race_id, year, name
+               in zip(_races["raceId"], _races["year"], _races["name"])}
+# Oldest first when sorted
+race_order = {race_id: -position
+              for position, race_id in enumerate(race_labels)}
+
+LAP_EXPLORER_LAYOUT = validated(go.Layout(
+    xaxis=dict(title_text="Lap", showgrid=False),
+    yaxis=dict(title_text="Lap Time", tickmode="array"),
+    hovermode="closest",
+    hoverlabel_font_color=Colors.SECONDARY,
+    legend_title_text="Driver",
+))
+COLORWAY = TEMPLATE["layout"]["colorway"]
+
+
+def driver_laps(race_ids, driver_id):
+    """x, lap time and lap number of one driver's laps in ``race_ids``.
+
+    The races are placed one after another on x, each starting after the
+    last lap of the one before.
+    """
+    x, milliseconds, laps = [], [], []
+    offset = 0
+    for race_id in race_ids:
+        race = race_lap_store.race(race_id)
+        laps_of_driver = race.driver(driver_id)
+        x.append(laps_of_driver.laps.astype(np.int32) + offset)
+        milliseconds.append(laps_of_driver.milliseconds)
+        laps.append(laps_of_driver.laps)
+        offset += int(race.laps.max(initial=0))
+    return (np.concatenate(x),
+            np.concatenate(milliseconds),
+            np.concatenate(laps))
+
+
+def selected_races(race_ids):
+    return sorted((race_id for race_id in race_ids or ()
+                   if race_lap_store.race(race_id) is not None),
+                  key=race_order.get)
+
+
+def drivers_in_races(race_ids):
+    driver_ids = [race_lap_store.race(race_id).driver_ids
+                  for race_id in selected_races(race_ids)]
+    if not driver_ids:
+        return []
+    return [int(driver_id)
+            for driver_id in np.unique(np.concatenate(driver_ids))]
+
+
+def draw_race_lap_times(race_ids, driver_ids=None, max_points=MAX_POINTS):
+    race_ids = selected_races(race_ids)
+    if not race_ids:
+        return figure([], LAP_EXPLORER_LAYOUT,
+                      {"title": {"text": "Select a race"}})
+    driver_ids = driver_ids or drivers_in_races(race_ids)
+
+    traces = []
+    min_time, max_time = np.nan, np.nan
+    for index, driver_id in enumerate(driver_ids):
+        x, milliseconds, laps = driver_laps(race_ids, driver_id)
+        if len(x) == 0:
+            continue
+        kept = lttb(x, milliseconds, max_points)
+        x, milliseconds, laps = x[kept], milliseconds[kept], laps[kept]
+        min_time = np.fmin(min_time, milliseconds.min())
+        max_time = np.fmax(max_time, milliseconds.max())
+        traces.append({
+            "type": "scattergl",
+            "x": typed_array(x),
+            "y": typed_array(milliseconds),
+            "customdata": typed_array(laps),
+            "text": lap_times_ms(milliseconds).tolist(),
+            "hovertemplate": ("<b>%{fullData.name}</b><br>"
+                              "Lap %{customdata}: %{text}<extra></extra>"),
+            "mode": "lines",
+            "line": {"color": COLORWAY[index % len(COLORWAY)],
+                     "width": 1.5},
+            "name": driver_names.get(driver_id, str(driver_id)),
+        })
+
+    step_ms = max(1000, ceil((max_time - min_time) / 8 / 1000) * 1000
+                  if traces else 4000)
+    tick_values, tick_texts = lap_time_ticks(min_time, max_time, step_ms)
+    layout = {
+        "title": {"text": ("Lap Times, " + race_labels[race_ids[0]]
+                           if len(race_ids) == 1
+                           else f"Lap Times over {len(race_ids)} Races")},
+        "yaxis": {"tickvals": tick_values, "ticktext": tick_texts},
+    }
+    if len(race_ids) > 1:
+        # Each race starts where the previous one ended
+        starts = np.cumsum([0] + [int(race_lap_store.race(race_id)
+                                      .laps.max(initial=0))
+                                  for race_id in race_ids[:-1]])
+        layout["xaxis"] = {
+            "title": {"text": "Race"},
+            "tickmode": "array",
+            "tickvals": [int(start) + 1 for start in starts],
+            "ticktext": [race_labels[race_id] for race_id in race_ids],
+        }
+        layout["shapes"] = [vline(int(start) + 0.5,
+                                  color=Colors.SECONDARY,
+                                  dash="dot")
+                            for start in starts[1:]]
+    return figure(traces, LAP_EXPLORER_LAYOUT, layout)
+
+
+app.callback(
+    Output("lap-explorer-chart", "figure"),
+    loaded("lap-explorer"),
+    Input("lap-explorer-races", "value"),
+    Input("lap-explorer-drivers", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(draw_race_lap_times))))
+
+
+def lap_explorer_driver_options(race_ids):
+    return [{"label": driver_names.get(driver_id, str(driver_id)),
+             "value": driver_id}
+            for driver_id in sorted(drivers_in_races(race_ids),
+                                    key=lambda driver_id: driver_names.get(
+                                        driver_id, ""))]
+
+
+app.callback(
+    Output("lap-explorer-drivers", "options"),
+    Input("lap-explorer-races", "value"),
+)(instrument(lap_explorer_driver_options))
+
+
+layout = section(
+    "lap-explorer",
+    [
+        html.H1("Lap Times by Race"),
+        html.Div(
+            [
+                dcc.Dropdown(
+                    id="lap-explorer-races",
+                    options=[{"label": label, "value": race_id}
+                             for race_id, label in race_labels.items()],
+                    multi=True,
+                    placeholder="Select Races",
+                    style={"flex": "1"},
+                ),
+                dcc.Dropdown(
+                    id="lap-explorer-drivers",
+                    options=[],
+                    multi=True,
+                    placeholder="All Drivers",
+                    closeOnSelect=False,
+                    style={"flex": "1"},
+                ),
+            ],
+            style={"display": "flex", "gap": "10px"},
+        ),
+        dcc.Graph(
+            figure=initial(draw_race_lap_times, None),
+            id="lap-explorer-chart",
+        ),
+    ],
+    className="lap-explorer-container",
+)
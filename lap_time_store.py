@@ -0,0 +1,58 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "ALL_CIRCUITS",
+    "LapTimeSeries",
+    "build_lap_time_store",
+]
+
+
+# Key of the all-circuit season average series
+ALL_CIRCUITS = ""
+
+
+class LapTimeSeries(NamedTuple):
+    """Year-sorted fastest laps of one circuit (or of the season average)"""
+    circuit_id: int
+    years: np.ndarray
+    milliseconds: np.ndarray
+    # Rows of (formatted lap time, hovertext), the lap chart customdata
+    customdata: np.ndarray
+
+    def between(self, season_filter=None):
+        """The seasons within ``season_filter``, as views of the arrays"""
+        if not season_filter:
+            return self
+        start = np.searchsorted(self.years, season_filter[0], side="left")
+        stop = np.searchsorted(self.years, season_filter[1], side="right")
+        return self._replace(years=self.years[start:stop],
+                             milliseconds=self.milliseconds[start:stop],
+                             customdata=self.customdata[start:stop])
+
+
+def _series(frame, circuit_id):
+    return LapTimeSeries(
+        circuit_id=circuit_id,
+        years=frame["year"].to_numpy(dtype=np.int16),
+        milliseconds=frame["fastest_milliseconds"].to_numpy(dtype=np.int32),
+        customdata=frame[["fastest_lap", "hovertext"]].to_numpy(dtype=object),
+    )
+
+
+def build_lap_time_store(fastest_lap_times: pd.DataFrame,
+                         season_averages: pd.DataFrame) -> dict:
+    """Lap time series by circuitRef, plus ALL_CIRCUITS for the average.
+
+    ``fastest_lap_times`` must be sorted by year; the series keep that
+    order, so any season range is a contiguous slice.
+    """
+    store = {ALL_CIRCUITS: _series(season_averages, -1)}
+    for ref, positions in fastest_lap_times.groupby(
+            "circuitRef", sort=False).indices.items():
+        frame = fastest_lap_times.iloc[positions]
+        store[ref] = _series(frame, int(frame["circuitId"].iloc[0]))
+    return store
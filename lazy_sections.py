@@ -0,0 +1,85 @@
+import os
+from functools import wraps
+
+from dash import Input, dcc, html
+from dash.exceptions import PreventUpdate
+
+from utils import Colors
+
+
+__all__ = [
+    "ENABLED",
+    "PLACEHOLDER_FIGURE",
+    "gate",
+    "initial",
+    "loaded",
+    "section",
+]
+
+
+# Lazy loading is opt-in. When enabled the chart sections ship a placeholder
+# figure in the layout and assets/lazy_sections.js sets a section's
+# "<name>-loaded" store once it scrolls into view (or is shown after being
+# hidden); the section's figure callbacks do nothing until then.
+ENABLED = os.environ.get("DASHBOARD_LAZY_SECTIONS", "").lower() in ("1",
+                                                                    "true",
+                                                                    "yes",
+                                                                    "on")
+
+PLACEHOLDER_FIGURE = {
+    "data": [],
+    "layout": {
+        "xaxis": {"visible": False},
+        "yaxis": {"visible": False},
+        "paper_bgcolor": "rgba(0,0,0,0)",
+        "plot_bgcolor": "rgba(0,0,0,0)",
+        "annotations": [{
+            "text": "Loading…",
+            "xref": "paper",
+            "yref": "paper",
+            "showarrow": False,
+            "font": {"color": Colors.SECONDARY, "size": 16},
+        }],
+    },
+}
+
+
+def loaded(name):
+    """Input of the section's store, truthy once its figures may load"""
+    return Input(f"{name}-loaded", "data")
+
+
+def section(name, children, **kwargs):
+    """``html.Div`` of a chart section with its loaded store.
+
+    In lazy mode the div is marked for the clientside observer; otherwise
+    the store starts out loaded and nothing is observed.
+    """
+    if ENABLED:
+        kwargs["data-lazy-section"] = name
+    return html.Div([dcc.Store(id=f"{name}-loaded", data=not ENABLED),
+                     *children], **kwargs)
+
+
+def gate(fn):
+    """Callback taking its section's ``loaded`` flag first.
+
+    ``fn`` gets the remaining arguments; until the section is loaded the
+    update is skipped.
+    """
+    @wraps(fn)
+    def wrapper(is_loaded, *args):
+        if not is_loaded:
+            raise PreventUpdate
+        return fn(*args)
+
+    return wrapper
+
+
+def initial(build, *args, outputs=1):
+    """``build(*args)`` for the layout, or placeholders in lazy mode"""
+    if not ENABLED:
+        return build(*args)
+    if outputs == 1:
+        return PLACEHOLDER_FIGURE
+    return (PLACEHOLDER_FIGURE,) * outputs
@@ -1,19 +1,48 @@
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-from dash import dcc, html, Input, Output, State
-from app import app
+import profiling
+profiling.start()
+
+from dash import ClientsideFunction, dcc, html, Input, Output, State
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
 from circuit_map import layout as circuit_map_layout
+from lap_explorer import layout as lap_explorer_layout
+from lazy_sections import gate, initial, loaded, section
 from scatter_plot_drivers import (
     create_career_timeline,
     create_career_plot,
     get_career_data,
+    get_career_lookup,
     get_driver_data,
+    get_driver_stats,
+    get_teammate_record,
 )
 from driver_card import create_driver_card
-from circuit_to_driver import layout as circuit_to_driver_layout
-from source import circuit_names, constructor_names, driver_names
+from connections import layout as connections_layout
+from constructor_championship import (
+    layout as constructor_championship_layout,
+)
+from pit_stops import layout as pit_stops_layout
+from reliability import layout as reliability_layout
+from qualifying import layout as qualifying_layout
+from title_fight import layout as title_fight_layout
+from circuit_to_driver import (
+    default_number_of_records,
+    layout as circuit_to_driver_layout,
+)
+from filter_search import (
+    circuit_search,
+    constructor_search,
+    driver_search,
+    register_search,
+)
 from app import server
+from cache import memoize
+import figure_pool
+from metrics import instrument
+from profiling import step
+import warmup
 
 
 MAIN_DROPDOWN_STYLE = {
@@ -23,7 +52,7 @@ MAIN_DROPDOWN_STYLE = {
 from utils import Colors
 
 
-def display_driver_card(clickData):
+def display_driver_card(clickData, include_sprints=None):
     if not clickData:
         return html.Div([
             html.Span("Click on a driver point to view details"),
@@ -33,12 +62,19 @@ def display_driver_card(clickData):
     try:
         point = clickData['points'][0]
         driver_id = point['customdata'][0]
-        driver_data = career[career['driverId'] == driver_id].iloc[0]
+        driver_data = career[career['driverId'] == driver_id].iloc[0].copy()
+        stats = get_driver_stats(driver_id, bool(include_sprints))
+        driver_data['total_races'] = stats['starts']
+        driver_data['wins'] = stats['wins']
+        driver_data['podiums'] = stats['podiums']
+        driver_data['sprints'] = stats['sprints']
         tmp_driver_data = get_driver_data(driver_id)
         driver_url = (tmp_driver_data['url']
                       if not tmp_driver_data.empty
                       else "")
-        return create_driver_card(driver_data, driver_url), driver_id
+        return (create_driver_card(driver_data, driver_url,
+                                   get_teammate_record(driver_id)),
+                driver_id)
     except (IndexError, KeyError, AttributeError):
         return html.Div("Driver data not found", className="card-error"), None
 
@@ -46,8 +82,9 @@ def display_driver_card(clickData):
 app.callback(
     Output("driver-card", "children"),
     Output("driver-id-storage", "data"),
-    Input("driver-careers-chart", "clickData")
-)(display_driver_card)
+    Input("driver-careers-chart", "clickData"),
+    Input("include-sprints", "value"),
+)(instrument(display_driver_card))
 
 # ------------------------------------------------------------
 #                       Layout
@@ -58,6 +95,9 @@ MAIN_DROPDOWN_STYLE = {
     "background-color": Colors.BG_PANEL,
 }
 
+with step("initial career plot"):
+    initial_career_figure = initial(create_career_plot)
+
 app.layout = html.Div([
     # Filters and Controls
     html.Div(
@@ -92,9 +132,7 @@ app.layout = html.Div([
                         # Circuit
                         dcc.Dropdown(
                             id="circuit-filter",
-                            options=[{"label": v, "value": v}
-                                     for v
-                                     in sorted(circuit_names.values())],
+                            options=circuit_search.options_for(None),
                             multi=True,
                             placeholder="Select Circuits",
                             closeOnSelect=False,
@@ -104,9 +142,7 @@ app.layout = html.Div([
                         # Constructor
                         dcc.Dropdown(
                             id="constructor-filter",
-                            options=[{"label": v, "value": v}
-                                     for v
-                                     in sorted(constructor_names.values())],
+                            options=constructor_search.options_for(None),
                             multi=True,
                             placeholder="Select Constructors",
                             closeOnSelect=False,
@@ -116,12 +152,7 @@ app.layout = html.Div([
                         # Driver
                         dcc.Dropdown(
                             id="driver-filter",
-                            options=[
-                                {"label": v, "value": k}
-                                for k, v
-                                in sorted(driver_names.items(),
-                                          key=lambda item: item[1])
-                            ],
+                            options=driver_search.options_for(None),
                             multi=True,
                             placeholder="Select Drivers",
                             closeOnSelect=False,
@@ -186,11 +217,17 @@ app.layout = html.Div([
 
     # Top row: Map + Circuit Info
     circuit_map_layout,
+
+    lap_explorer_layout,
+
+    qualifying_layout,
     
     html.H1("Drivers per Constructors"),
 
-    html.Div([
+    section("careers", [
         dcc.Store(id='driver-id-storage'),
+        dcc.Store(id='career-lookup', data=get_career_lookup()),
+        dcc.Store(id='career-plot-data', data=initial_career_figure),
         html.Div([
             html.H3('Chart view:', className="chart-view"),
             dcc.RadioItems(
@@ -202,11 +239,16 @@ app.layout = html.Div([
                 ],
                 value='start',
                 className="toggle-switch"
+            ),
+            dcc.Checklist(
+                id='include-sprints',
+                options=[{'label': 'Include sprints', 'value': 'sprints'}],
+                value=[],
+                className="toggle-switch"
             )
         ], className="sidebar"),
         html.Div([
             dcc.Graph(
-                figure=create_career_plot(),
                 id="driver-careers-chart",
                 className="main-chart"
             ),
@@ -247,6 +289,16 @@ app.layout = html.Div([
     ], className="timeline-row"),
 
     circuit_to_driver_layout,
+
+    connections_layout,
+
+    title_fight_layout,
+
+    constructor_championship_layout,
+
+    pit_stops_layout,
+
+    reliability_layout,
 ], 
     className="dashboard-container",
     **{"data-theme": "light"}
@@ -257,6 +309,11 @@ app.layout = html.Div([
 #                       Callbacks
 # ------------------------------------------------------------
 
+# The filter dropdowns load their options as the user types
+register_search("circuit-filter", circuit_search)
+register_search("constructor-filter", constructor_search)
+register_search("driver-filter", driver_search)
+
 @app.callback(
     Output("filters-collapsed", "data"),
     Output("filters-container", "style"),
@@ -265,6 +322,7 @@ app.layout = html.Div([
     State("filters-collapsed", "data"),
     State("filters-container", "style"),
 )
+@instrument
 def toggle_filters(n_clicks, collapsed, current_style):
     if n_clicks:
         collapsed = not collapsed if collapsed is not None else True
@@ -285,20 +343,37 @@ def toggle_filters(n_clicks, collapsed, current_style):
             "⌵" if collapsed else "ᐱ")
 
 
+build_career_plot = figure_pool.offload(create_career_plot)
+
+
 @app.callback(
-    Output("driver-careers-chart", "figure"),
+    Output("career-plot-data", "data"),
+    loaded("careers"),
     Input("career-mode", "value"),
     Input("constructor-filter", "value"),
     Input("driver-filter", "value"),
-    Input("year-range-slider", "value")
+    Input("year-range-slider", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
 )
+@instrument
+@gate
+@memoize_heavy
 def update_chart(mode, constructor_filter, driver_filter, season_filter):
-    return create_career_plot(
+    return build_career_plot(
         mode=mode,
         constructor_filter=constructor_filter,
         driver_filter=driver_filter,
         season_filter=season_filter,
-    ).update_layout(font_family="Poppins",)
+    )
+
+
+# Fill the driver names and teams into the compact career figure
+app.clientside_callback(
+    ClientsideFunction(namespace="career", function_name="expand_labels"),
+    Output("driver-careers-chart", "figure"),
+    Input("career-plot-data", "data"),
+    State("career-lookup", "data"),
+)
 
 
 @app.callback(
@@ -306,6 +381,8 @@ def update_chart(mode, constructor_filter, driver_filter, season_filter):
     Output("career-timeline-chart", "style"),
     Input("driver-id-storage", "data"), 
 )
+@instrument
+@memoize
 def show_career_timeline(driver_id):
     if driver_id:
         fig = create_career_timeline(driver_id)
@@ -321,6 +398,23 @@ def show_career_timeline(driver_id):
 
 career = get_career_data()
 
+# Fork the figure pool (if enabled) now that every frame is precomputed
+figure_pool.start()
+
+# Dashboard states every first visitor hits: the initial page load in each
+# career-plot mode and the timelines of the most successful drivers.
+warmup.start([
+    ("update_parcats", (None, None, None, None, default_number_of_records,
+                        False, "Circuit", "name", 0)),
+    *(("update_chart", (mode, None, None, None))
+      for mode in ("start", "end", "both")),
+    ("draw_fastest_lap_times_line_chart", (None, None)),
+    *(("show_career_timeline", (int(driver_id),))
+      for driver_id in career.nlargest(10, "wins")["driverId"]),
+])
+
+profiling.report()
+
 
 if __name__ == "__main__":
     app.run(debug=True)
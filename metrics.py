@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from dash.exceptions import PreventUpdate
+from flask import Response, request
+
+
+__all__ = [
+    "ENABLED",
+    "init_app",
+    "instrument",
+    "record_cache",
+    "render_metrics",
+]
+
+
+# Instrumentation is opt-in; when disabled `instrument` returns the callback
+# untouched and `record_cache` returns immediately.
+ENABLED = os.environ.get("DASHBOARD_METRICS", "").lower() in ("1",
+                                                              "true",
+                                                              "yes",
+                                                              "on")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000,
+                   500_000, 1_000_000, 2_500_000, 5_000_000)
+
+DASH_UPDATE_PATH = "/_dash-update-component"
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds (Prometheus style)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+_lock = threading.Lock()
+_latency = {}
+_payload = {}
+_calls = {}
+_errors = {}
+_cache_hits = {}
+_cache_misses = {}
+
+
+def _observe(histograms, buckets, key, value):
+    with _lock:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def _increment(counters, key):
+    with _lock:
+        counters[key] = counters.get(key, 0) + 1
+
+
+def instrument(fn=None, *, name=None):
+    """Record latency, call and error counts of a Dash callback.
+
+    Usable as ``@instrument``, ``@instrument(name=...)`` or
+    ``instrument(fn)`` right before handing the function to
+    ``app.callback``.
+    """
+    if fn is None:
+        return lambda f: instrument(f, name=name)
+    if not ENABLED:
+        return fn
+
+    callback_name = name or fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except PreventUpdate:
+            raise
+        except Exception:
+            _increment(_errors, callback_name)
+            raise
+        finally:
+            _increment(_calls, callback_name)
+            _observe(_latency,
+                     LATENCY_BUCKETS,
+                     callback_name,
+                     time.perf_counter() - start)
+
+    return wrapper
+
+
+def record_cache(cache, hit):
+    """Count a lookup in one of the in-process caches"""
+    if not ENABLED:
+        return
+    _increment(_cache_hits if hit else _cache_misses, cache)
+
+
+def _escape(value):
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"'))
+
+
+def _render_histograms(lines, metric, label, histograms, help_text):
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} histogram")
+    for key, histogram in sorted(histograms.items()):
+        value = _escape(key)
+        for bound, total in histogram.cumulative():
+            lines.append(
+                f'{metric}_bucket{{{label}="{value}",le="{bound}"}} {total}')
+        lines.append(f'{metric}_sum{{{label}="{value}"}} {histogram.sum}')
+        lines.append(f'{metric}_count{{{label}="{value}"}} {histogram.count}')
+
+
+def _render_counters(lines, metric, label, counters, help_text):
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} counter")
+    for key, count in sorted(counters.items()):
+        lines.append(f'{metric}{{{label}="{_escape(key)}"}} {count}')
+
+
+def render_metrics():
+    """Serialise all collected metrics in Prometheus text format"""
+    lines = []
+    with _lock:
+        _render_histograms(lines,
+                           "dashboard_callback_duration_seconds",
+                           "callback",
+                           _latency,
+                           "Time spent inside Dash callbacks.")
+        _render_counters(lines,
+                         "dashboard_callback_calls_total",
+                         "callback",
+                         _calls,
+                         "Number of Dash callback invocations.")
+        _render_counters(lines,
+                         "dashboard_callback_errors_total",
+                         "callback",
+                         _errors,
+                         "Number of Dash callbacks that raised.")
+        _render_histograms(lines,
+                           "dashboard_callback_response_bytes",
+                           "output",
+                           _payload,
+                           "Size of callback responses sent to the browser.")
+
+        caches = sorted(set(_cache_hits) | set(_cache_misses))
+        lines.append("# HELP dashboard_cache_requests_total "
+                     "Cache lookups by result.")
+        lines.append("# TYPE dashboard_cache_requests_total counter")
+        for cache in caches:
+            for result, counters in (("hit", _cache_hits),
+                                     ("miss", _cache_misses)):
+                lines.append('dashboard_cache_requests_total'
+                             f'{{cache="{_escape(cache)}",result="{result}"}} '
+                             f'{counters.get(cache, 0)}')
+        lines.append("# HELP dashboard_cache_hit_ratio "
+                     "Share of cache lookups that were hits.")
+        lines.append("# TYPE dashboard_cache_hit_ratio gauge")
+        for cache in caches:
+            hits = _cache_hits.get(cache, 0)
+            total = hits + _cache_misses.get(cache, 0)
+            ratio = hits / total if total else 0.0
+            lines.append('dashboard_cache_hit_ratio'
+                         f'{{cache="{_escape(cache)}"}} {ratio}')
+
+    return "\n".join(lines) + "\n"
+
+
+def _record_payload_size(response):
+    if request.path.endswith(DASH_UPDATE_PATH) and not response.is_streamed:
+        body = request.get_json(silent=True) or {}
+        _observe(_payload,
+                 PAYLOAD_BUCKETS,
+                 body.get("output", "unknown"),
+                 response.calculate_content_length() or 0)
+    return response
+
+
+def init_app(app):
+    """Expose ``/metrics`` on the Flask server backing the Dash ``app``"""
+    if not ENABLED:
+        return
+
+    server = app.server
+    server.after_request(_record_payload_size)
+    server.add_url_rule(
+        "/metrics",
+        "metrics",
+        lambda: Response(render_metrics(),
+                         mimetype="text/plain; version=0.0.4"),
+    )
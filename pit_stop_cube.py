@@ -0,0 +1,100 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from formatting import parse_lap_times
+
+
+__all__ = [
+    "PitStopCube",
+    "build_pit_stop_cube",
+]
+
+
+class PitStopCube(NamedTuple):
+    """Pit stop counts and durations per (year, circuitId, constructorId).
+
+    One row per cell with stops; the durations (ms) of cell ``i`` are
+    ``durations[offsets[i]:offsets[i + 1]]``, in ascending order.
+    """
+    years: np.ndarray
+    circuit_ids: np.ndarray
+    constructor_ids: np.ndarray
+    offsets: np.ndarray
+    durations: np.ndarray
+
+    @property
+    def counts(self):
+        return np.diff(self.offsets)
+
+    def cells(self, season_filter=None, constructor_ids=None):
+        """Mask of the cells within the seasons and constructors"""
+        mask = np.ones(len(self.years), dtype=bool)
+        if season_filter:
+            mask &= ((self.years >= season_filter[0])
+                     & (self.years <= season_filter[1]))
+        if constructor_ids:
+            mask &= np.isin(self.constructor_ids, constructor_ids)
+        return mask
+
+    def summarize(self, mask, by):
+        """Stops, median and fastest ms of the masked cells per ``by``.
+
+        ``by`` names cell arrays ("years", "circuit_ids",
+        "constructor_ids"); the result has one row per combination. The
+        medians are exact, the mean of the middle two for an even count.
+        """
+        keys = pd.DataFrame({name: getattr(self, name)[mask] for name in by})
+        groups = keys.groupby(list(by), sort=True).ngroup().to_numpy()
+        rows = np.flatnonzero(mask)
+        lengths = self.counts[rows]
+
+        # Every duration of the masked cells, sorted within its group
+        positions = (np.repeat(self.offsets[rows] - np.cumsum(lengths)
+                               + lengths, lengths)
+                     + np.arange(lengths.sum()))
+        span = int(self.durations.max(initial=0)) + 1
+        group_of = np.repeat(groups, lengths).astype(np.int64)
+        ordered = np.sort(group_of * span + self.durations[positions])
+        ordered -= np.sort(group_of) * span
+
+        counts = np.bincount(groups, weights=lengths,
+                             minlength=groups.max(initial=-1) + 1
+                             ).astype(np.int64)
+        starts = np.cumsum(counts) - counts
+        lower = np.take(ordered, starts + (counts - 1) // 2)
+        upper = np.take(ordered, starts + counts // 2)
+
+        summary = keys.drop_duplicates().sort_values(list(by))
+        summary["stops"] = counts
+        summary["median_ms"] = (lower + upper) / 2
+        summary["fastest_ms"] = np.take(ordered, starts)
+        return summary.reset_index(drop=True)
+
+
+def build_pit_stop_cube(pit_stops: pd.DataFrame,
+                        results: pd.DataFrame,
+                        races: pd.DataFrame) -> PitStopCube:
+    stops = pit_stops[["raceId", "driverId", "duration"]].merge(
+        races[["raceId", "year", "circuitId"]], on="raceId", how="inner")
+    stops = stops.merge(
+        results[["raceId", "driverId", "constructorId"]].drop_duplicates(
+            ["raceId", "driverId"]),
+        on=["raceId", "driverId"],
+        how="inner")
+    durations = parse_lap_times(stops["duration"])
+
+    cell_keys = ["year", "circuitId", "constructorId"]
+    cells = stops.groupby(cell_keys, sort=True).ngroup().to_numpy()
+    order = np.lexsort((durations, cells))
+    counts = np.bincount(cells, minlength=cells.max(initial=-1) + 1)
+
+    first = stops[cell_keys].drop_duplicates().sort_values(cell_keys)
+    return PitStopCube(
+        years=first["year"].to_numpy(dtype=np.int16),
+        circuit_ids=first["circuitId"].to_numpy(dtype=np.int32),
+        constructor_ids=first["constructorId"].to_numpy(dtype=np.int32),
+        offsets=np.append(0, np.cumsum(counts)),
+        durations=durations[order].astype(np.int32),
+    )
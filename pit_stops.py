@@ -0,0 +1,156 @@
+from dash import Input, Output, dcc, html
+import numpy as np
+import plotly.graph_objects as go
+
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from encoding import compact_floats, typed_array
+from figure_dicts import TEMPLATE, figure, validated
+from lazy_sections import gate, initial, loaded, section
+from metrics import instrument
+from pit_stop_cube import build_pit_stop_cube
+from profiling import step
+from source import (
+    circuit_names,
+    constructor_names,
+    pit_stops_df,
+    races_df,
+    results_df,
+)
+from teams import map_team, team_colors
+from utils import Colors
+
+
+# Constructors drawn when none is selected, the ones with the most stops
+DEFAULT_CONSTRUCTORS = 8
+
+with step("pit stop cube"):
+    pit_stop_cube = build_pit_stop_cube(pit_stops_df, results_df, races_df)
+
+constructor_ids_by_name = {name: constructor_id for constructor_id, name
+                           in constructor_names.items()}
+
+PIT_STOPS_BY_CONSTRUCTOR_LAYOUT = validated(go.Layout(
+    title_text="Median Pit Stop by Constructor",
+    xaxis=dict(title_text="Season", dtick=1, showgrid=False),
+    yaxis=dict(title_text="Median Stop (s)"),
+    hovermode="closest",
+    hoverlabel_font_color=Colors.SECONDARY,
+    legend_title_text="Constructor",
+))
+PIT_STOPS_BY_CIRCUIT_LAYOUT = validated(go.Layout(
+    title_text="Median Pit Stop by Circuit",
+    xaxis=dict(title_text="Season", dtick=1, showgrid=False),
+    yaxis=dict(automargin=True, showgrid=False),
+    hoverlabel_font_color=Colors.SECONDARY,
+))
+COLORWAY = TEMPLATE["layout"]["colorway"]
+HOVER = ("%{customdata[0]:.0f} stops<br>"
+         "median %{y:.1f} s, fastest %{customdata[1]:.3f} s")
+
+
+def constructor_color(name, index):
+    return team_colors.get(map_team(name), COLORWAY[index % len(COLORWAY)])
+
+
+def draw_pit_stops_by_constructor(summary):
+    traces = []
+    for index, (constructor_id, rows) in enumerate(
+            summary.groupby("constructor_ids", sort=False)):
+        name = constructor_names.get(constructor_id, str(constructor_id))
+        traces.append({
+            "type": "scatter",
+            "x": typed_array(rows["years"].to_numpy()),
+            "y": typed_array(compact_floats(rows["median_ms"] / 1000, 1)),
+            "customdata": typed_array(np.column_stack([
+                compact_floats(rows["stops"], 0),
+                compact_floats(rows["fastest_ms"] / 1000, 3),
+            ])),
+            "hovertemplate": f"<b>{name}</b><br>{HOVER}<extra></extra>",
+            "mode": "lines+markers",
+            "line": {"color": constructor_color(name, index)},
+            "name": name,
+        })
+    return figure(traces, PIT_STOPS_BY_CONSTRUCTOR_LAYOUT)
+
+
+def draw_pit_stops_by_circuit(summary):
+    if summary.empty:
+        return figure([], PIT_STOPS_BY_CIRCUIT_LAYOUT)
+    years = np.unique(summary["years"])
+    circuit_ids = np.unique(summary["circuit_ids"])
+    cells = (np.searchsorted(circuit_ids, summary["circuit_ids"]),
+             np.searchsorted(years, summary["years"]))
+
+    def grid(values, decimals):
+        values_grid = np.full((len(circuit_ids), len(years)), np.nan)
+        values_grid[cells] = values
+        return compact_floats(values_grid, decimals)
+
+    return figure([{
+        "type": "heatmap",
+        "x": typed_array(years),
+        "y": [circuit_names.get(circuit_id, str(circuit_id))
+              for circuit_id in circuit_ids],
+        "z": typed_array(grid(summary["median_ms"] / 1000, 1)),
+        "customdata": typed_array(np.stack([
+            grid(summary["stops"], 0),
+            grid(summary["fastest_ms"] / 1000, 3),
+        ], axis=-1)),
+        "hovertemplate": ("<b>%{y}</b>, %{x}<br>"
+                          "%{customdata[0]:.0f} stops<br>"
+                          "median %{z:.1f} s, fastest %{customdata[1]:.3f} s"
+                          "<extra></extra>"),
+        "colorscale": [[0, Colors.BG_PANEL], [1, Colors.PRIMARY]],
+        "colorbar": {"title": {"text": "s"}},
+        "hoverongaps": False,
+    }], PIT_STOPS_BY_CIRCUIT_LAYOUT,
+        {"height": max(400, 22 * len(circuit_ids))})
+
+
+def draw_pit_stop_charts(season_filter=None, constructor_filter=None):
+    constructor_ids = [constructor_ids_by_name[name]
+                       for name in constructor_filter or ()
+                       if name in constructor_ids_by_name]
+    cells = pit_stop_cube.cells(season_filter, constructor_ids)
+
+    by_constructor = pit_stop_cube.summarize(
+        cells, ("constructor_ids", "years"))
+    if not constructor_ids:
+        stops = (by_constructor.groupby("constructor_ids")["stops"].sum()
+                 .nlargest(DEFAULT_CONSTRUCTORS))
+        by_constructor = by_constructor[
+            by_constructor["constructor_ids"].isin(stops.index)]
+
+    return (draw_pit_stops_by_constructor(by_constructor),
+            draw_pit_stops_by_circuit(pit_stop_cube.summarize(
+                cells, ("circuit_ids", "years"))))
+
+
+app.callback(
+    Output("pit-stops-by-constructor", "figure"),
+    Output("pit-stops-by-circuit", "figure"),
+    loaded("pit-stops"),
+    Input("year-range-slider", "value"),
+    Input("constructor-filter", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(draw_pit_stop_charts))))
+
+
+with step("initial pit stop figures"):
+    initial_pit_stop_figures = initial(draw_pit_stop_charts, outputs=2)
+
+layout = section(
+    "pit-stops",
+    [
+        html.H1("Pit Stops"),
+        dcc.Graph(
+            figure=initial_pit_stop_figures[0],
+            id="pit-stops-by-constructor",
+        ),
+        dcc.Graph(
+            figure=initial_pit_stop_figures[1],
+            id="pit-stops-by-circuit",
+        ),
+    ],
+    className="pit-stops-container",
+)
@@ -0,0 +1,121 @@
+import cProfile
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from importlib.machinery import PathFinder, SourceFileLoader
+
+
+__all__ = [
+    "ENABLED",
+    "report",
+    "start",
+    "step",
+]
+
+
+# Startup profiling is switched on with DASHBOARD_PROFILE_STARTUP=1 or by
+# passing --profile-startup to main.py. A cProfile dump is written when
+# DASHBOARD_PROFILE_STARTUP_PSTATS or --profile-startup-pstats=<path> is set.
+_FLAG = "--profile-startup"
+_PSTATS_FLAG = "--profile-startup-pstats="
+
+ENABLED = (os.environ.get("DASHBOARD_PROFILE_STARTUP", "").lower()
+           in ("1", "true", "yes", "on")
+           or any(arg == _FLAG or arg.startswith(_PSTATS_FLAG)
+                  for arg in sys.argv))
+
+PSTATS_PATH = next(
+    (arg[len(_PSTATS_FLAG):] for arg in sys.argv
+     if arg.startswith(_PSTATS_FLAG)),
+    os.environ.get("DASHBOARD_PROFILE_STARTUP_PSTATS"),
+)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_records = []
+_stack = []
+_profiler = None
+_started_at = None
+
+
+@contextmanager
+def _timed(kind, name):
+    # Children accumulate their total time into the parent's slot so that
+    # every record can report its exclusive ("self") time as well.
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += total
+        _records.append((kind, name, total, total - children))
+
+
+def step(name):
+    """Time a named precomputation step while startup profiling is on"""
+    if not ENABLED:
+        return nullcontext()
+    return _timed("step", name)
+
+
+class _TimedLoader(SourceFileLoader):
+    def exec_module(self, module):
+        with _timed("import", module.__name__):
+            super().exec_module(module)
+
+
+class _ImportTimer:
+    """Meta path finder timing the execution of this project's modules"""
+
+    @staticmethod
+    def find_spec(fullname, path=None, target=None):
+        if path is not None:
+            return None
+        spec = PathFinder.find_spec(fullname, [PROJECT_DIR])
+        if spec is None or not isinstance(spec.loader, SourceFileLoader):
+            return None
+        spec.loader = _TimedLoader(spec.loader.name, spec.loader.path)
+        return spec
+
+
+def start():
+    """Install the import timer and start cProfile, if profiling is on"""
+    global _profiler, _started_at
+    if not ENABLED or _started_at is not None:
+        return
+    _started_at = time.perf_counter()
+    sys.meta_path.insert(0, _ImportTimer())
+    if PSTATS_PATH:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def report(file=None):
+    """Print the startup timings sorted by duration and dump pstats"""
+    global _started_at
+    if not ENABLED or _started_at is None:
+        return
+    file = file or sys.stderr
+    elapsed = time.perf_counter() - _started_at
+    _started_at = None
+    sys.meta_path[:] = [finder for finder in sys.meta_path
+                        if not isinstance(finder, _ImportTimer)]
+
+    width = max((len(name) for _, name, _, _ in _records), default=4)
+    print(f"\nStartup profile ({elapsed:.3f} s total)", file=file)
+    print(f"{'kind':<8}{'name':<{width}}  {'total s':>9}  {'self s':>9}",
+          file=file)
+    for kind, name, total, own in sorted(_records,
+                                         key=lambda record: record[2],
+                                         reverse=True):
+        print(f"{kind:<8}{name:<{width}}  {total:>9.3f}  {own:>9.3f}",
+              file=file)
+
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(PSTATS_PATH)
+        print(f"cProfile stats written to {PSTATS_PATH}", file=file)
@@ -0,0 +1,148 @@
+from dash import Input, Output, dcc, html
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from encoding import compact_floats, typed_array
+from figure_dicts import figure, validated
+from lazy_sections import gate, initial, loaded, section
+from metrics import instrument
+from profiling import step
+from qualifying_store import build_qualifying_store
+from source import (
+    circuit_names,
+    driver_names,
+    qualifying_df,
+    races_df,
+    results_df,
+)
+from utils import Colors
+
+
+# Drivers shown when none is selected: the most poles, then most starts
+DEFAULT_DRIVERS = 15
+
+with step("qualifying store"):
+    qualifying_store = build_qualifying_store(qualifying_df, results_df)
+
+circuit_ids_by_name = {name: circuit_id for circuit_id, name
+                       in circuit_names.items()}
+
+QUALIFYING_LAYOUT = validated(go.Layout(
+    title_text="Qualifying",
+    xaxis=dict(domain=[0, 0.28], title_text="Poles", anchor="y"),
+    xaxis2=dict(domain=[0.36, 0.64], title_text="Median Gap to Teammate (%)",
+                anchor="y", zeroline=True),
+    xaxis3=dict(domain=[0.72, 1], title_text="Avg. Places Gained in Race",
+                anchor="y", zeroline=True),
+    yaxis=dict(autorange="reversed", automargin=True, showgrid=False),
+    hoverlabel_font_color=Colors.SECONDARY,
+    showlegend=False,
+    bargap=0.3,
+))
+
+
+def selected_race_ids(circuit_filter=None, season_filter=None):
+    """raceIds within the circuit and season filters, None for all"""
+    if not circuit_filter and not season_filter:
+        return None
+    races = races_df
+    if season_filter:
+        races = races[races["year"].between(season_filter[0],
+                                            season_filter[1])]
+    if circuit_filter:
+        races = races[races["circuitId"].isin(
+            [circuit_ids_by_name[name] for name in circuit_filter
+             if name in circuit_ids_by_name])]
+    return races["raceId"].to_numpy()
+
+
+def qualifying_summary(circuit_filter=None, driver_filter=None,
+                       season_filter=None):
+    """Poles, starts, median teammate gap and places gained per driver"""
+    rows = qualifying_store.rows(
+        selected_race_ids(circuit_filter, season_filter), driver_filter)
+    summary = pd.DataFrame({
+        "driverId": qualifying_store.driver_ids[rows],
+        "pole": qualifying_store.positions[rows] == 1,
+        "gap_pct": qualifying_store.teammate_gap_pct[rows],
+        "places_gained": qualifying_store.places_gained[rows],
+    }).groupby("driverId").agg(
+        poles=("pole", "sum"),
+        starts=("pole", "size"),
+        gap_pct=("gap_pct", "median"),
+        places_gained=("places_gained", "mean"),
+    )
+    summary = summary.sort_values(["poles", "starts"], ascending=False)
+    if not driver_filter:
+        summary = summary.head(DEFAULT_DRIVERS)
+    return summary
+
+
+def signed_colors(values):
+    """Primary where a driver did better (negative gap, places gained)"""
+    return np.where(np.nan_to_num(values) < 0, Colors.PRIMARY,
+                    Colors.SECONDARY).tolist()
+
+
+def draw_qualifying_chart(circuit_filter=None, driver_filter=None,
+                          season_filter=None):
+    summary = qualifying_summary(circuit_filter, driver_filter,
+                                 season_filter)
+    names = [driver_names.get(driver_id, str(driver_id))
+             for driver_id in summary.index]
+    starts = typed_array(summary["starts"].to_numpy())
+
+    def bar(values, xaxis, colors, hovertemplate):
+        return {
+            "type": "bar",
+            "orientation": "h",
+            "x": typed_array(values),
+            "y": names,
+            "xaxis": xaxis,
+            "yaxis": "y",
+            "customdata": starts,
+            "marker": {"color": colors},
+            "hovertemplate": ("<b>%{y}</b><br>" + hovertemplate
+                              + "<br>%{customdata} qualifying sessions"
+                              "<extra></extra>"),
+        }
+
+    gaps = compact_floats(summary["gap_pct"], 3)
+    places_gained = compact_floats(summary["places_gained"], 2)
+    return figure([
+        bar(summary["poles"].to_numpy(), "x", Colors.PRIMARY,
+            "%{x} poles"),
+        bar(gaps, "x2", signed_colors(gaps),
+            "%{x:+.3f}% to teammate"),
+        bar(places_gained, "x3", signed_colors(-places_gained),
+            "%{x:+.2f} places from grid to finish"),
+    ], QUALIFYING_LAYOUT,
+        {"height": max(400, 28 * len(names) + 150)})
+
+
+app.callback(
+    Output("qualifying-chart", "figure"),
+    loaded("qualifying"),
+    Input("circuit-filter", "value"),
+    Input("driver-filter", "value"),
+    Input("year-range-slider", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(draw_qualifying_chart))))
+
+
+with step("initial qualifying figure"):
+    initial_qualifying_figure = initial(draw_qualifying_chart)
+
+layout = section(
+    "qualifying",
+    [
+        html.H1("Qualifying"),
+        dcc.Graph(
+            figure=initial_qualifying_figure,
+            id="qualifying-chart",
+        ),
+    ],
+    className="qualifying-container",
+)
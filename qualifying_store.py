@@ -0,0 +1,109 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from formatting import parse_lap_times
+
+
+__all__ = [
+    "QualifyingStore",
+    "build_qualifying_store",
+]
+
+
+class QualifyingStore(NamedTuple):
+    """Qualifying results sorted by raceId, constructorId and driverId.
+
+    The drivers of team ``i`` in a race are the rows
+    ``team_offsets[i]:team_offsets[i + 1]``. Per row: q1/q2/q3 in
+    milliseconds (0 without a time), the gap to the teammate in the last
+    session both set a time in (NaN without one), and the places gained
+    from the starting grid to the finish (NaN without a result or for a
+    pit-lane start, grid 0).
+    """
+    race_ids: np.ndarray
+    driver_ids: np.ndarray
+    constructor_ids: np.ndarray
+    positions: np.ndarray
+    sessions: np.ndarray
+    team_offsets: np.ndarray
+    teammate_gap_ms: np.ndarray
+    teammate_gap_pct: np.ndarray
+    places_gained: np.ndarray
+
+    def rows(self, race_ids=None, driver_ids=None):
+        """Mask of the rows of these races and drivers"""
+        mask = np.ones(len(self.race_ids), dtype=bool)
+        if race_ids is not None:
+            mask &= np.isin(self.race_ids, race_ids)
+        if driver_ids:
+            mask &= np.isin(self.driver_ids, driver_ids)
+        return mask
+
+
+def teammate_gaps(sessions, team_offsets):
+    """Gap of each driver to the teammate, in ms and percent.
+
+    Only teams with exactly two drivers in the race are compared, in the
+    last session where both set a time.
+    """
+    gap_ms = np.full(len(sessions), np.nan)
+    gap_pct = np.full(len(sessions), np.nan)
+    sizes = np.diff(team_offsets)
+    first = team_offsets[:-1][sizes == 2]
+    second = first + 1
+
+    both = (sessions[first] > 0) & (sessions[second] > 0)
+    # Last session with a time for both drivers, -1 if there is none
+    session = np.where(both.any(axis=1),
+                       both.shape[1] - 1 - np.argmax(both[:, ::-1], axis=1),
+                       -1)
+    compared = session >= 0
+    first, second, session = (first[compared], second[compared],
+                              session[compared])
+    first_times = sessions[first, session].astype(float)
+    second_times = sessions[second, session].astype(float)
+
+    gap_ms[first] = first_times - second_times
+    gap_ms[second] = second_times - first_times
+    gap_pct[first] = gap_ms[first] / second_times * 100
+    gap_pct[second] = gap_ms[second] / first_times * 100
+    return gap_ms, gap_pct
+
+
+def build_qualifying_store(qualifying: pd.DataFrame,
+                           results: pd.DataFrame) -> QualifyingStore:
+    qualifying = qualifying.sort_values(
+        ["raceId", "constructorId", "driverId"]).merge(
+        results[["raceId", "driverId", "grid", "positionOrder"]]
+        .drop_duplicates(["raceId", "driverId"]),
+        on=["raceId", "driverId"],
+        how="left")
+
+    race_ids = qualifying["raceId"].to_numpy(dtype=np.int32)
+    constructor_ids = qualifying["constructorId"].to_numpy(dtype=np.int32)
+    team_starts = np.flatnonzero(
+        (np.diff(race_ids, prepend=-1) != 0)
+        | (np.diff(constructor_ids, prepend=-1) != 0))
+    team_offsets = np.append(team_starts, len(race_ids))
+
+    sessions = np.column_stack([parse_lap_times(qualifying[session])
+                                for session in ("q1", "q2", "q3")])
+    gap_ms, gap_pct = teammate_gaps(sessions, team_offsets)
+    positions = qualifying["position"].to_numpy(dtype=float)
+    grid = qualifying["grid"].to_numpy(dtype=float)
+    grid[grid == 0] = np.nan
+
+    return QualifyingStore(
+        race_ids=race_ids,
+        driver_ids=qualifying["driverId"].to_numpy(dtype=np.int32),
+        constructor_ids=constructor_ids,
+        positions=positions.astype(np.int16),
+        sessions=sessions,
+        team_offsets=team_offsets,
+        teammate_gap_ms=gap_ms,
+        teammate_gap_pct=gap_pct,
+        places_gained=grid - qualifying["positionOrder"].to_numpy(
+            dtype=float),
+    )
@@ -0,0 +1,70 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "RaceLaps",
+    "RaceLapStore",
+    "build_race_lap_store",
+]
+
+
+class RaceLaps(NamedTuple):
+    """Laps of one race (or one driver in it), sorted by driver and lap"""
+    driver_ids: np.ndarray
+    laps: np.ndarray
+    milliseconds: np.ndarray
+
+    def driver(self, driver_id):
+        """The laps of one driver, as views of the arrays"""
+        start = np.searchsorted(self.driver_ids, driver_id, side="left")
+        stop = np.searchsorted(self.driver_ids, driver_id, side="right")
+        return RaceLaps(self.driver_ids[start:stop],
+                        self.laps[start:stop],
+                        self.milliseconds[start:stop])
+
+
+class RaceLapStore(NamedTuple):
+    """Every lap time, sorted by raceId, driverId and lap.
+
+    The laps of the race in slot ``i`` of ``race_ids`` are the rows
+    ``offsets[i]:offsets[i + 1]``; ``slots`` maps a raceId to its slot.
+    """
+    race_ids: np.ndarray
+    offsets: np.ndarray
+    slots: dict
+    driver_ids: np.ndarray
+    laps: np.ndarray
+    milliseconds: np.ndarray
+
+    def race(self, race_id):
+        """The laps of ``race_id`` as views of the arrays, or None"""
+        slot = self.slots.get(race_id)
+        if slot is None:
+            return None
+        start, stop = self.offsets[slot], self.offsets[slot + 1]
+        return RaceLaps(self.driver_ids[start:stop],
+                        self.laps[start:stop],
+                        self.milliseconds[start:stop])
+
+
+def build_race_lap_store(lap_times: pd.DataFrame) -> RaceLapStore:
+    race_ids = lap_times["raceId"].to_numpy(dtype=np.int32)
+    driver_ids = lap_times["driverId"].to_numpy(dtype=np.int32)
+    laps = lap_times["lap"].to_numpy(dtype=np.int16)
+    order = np.lexsort((laps, driver_ids, race_ids))
+    race_ids = race_ids[order]
+
+    unique_race_ids, starts = np.unique(race_ids, return_index=True)
+    return RaceLapStore(
+        race_ids=unique_race_ids,
+        offsets=np.append(starts, len(race_ids)),
+        slots={int(race_id): slot
+               for slot, race_id in enumerate(unique_race_ids)},
+        driver_ids=driver_ids[order],
+        laps=laps[order],
+        milliseconds=lap_times["milliseconds"].to_numpy(
+            dtype=np.int32)[order],
+    )
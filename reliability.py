@@ -0,0 +1,170 @@
+from dash import Input, Output, dcc, html
+import plotly.graph_objects as go
+
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from encoding import compact_floats, typed_array
+from figure_dicts import TEMPLATE, figure, validated
+from lazy_sections import gate, initial, loaded, section
+from metrics import instrument
+from profiling import step
+from reliability_cube import CATEGORIES, build_reliability_cube
+from source import (
+    circuit_names,
+    constructor_names,
+    races_df,
+    results_df,
+    status_df,
+)
+from utils import Colors
+
+
+# Bars drawn when nothing is selected, the ones with the most starters
+DEFAULT_CONSTRUCTORS = 12
+DEFAULT_CIRCUITS = 15
+
+with step("reliability cube"):
+    reliability_cube = build_reliability_cube(results_df, races_df,
+                                              status_df)
+
+constructor_ids_by_name = {name: constructor_id for constructor_id, name
+                           in constructor_names.items()}
+circuit_ids_by_name = {name: circuit_id for circuit_id, name
+                       in circuit_names.items()}
+
+COLORWAY = TEMPLATE["layout"]["colorway"]
+# Finished, mechanical, accident and other retirements
+SHOWN_CATEGORIES = CATEGORIES[:4]
+CATEGORY_COLORS = dict(zip(SHOWN_CATEGORIES, (
+    Colors.SECONDARY, Colors.PRIMARY, Colors.BLACK, COLORWAY[2])))
+
+RELIABILITY_BARS_LAYOUT = validated(go.Layout(
+    barmode="stack",
+    xaxis=dict(title_text="Share of Starters (%)", range=[0, 100]),
+    yaxis=dict(autorange="reversed", automargin=True, showgrid=False),
+    hoverlabel_font_color=Colors.SECONDARY,
+    legend=dict(orientation="h", y=-0.15),
+    bargap=0.25,
+))
+RELIABILITY_BY_SEASON_LAYOUT = validated(go.Layout(
+    title_text="Reliability by Season",
+    xaxis=dict(title_text="Season", showgrid=False),
+    yaxis=dict(title_text="Share of Starters (%)", rangemode="tozero"),
+    hovermode="x unified",
+    hoverlabel_font_color=Colors.SECONDARY,
+    legend=dict(orientation="h", y=-0.2),
+))
+
+
+def percentages(summary, category):
+    return compact_floats(summary[f"{category} rate"] * 100, 1)
+
+
+def draw_reliability_bars(summary, labels, title):
+    """Stacked shares of every category, one bar per label"""
+    starters = typed_array(summary["starters"].to_numpy())
+    traces = [{
+        "type": "bar",
+        "orientation": "h",
+        "x": typed_array(percentages(summary, category)),
+        "y": labels,
+        "name": category,
+        "marker": {"color": CATEGORY_COLORS[category]},
+        "customdata": starters,
+        "hovertemplate": (f"<b>%{{y}}</b><br>{category}: %{{x:.1f}}%"
+                          "<br>%{customdata} starters<extra></extra>"),
+    } for category in SHOWN_CATEGORIES]
+    return figure(traces, RELIABILITY_BARS_LAYOUT, {
+        "title": {"text": title},
+        "height": max(400, 28 * len(labels) + 180),
+    })
+
+
+def top_rows(summary, ids, count):
+    """The selected rows, or the ``count`` with the most starters"""
+    if not ids:
+        summary = summary.nlargest(count, "starters")
+    return summary.sort_values("Finished rate", ascending=False)
+
+
+def draw_reliability_by_season(summary):
+    years = typed_array(summary["years"].to_numpy())
+    return figure([{
+        "type": "scatter",
+        "x": years,
+        "y": typed_array(percentages(summary, category)),
+        "mode": "lines",
+        "name": category,
+        "line": {"color": CATEGORY_COLORS[category]},
+        "hovertemplate": "%{y:.1f}%",
+    } for category in SHOWN_CATEGORIES], RELIABILITY_BY_SEASON_LAYOUT)
+
+
+def draw_reliability_charts(season_filter=None, constructor_filter=None,
+                            circuit_filter=None):
+    constructor_ids = [constructor_ids_by_name[name]
+                       for name in constructor_filter or ()
+                       if name in constructor_ids_by_name]
+    circuit_ids = [circuit_ids_by_name[name]
+                   for name in circuit_filter or ()
+                   if name in circuit_ids_by_name]
+    cells = reliability_cube.cells(season_filter, constructor_ids,
+                                   circuit_ids)
+
+    by_constructor = top_rows(
+        reliability_cube.summarize(cells, ("constructor_ids",)),
+        constructor_ids, DEFAULT_CONSTRUCTORS)
+    by_circuit = top_rows(
+        reliability_cube.summarize(cells, ("circuit_ids",)),
+        circuit_ids, DEFAULT_CIRCUITS)
+    by_season = reliability_cube.summarize(cells, ("years",))
+
+    return (
+        draw_reliability_bars(
+            by_constructor,
+            [constructor_names.get(constructor_id, str(constructor_id))
+             for constructor_id in by_constructor["constructor_ids"]],
+            "Reliability by Constructor"),
+        draw_reliability_bars(
+            by_circuit,
+            [circuit_names.get(circuit_id, str(circuit_id))
+             for circuit_id in by_circuit["circuit_ids"]],
+            "Reliability by Circuit"),
+        draw_reliability_by_season(by_season),
+    )
+
+
+app.callback(
+    Output("reliability-by-constructor", "figure"),
+    Output("reliability-by-circuit", "figure"),
+    Output("reliability-by-season", "figure"),
+    loaded("reliability"),
+    Input("year-range-slider", "value"),
+    Input("constructor-filter", "value"),
+    Input("circuit-filter", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(draw_reliability_charts))))
+
+
+with step("initial reliability figures"):
+    initial_reliability_figures = initial(draw_reliability_charts,
+                                          outputs=3)
+
+layout = section(
+    "reliability",
+    [
+        html.H1("Reliability"),
+        dcc.Graph(
+            figure=initial_reliability_figures[2],
+            id="reliability-by-season",
+        ),
+        dcc.Graph(
+            figure=initial_reliability_figures[0],
+            id="reliability-by-constructor",
+        ),
+        dcc.Graph(
+            figure=initial_reliability_figures[1],
+            id="reliability-by-circuit",
+        ),
+    ],
+    className="reliability-container",
+)
@@ -0,0 +1,138 @@
+import re
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "CATEGORIES",
+    "ReliabilityCube",
+    "build_reliability_cube",
+    "classify_statuses",
+]
+
+
+# Category codes, the column order of ReliabilityCube.counts
+FINISHED, MECHANICAL, ACCIDENT, OTHER, DID_NOT_START = range(5)
+CATEGORIES = ("Finished", "Mechanical", "Accident", "Other",
+              "Did not start")
+
+# Statuses that are not a failure of the car; anything else that is not
+# a finish (classified laps down included) counts as mechanical
+ACCIDENT_STATUSES = {
+    "Accident", "Collision", "Collision damage", "Damage", "Debris",
+    "Fatal accident", "Spun off",
+}
+OTHER_STATUSES = {
+    "Disqualified", "Driver unwell", "Excluded", "Eye injury", "Illness",
+    "Injured", "Injury", "Not classified", "Physical", "Retired",
+    "Safety", "Safety concerns", "Underweight",
+}
+DID_NOT_START_STATUSES = {
+    "107% Rule", "Did not prequalify", "Did not qualify", "Withdrew",
+}
+LAPS_DOWN = re.compile(r"^\+\d+ Laps?$")
+
+
+def _category(status):
+    if status == "Finished" or LAPS_DOWN.match(status):
+        return FINISHED
+    if status in ACCIDENT_STATUSES:
+        return ACCIDENT
+    if status in OTHER_STATUSES:
+        return OTHER
+    if status in DID_NOT_START_STATUSES:
+        return DID_NOT_START
+    return MECHANICAL
+
+
+def classify_statuses(status: pd.DataFrame) -> np.ndarray:
+    """Category code of every statusId, indexed by the id.
+
+    Ids missing from ``status`` are classified as OTHER.
+    """
+    status_ids = status["statusId"].to_numpy(dtype=np.intp)
+    categories = np.full(status_ids.max(initial=0) + 1, OTHER, dtype=np.int8)
+    categories[status_ids] = [_category(name) for name in status["status"]]
+    return categories
+
+
+class ReliabilityCube(NamedTuple):
+    """Result counts per (year, circuitId, constructorId) and category.
+
+    One row per cell with results; ``counts[i, category]`` counts the
+    cars of cell ``i`` by the category codes of CATEGORIES.
+    """
+    years: np.ndarray
+    circuit_ids: np.ndarray
+    constructor_ids: np.ndarray
+    counts: np.ndarray
+
+    def cells(self, season_filter=None, constructor_ids=None,
+              circuit_ids=None):
+        """Mask of the cells within the seasons, constructors and circuits"""
+        mask = np.ones(len(self.years), dtype=bool)
+        if season_filter:
+            mask &= ((self.years >= season_filter[0])
+                     & (self.years <= season_filter[1]))
+        if constructor_ids:
+            mask &= np.isin(self.constructor_ids, constructor_ids)
+        if circuit_ids:
+            mask &= np.isin(self.circuit_ids, circuit_ids)
+        return mask
+
+    def summarize(self, mask, by):
+        """Category counts and rates of the masked cells per ``by``.
+
+        ``by`` names cell arrays ("years", "circuit_ids",
+        "constructor_ids"). Rates are shares of the starters, the cars
+        that did not fail to start.
+        """
+        keys = pd.DataFrame({name: getattr(self, name)[mask] for name in by})
+        groups = keys.groupby(list(by), sort=True).ngroup().to_numpy()
+        order = np.argsort(groups, kind="stable")
+        starts = np.flatnonzero(np.diff(groups[order], prepend=-1))
+
+        if len(order):
+            counts = np.add.reduceat(
+                self.counts[mask][order].astype(np.int64), starts)
+        else:
+            counts = np.zeros((0, len(CATEGORIES)), dtype=np.int64)
+        starters = counts.sum(axis=1) - counts[:, DID_NOT_START]
+
+        summary = keys.drop_duplicates().sort_values(list(by))
+        summary = summary.reset_index(drop=True)
+        summary["starters"] = starters
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for category, name in enumerate(CATEGORIES[:DID_NOT_START]):
+                summary[name] = counts[:, category]
+                summary[f"{name} rate"] = counts[:, category] / starters
+        summary[CATEGORIES[DID_NOT_START]] = counts[:, DID_NOT_START]
+        return summary
+
+
+def build_reliability_cube(results: pd.DataFrame,
+                           races: pd.DataFrame,
+                           status: pd.DataFrame) -> ReliabilityCube:
+    rows = results[["raceId", "constructorId", "statusId"]].merge(
+        races[["raceId", "year", "circuitId"]], on="raceId", how="inner")
+    categories = classify_statuses(status)
+    status_ids = rows["statusId"].to_numpy(dtype=np.intp)
+    known = status_ids < len(categories)
+    row_categories = np.full(len(rows), OTHER, dtype=np.intp)
+    row_categories[known] = categories[status_ids[known]]
+
+    cell_keys = ["year", "circuitId", "constructorId"]
+    cells = rows.groupby(cell_keys, sort=True).ngroup().to_numpy()
+    counts = np.zeros((cells.max(initial=-1) + 1, len(CATEGORIES)),
+                      dtype=np.uint16)
+    np.add.at(counts, (cells, row_categories), 1)
+
+    first = rows[cell_keys].drop_duplicates().sort_values(cell_keys)
+    return ReliabilityCube(
+        years=first["year"].to_numpy(dtype=np.int16),
+        circuit_ids=first["circuitId"].to_numpy(dtype=np.int32),
+        constructor_ids=first["constructorId"].to_numpy(dtype=np.int32),
+        counts=counts,
+    )
@@ -0,0 +1,96 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "GRAND_PRIX",
+    "SPRINT",
+    "ResultsStore",
+    "build_results_store",
+]
+
+
+# Session type codes of ResultsStore.sessions
+GRAND_PRIX = 0
+SPRINT = 1
+
+
+class ResultsStore(NamedTuple):
+    """Grand Prix and sprint results, sorted by driverId and raceId.
+
+    The results of the driver in slot ``i`` of ``driver_ids`` are the
+    rows ``offsets[i]:offsets[i + 1]``; ``slots`` maps a driverId to its
+    slot. ``sessions`` holds the session type code of each row.
+    """
+    driver_ids: np.ndarray
+    offsets: np.ndarray
+    slots: dict
+    race_ids: np.ndarray
+    constructor_ids: np.ndarray
+    sessions: np.ndarray
+    position_orders: np.ndarray
+    points: np.ndarray
+    status_ids: np.ndarray
+
+    def driver(self, driver_id):
+        """Row slice of ``driver_id``, empty for an unknown driver"""
+        slot = self.slots.get(driver_id)
+        if slot is None:
+            return slice(0, 0)
+        return slice(self.offsets[slot], self.offsets[slot + 1])
+
+    def included(self, include_sprints=False):
+        """Row mask of the Grand Prix results, and sprints if asked"""
+        if include_sprints:
+            return np.ones(len(self.sessions), dtype=bool)
+        return self.sessions == GRAND_PRIX
+
+    def stats(self, include_sprints=False):
+        """Starts, wins, podiums and sprints of every driver.
+
+        All counts come from one ``reduceat`` over the driver segments.
+        """
+        included = self.included(include_sprints)
+        counts = np.column_stack([
+            included,
+            included & (self.position_orders == 1),
+            included & (self.position_orders <= 3),
+            included & (self.sessions == SPRINT),
+        ]).astype(np.int32)
+        totals = (np.add.reduceat(counts, self.offsets[:-1])
+                  if len(counts) else counts)
+        return pd.DataFrame(totals,
+                            index=pd.Index(self.driver_ids, name="driverId"),
+                            columns=["starts", "wins", "podiums", "sprints"])
+
+
+def build_results_store(results: pd.DataFrame,
+                        sprint_results: pd.DataFrame) -> ResultsStore:
+    columns = ["raceId", "driverId", "constructorId", "positionOrder",
+               "points", "statusId"]
+    rows = pd.concat([results[columns], sprint_results[columns]],
+                     ignore_index=True)
+    sessions = np.repeat(np.array([GRAND_PRIX, SPRINT], dtype=np.int8),
+                         [len(results), len(sprint_results)])
+    race_ids = rows["raceId"].to_numpy(dtype=np.int32)
+    driver_ids = rows["driverId"].to_numpy(dtype=np.int32)
+    order = np.lexsort((sessions, race_ids, driver_ids))
+    driver_ids = driver_ids[order]
+
+    unique_driver_ids, starts = np.unique(driver_ids, return_index=True)
+    return ResultsStore(
+        driver_ids=unique_driver_ids,
+        offsets=np.append(starts, len(driver_ids)),
+        slots={int(driver_id): slot
+               for slot, driver_id in enumerate(unique_driver_ids)},
+        race_ids=race_ids[order],
+        constructor_ids=rows["constructorId"].to_numpy(
+            dtype=np.int32)[order],
+        sessions=sessions[order],
+        position_orders=rows["positionOrder"].to_numpy(
+            dtype=np.int16)[order],
+        points=rows["points"].to_numpy(dtype=np.float32)[order],
+        status_ids=rows["statusId"].to_numpy(dtype=np.int16)[order],
+    )
@@ -1,15 +1,24 @@
 from typing_extensions import Literal
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from source import (
     constructors_df,
+    driver_names,
     driver_standings_df,
     drivers_df,
+    qualifying_df,
     races_df,
     results_df,
+    sprint_results_df,
 )
 from teams import map_team, team_colors, HISTORICAL_TEAM_MAP
-from utils import Colors
+from encoding import compact_floats, compact_ints, typed_array
+from figure_dicts import figure, validated
+from head_to_head import build_head_to_head
+from profiling import step
+from results_store import build_results_store
+from standings_tensor import build_champions
 
 
 races = races_df.copy()[['raceId', 'year', 'name']]
@@ -20,24 +29,31 @@ races = races.rename(columns={'name': 'race_name'})
 constructors = constructors.rename(
     columns={'name': 'constructor_name', 'nationality': 'constructor_country'})
 
-df = (results_df
-      .merge(races, on='raceId')
-      .merge(constructors, on='constructorId'))
-df = df.merge(drivers_df[['driverId',
-                          'forename',
-                          'surname',
-                          'dob',
-                          'nationality']],
-              on='driverId')
-df['age'] = df['year'] - pd.to_datetime(df['dob']).dt.year
-df['driver_name'] = df['forename'] + ' ' + df['surname']
-
-# Championships
-standings_with_year = driver_standings_df.merge(
-    races[['raceId', 'year']], on='raceId')
-final_races = standings_with_year.groupby('year')['raceId'].max().reset_index()
-champions = standings_with_year.merge(final_races, on=['year', 'raceId'])
-champions = champions[champions['position'] == 1]
+with step("merge results with races, constructors and drivers"):
+    df = (results_df
+          .merge(races, on='raceId')
+          .merge(constructors, on='constructorId'))
+    df = df.merge(drivers_df[['driverId',
+                              'forename',
+                              'surname',
+                              'dob',
+                              'nationality']],
+                  on='driverId')
+    df['age'] = df['year'] - pd.to_datetime(df['dob']).dt.year
+    df['driver_name'] = df['forename'] + ' ' + df['surname']
+
+
+# Championships: the standings leader after each season's last round
+with step("champions"):
+    champions = build_champions(driver_standings_df, races_df)
+
+with step("results store"):
+    results_store = build_results_store(results_df, sprint_results_df)
+with step("teammate head-to-head"):
+    head_to_head = build_head_to_head(results_df, qualifying_df, races_df)
+# Starts, wins and podiums without and with the sprint results
+driver_stats = {include_sprints: results_store.stats(include_sprints)
+                for include_sprints in (False, True)}
 
 # --- CAREER EXTREMES (START/END) ---
 career = df.groupby('driverId').agg({
@@ -57,6 +73,55 @@ def get_career_data():
     return career
 
 
+def get_career_lookup():
+    """Driver names and team labels for the career plot customdata ids.
+
+    The career plot only carries numeric customdata
+    (driverId, year, age, team code); the browser resolves the names
+    from this table, which is sent once with the layout.
+    """
+    return {
+        "drivers": {int(driver_id): name
+                    for driver_id, name
+                    in zip(career['driverId'], career['driver_name'])},
+        "teams": [str(team) for team in team_labels],
+    }
+
+
+def get_driver_stats(driver_id, include_sprints=False):
+    """Starts, wins, podiums and sprints of a driver"""
+    stats = driver_stats[bool(include_sprints)]
+    if driver_id not in stats.index:
+        return {column: 0 for column in stats.columns}
+    return stats.loc[driver_id].to_dict()
+
+
+def get_teammate_record(driver_id):
+    """Race and qualifying head-to-head against every teammate.
+
+    One row per teammate in the order they were first paired, with the
+    seasons together and the driver's wins and losses in both.
+    """
+    rows = head_to_head.driver(driver_id)
+    # Rows are sorted by teammate, so each teammate is one segment
+    teammate_ids = rows["teammateId"].to_numpy()
+    starts = np.flatnonzero(np.diff(teammate_ids, prepend=-1))
+    totals = {name: np.add.reduceat(rows[name].to_numpy(), starts)
+              if len(starts) else rows[name].to_numpy()
+              for name in ("races", "race_wins", "qualifyings",
+                           "qualifying_wins")}
+    years = rows["year"].to_numpy()
+    record = pd.DataFrame({
+        "teammateId": teammate_ids[starts],
+        "first_year": years[starts],
+        "last_year": years[np.append(starts, len(years))[1:] - 1],
+        **totals,
+    }).sort_values("first_year", kind="stable").reset_index(drop=True)
+    record["teammate"] = [driver_names.get(teammate_id, str(teammate_id))
+                          for teammate_id in record["teammateId"]]
+    return record
+
+
 def get_driver_data(driver_id):
     """Get specific driver data"""
     driver_data = drivers_df[drivers_df['driverId'] == driver_id]
@@ -67,18 +132,20 @@ def get_driver_data(driver_id):
 
 # END HELPERS
 # Get the first and last team for each driver
-first_team = df.groupby('driverId').apply(
-    lambda x: x[x['year'] == x['year'].min(
-    )]['constructor_name'].mode().iloc[0]
-).reset_index(name='first_team')
+with step("career first_team/last_team"):
+    first_team = df.groupby('driverId').apply(
+        lambda x: x[x['year'] == x['year'].min(
+        )]['constructor_name'].mode().iloc[0]
+    ).reset_index(name='first_team')
+
+    last_team = df.groupby('driverId').apply(
+        lambda x: x[x['year'] == x['year'].max(
+        )]['constructor_name'].mode().iloc[0]
+    ).reset_index(name='last_team')
 
-last_team = df.groupby('driverId').apply(
-    lambda x: x[x['year'] == x['year'].max(
-    )]['constructor_name'].mode().iloc[0]
-).reset_index(name='last_team')
+    career = career.merge(first_team, on='driverId').merge(
+        last_team, on='driverId')
 
-career = career.merge(first_team, on='driverId').merge(
-    last_team, on='driverId')
 
 # Create start and end points for plotting
 start_points = career[['driverId',
@@ -106,32 +173,41 @@ end_points['age'] = end_points['year'] - \
     pd.to_datetime(end_points['dob']).dt.year
 
 # --- DRIVER STATISTICS ---
-wins = df[df['positionOrder'] == 1].groupby('driverId').size()
-podiums = df[df['positionOrder'] <= 3].groupby('driverId').size()
-championships = champions.groupby('driverId').size()
-total_races = df.groupby('driverId').size()
-teams_driven = df.groupby('driverId')['constructor_name'].nunique()
-teams_list = df.groupby('driverId')['constructor_name'].unique().apply(
-    lambda teams: sorted([t for t in teams if isinstance(t, str)])
-).rename('teams_list')
-
-# Merge stats into career dataframe
-career = career.merge(
-    pd.DataFrame({
-        'driverId': career['driverId'],
-        'teams_list': career['driverId'].map(teams_list),
-        **{
-            k: career['driverId'].map(v).fillna(0).astype(int)
-            for k, v in (
-                ('total_races', total_races),
-                ('wins', wins),
-                ('podiums', podiums),
-                ('championships', championships),
-                ('teams_driven', teams_driven),
-            )
-        }
-    }), on='driverId', how='left'
-)
+with step("driver statistics"):
+    wins = driver_stats[False]['wins']
+    podiums = driver_stats[False]['podiums']
+    championships = champions.value_counts()
+    total_races = driver_stats[False]['starts']
+    teams_driven = df.groupby('driverId')['constructor_name'].nunique()
+    teams_list = df.groupby('driverId')['constructor_name'].unique().apply(
+        lambda teams: sorted([t for t in teams if isinstance(t, str)])
+    ).rename('teams_list')
+
+    # Merge stats into career dataframe
+    career = career.merge(
+        pd.DataFrame({
+            'driverId': career['driverId'],
+            'teams_list': career['driverId'].map(teams_list),
+            **{
+                k: career['driverId'].map(v).fillna(0).astype(int)
+                for k, v in (
+                    ('total_races', total_races),
+                    ('wins', wins),
+                    ('podiums', podiums),
+                    ('championships', championships),
+                    ('teams_driven', teams_driven),
+                )
+            }
+        }), on='driverId', how='left'
+    )
+
+
+# Teams are sent as codes into this list, see get_career_lookup
+team_labels = sorted(set(start_points['team']) | set(end_points['team']),
+                     key=str)
+team_codes = {team: code for code, team in enumerate(team_labels)}
+start_points['team_code'] = start_points['team'].map(team_codes)
+end_points['team_code'] = end_points['team'].map(team_codes)
 
 # Combine for unified plotting
 plot_data = pd.concat([start_points, end_points], ignore_index=True)
@@ -227,8 +303,6 @@ def create_career_plot(mode='start',
         end_plot['jittered_x'] = end_plot['year']
         end_plot['jittered_y'] = end_plot['age']
 
-    fig = go.Figure()
-
     marker_config = {
         'start': {'size': 10, 'opacity': 0.8, 'symbol': 'circle'},
         'end': {'size': 10, 'opacity': 0.8, 'symbol': 'x'},
@@ -242,11 +316,37 @@ def create_career_plot(mode='start',
     background_teams = {'Other', 'Unknown', 'Team Lotus Original'}
 
     legend_shown = set()
+    traces = []
 
-    for team in all_teams:
-        color = team_colors.get(team, '#A0A0A0')
+    def team_trace(points, team, symbol, show_in_legend, label):
         is_background = team in background_teams
+        return {
+            'type': 'scatter',
+            'x': typed_array(compact_floats(points['jittered_x'])),
+            'y': typed_array(compact_floats(points['jittered_y'])),
+            'mode': 'markers',
+            'name': f"{team}",
+            'legendgroup': team,
+            'showlegend': show_in_legend,
+            'marker': {
+                'symbol': symbol,
+                'size': config['size'] - (1 if is_background else 0),
+                'color': team_colors.get(team, '#A0A0A0'),
+                'opacity': (config['opacity']
+                            - (0.2 if is_background else 0)),
+            },
+            'customdata': typed_array(compact_ints(points['driverId'],
+                                                   points['year'],
+                                                   points['age'],
+                                                   points['team_code'])),
+            'hovertemplate': ('%{hovertext}<br>Year: '
+                              '%{customdata[1]}<br>Age: '
+                              '%{customdata[2]}<br>Team: '
+                              f'%{{text}}<br><b>{label}</b>'
+                              '<extra></extra>'),
+        }
 
+    for team in all_teams:
         # Plot start points
         if mode in ['start', 'both']:
             team_starts = start_plot[start_plot['team_group'] == team]
@@ -255,31 +355,8 @@ def create_career_plot(mode='start',
                     mode == 'both' and team not in legend_shown)
                 if show_in_legend:
                     legend_shown.add(team)
-
-                fig.add_trace(go.Scatter(
-                    x=team_starts['jittered_x'], y=team_starts['jittered_y'],
-                    mode='markers', name=f"{team}", legendgroup=team,
-                    showlegend=show_in_legend,
-                    marker=dict(
-                        symbol='circle',
-                        size=config['size'] - (1 if is_background else 0),
-                        color=color,
-                        opacity=config['opacity'] -
-                        (0.2 if is_background else 0)
-                    ),
-                    customdata=list(zip(
-                        team_starts['driverId'],
-                        team_starts['driver_name'],
-                        team_starts['team'],
-                        team_starts['year'],
-                        team_starts['age']
-                    )),
-                    hovertemplate=('%{customdata[1]}<br>Year: '
-                                   '%{customdata[3]}<br>Age: '
-                                   '%{customdata[4]}<br>Team: '
-                                   '%{customdata[2]}<br><b>Career Start</b>'
-                                   '<extra></extra>'),
-                ))
+                traces.append(team_trace(team_starts, team, 'circle',
+                                         show_in_legend, 'Career Start'))
 
         # Plot end points
         if mode in ['end', 'both']:
@@ -289,92 +366,23 @@ def create_career_plot(mode='start',
                     mode == 'both' and team not in legend_shown)
                 if show_in_legend:
                     legend_shown.add(team)
-
-                fig.add_trace(go.Scatter(
-                    x=team_ends['jittered_x'], y=team_ends['jittered_y'],
-                    mode='markers', name=f"{team}", legendgroup=team,
-                    showlegend=show_in_legend,
-                    marker=dict(
-                        symbol='x',
-                        size=config['size'] - (1 if is_background else 0),
-                        color=color,
-                        opacity=config['opacity'] -
-                        (0.2 if is_background else 0)
-                    ),
-                    customdata=list(zip(
-                        team_ends['driverId'], team_ends['driver_name'],
-                        team_ends['team'], team_ends['year'], team_ends['age']
-                    )),
-                    hovertemplate=('%{customdata[1]}<br>Year: '
-                                   '%{customdata[3]}<br>Age: '
-                                   '%{customdata[4]}<br>Team: '
-                                   '%{customdata[2]}<br><b>Career End'
-                                   '</b><extra></extra>'),
-                ))
-
-    # Add disclaimer annotation
-    other_teams = ", ".join([team
-                             for team, label
-                             in HISTORICAL_TEAM_MAP.items()
-                             if label == "Other"])
-    disclaimer_text = insert_break_after(
-        f'Note: Background teams ({other_teams}, Unknown, '
-        f'Team Lotus Original) represent less prominent/historical '
-        'teams', 100)
-
-    tile_text = "Entry" if mode == "start" else "Retirement" if mode == "end" else "Entry And Retirement"   
-    fig.update_layout(
-        title=f'{tile_text} Age of Formula Drivers by Year',
-        xaxis_title='Season',
-        yaxis_title='Age',
-        font_family="Poppins",
-        plot_bgcolor="#FFFFFF",
-
-        title_font_color=Colors.BLACK,
-        xaxis_title_font_color=Colors.SECONDARY,
-        yaxis_title_font_color=Colors.SECONDARY,
-        yaxis_tickfont_color=Colors.SECONDARY,
-        xaxis_tickfont_color=Colors.SECONDARY,
-        legend_font_color=Colors.SECONDARY,
-        legend_title_font_color=Colors.BLACK,
-        # hoverlabel_font_color=Colors.SECONDARY,
-
-        height=700,
-        showlegend=True,
-        legend=dict(
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=1.02,
-            bgcolor="rgba(255, 255, 255, 0.8)",
-        ),
-        xaxis=dict(range=[min(start_plot['year'].min(),
-                              end_plot['year'].min()) - 1,
-                          max(start_plot['year'].max(),
-                              end_plot['year'].max()) + 1]),
-        yaxis=dict(range=[min(start_plot['age'].min(),
-                              end_plot['age'].min()) - 2,
-                          max(start_plot['age'].max(),
-                              end_plot['age'].max()) + 2]),
-        annotations=[
-            dict(
-                text=disclaimer_text,
-                xref="paper", yref="paper",
-                x=0.98, y=0.98,  
-                showarrow=False,
-                font=dict(size=9, color="gray"),
-                align="left",
-                bgcolor="rgba(255, 255, 255, 0.9)",
-                bordercolor="gray",
-                borderwidth=1,
-                borderpad=4,
-                xanchor="right",  
-                yanchor="top"     
-            )
-        ]
-    )
-
-    return fig
+                traces.append(team_trace(team_ends, team, 'x',
+                                         show_in_legend, 'Career End'))
+
+    tile_text = ("Entry" if mode == "start"
+                 else "Retirement" if mode == "end"
+                 else "Entry And Retirement")
+    return figure(traces, CAREER_LAYOUT, {
+        'title': {'text': f'{tile_text} Age of Formula Drivers by Year'},
+        'xaxis': {'range': [min(start_plot['year'].min(),
+                                end_plot['year'].min()) - 1,
+                            max(start_plot['year'].max(),
+                                end_plot['year'].max()) + 1]},
+        'yaxis': {'range': [min(start_plot['age'].min(),
+                                end_plot['age'].min()) - 2,
+                            max(start_plot['age'].max(),
+                                end_plot['age'].max()) + 2]},
+    })
 
 
 # https://community.plotly.com/t/ploty-legned-break-line-fixed-width/79868
@@ -390,6 +398,62 @@ def insert_break_after(text, after):
                 + insert_break_after(text[space_index+1:], after))
 
 
+# Add disclaimer annotation
+other_teams = ", ".join([team
+                         for team, label
+                         in HISTORICAL_TEAM_MAP.items()
+                         if label == "Other"])
+disclaimer_text = insert_break_after(
+    f'Note: Background teams ({other_teams}, Unknown, '
+    f'Team Lotus Original) represent less prominent/historical '
+    'teams', 100)
+
+CAREER_LAYOUT = validated(go.Layout(
+    xaxis_title='Season',
+    yaxis_title='Age',
+    height=700,
+    showlegend=True,
+    legend=dict(
+        yanchor="top",
+        y=0.99,
+        xanchor="left",
+        x=1.02,
+        bgcolor="rgba(255, 255, 255, 0.8)",
+    ),
+    annotations=[
+        dict(
+            text=disclaimer_text,
+            xref="paper", yref="paper",
+            x=0.98, y=0.98,
+            showarrow=False,
+            font=dict(size=9, color="gray"),
+            align="left",
+            bgcolor="rgba(255, 255, 255, 0.9)",
+            bordercolor="gray",
+            borderwidth=1,
+            borderpad=4,
+            xanchor="right",
+            yanchor="top"
+        )
+    ]
+))
+
+
+TIMELINE_LAYOUT = validated(go.Layout(
+    xaxis_title='Year',
+    yaxis_title='Best Championship Position',
+    yaxis_autorange='reversed',
+    height=500,
+    legend=dict(
+        yanchor="top",
+        y=0.99,
+        xanchor="left",
+        x=1.02,
+        bgcolor="rgba(255, 255, 255, 0.8)",
+    ),
+))
+
+
 def create_career_timeline(driver_id):
     """Create enhanced career timeline chart with all placements
     and mean line"""
@@ -428,7 +492,7 @@ def create_career_timeline(driver_id):
     yearly_best['points'] = yearly_best['positionOrder'] <= 10
     yearly_best['top15'] = yearly_best['positionOrder'] <= 15
 
-    fig = go.Figure()
+    traces = []
 
     # Plot all seasons with different categories
     categories = [
@@ -446,78 +510,56 @@ def create_career_timeline(driver_id):
 
     for name, data, color, symbol, size in categories:
         if not data.empty:
-            fig.add_trace(go.Scatter(
-                x=data['year'],
-                y=data['positionOrder'],
-                mode='markers',
-                name=name,
-                marker=dict(size=size, color=color, symbol=symbol),
-                customdata=list(zip(data['constructor_name'],
-                                    data['positionOrder'],
-                                    data['race_count'])),
-                hovertemplate=('%{x}: %{customdata[1]}th place<br>Team: '
-                               '%{customdata[0]}<br>Races: %{customdata[2]}'
-                               '<extra></extra>'),
-            ))
+            traces.append({
+                'type': 'scatter',
+                'x': typed_array(data['year']),
+                'y': typed_array(data['positionOrder']),
+                'mode': 'markers',
+                'name': name,
+                'marker': {'size': size, 'color': color, 'symbol': symbol},
+                'text': data['constructor_name'].tolist(),
+                'customdata': typed_array(compact_ints(data['positionOrder'],
+                                                       data['race_count'])),
+                'hovertemplate': ('%{x}: %{customdata[0]}th place<br>Team: '
+                                  '%{text}<br>Races: %{customdata[1]}'
+                                  '<extra></extra>'),
+            })
 
     # Add mean position line
-    fig.add_trace(go.Scatter(
-        x=yearly_stats['year'],
-        y=yearly_stats['mean_position'],
-        mode='lines+markers',
-        name='Season Average',
-        line=dict(color='black', width=3, dash='dash'),
-        marker=dict(size=8, color='black', symbol='x'),
-        customdata=list(
-            zip(yearly_stats['race_count'], yearly_stats['mean_position'])),
-        hovertemplate=('%{x}: Avg %{customdata[1]}th place<br>Races: '
-                       '%{customdata[0]}<extra></extra>'),
-    ))
+    traces.append({
+        'type': 'scatter',
+        'x': typed_array(yearly_stats['year']),
+        'y': typed_array(yearly_stats['mean_position']),
+        'mode': 'lines+markers',
+        'name': 'Season Average',
+        'line': {'color': 'black', 'width': 3, 'dash': 'dash'},
+        'marker': {'size': 8, 'color': 'black', 'symbol': 'x'},
+        'customdata': typed_array(compact_ints(yearly_stats['race_count'])),
+        'hovertemplate': ('%{x}: Avg %{y}th place<br>Races: '
+                          '%{customdata}<extra></extra>'),
+    })
 
     # Add best position line (connecting all points)
-    fig.add_trace(go.Scatter(
-        x=yearly_best['year'],
-        y=yearly_best['positionOrder'],
-        mode='lines',
-        name='Best Position',
-        line=dict(color='darkblue', width=1),
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-
-    fig.update_yaxes(autorange='reversed')
+    traces.append({
+        'type': 'scatter',
+        'x': typed_array(yearly_best['year']),
+        'y': typed_array(yearly_best['positionOrder']),
+        'mode': 'lines',
+        'name': 'Best Position',
+        'line': {'color': 'darkblue', 'width': 1},
+        'showlegend': False,
+        'hoverinfo': 'skip',
+    })
 
     # Calculate y-axis range to include all positions
     min_pos = yearly_best['positionOrder'].min()
     max_pos = yearly_best['positionOrder'].max()
     y_range = [max_pos + 1, max(0.5, min_pos - 1)]
 
-    fig.update_layout(
-        title=(str(yearly_best['driver_name'].iloc[0])
-               + " - Complete Career Timeline"),
-        xaxis_title='Year',
-        yaxis_title='Best Championship Position',
-        height=500,
-        yaxis=dict(range=y_range),
-        xaxis=dict(range=[yearly_best['year'].min() -
-                   1, yearly_best['year'].max() + 1]),
-        legend=dict(
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=1.02,
-            bgcolor="rgba(255, 255, 255, 0.8)",
-        ),
-        font_family="Poppins",
-        plot_bgcolor="#FFFFFF",
-        title_font_color=Colors.BLACK,
-        xaxis_title_font_color=Colors.SECONDARY,
-        yaxis_title_font_color=Colors.SECONDARY,
-        yaxis_tickfont_color=Colors.SECONDARY,
-        xaxis_tickfont_color=Colors.SECONDARY,
-        legend_font_color=Colors.SECONDARY,
-        legend_title_font_color=Colors.BLACK,
-        #hoverlabel_font_color=Colors.SECONDARY,
-    )
-
-    return fig
+    return figure(traces, TIMELINE_LAYOUT, {
+        'title': {'text': (str(yearly_best['driver_name'].iloc[0])
+                           + " - Complete Career Timeline")},
+        'yaxis': {'range': y_range},
+        'xaxis': {'range': [yearly_best['year'].min() - 1,
+                            yearly_best['year'].max() + 1]},
+    })
@@ -0,0 +1,116 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from functools import reduce
+
+import numpy as np
+
+
+__all__ = [
+    "SearchIndex",
+    "normalize",
+]
+
+
+# Options returned per search when no limit is given
+DEFAULT_LIMIT = 30
+# Longest indexed n-gram; shorter queries are looked up directly
+GRAM = 3
+WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Accent-folded, case-folded ``text``, as the dropdowns match it"""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in decomposed
+                   if not unicodedata.combining(char)).casefold()
+
+
+class SearchIndex:
+    """Dropdown options searchable by accent-folded substring.
+
+    Names with a word starting with the query are looked up in a sorted
+    word list and come first. The other substring matches follow: a
+    query of up to three characters is itself one of the indexed
+    character n-grams, longer ones intersect the posting lists of their
+    trigrams and check the few candidates left. Within both groups
+    matches are ranked by ``relevance`` (e.g. career starts).
+    """
+
+    def __init__(self, options, relevance):
+        self.options = list(options)
+        self.names = [normalize(option["label"]) for option in self.options]
+        self.by_value = {option["value"]: option for option in self.options}
+
+        order = sorted(range(len(self.options)),
+                       key=lambda index: (-relevance[index],
+                                          self.names[index]))
+        self.ranks = np.empty(len(order), dtype=np.intp)
+        self.ranks[order] = np.arange(len(order))
+        self.ranked = np.array(order, dtype=np.intp)
+
+        postings = defaultdict(list)
+        words = []
+        for index, name in enumerate(self.names):
+            for gram in {name[start:start + size]
+                         for size in range(1, GRAM + 1)
+                         for start in range(len(name) - size + 1)}:
+                postings[gram].append(index)
+            words += [(word, index) for word in set(WORD.findall(name))]
+        self.grams = {gram: np.array(indices, dtype=np.intp)
+                      for gram, indices in postings.items()}
+        words.sort()
+        self.words = [word for word, _ in words]
+        self.word_indices = np.array([index for _, index in words],
+                                     dtype=np.intp)
+
+    def _in_rank_order(self, indices):
+        """The distinct ``indices``, best ranked first"""
+        seen = np.zeros(len(self.options), dtype=bool)
+        seen[self.ranks[indices]] = True
+        return self.ranked[np.flatnonzero(seen)]
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Indices of the best ``limit`` options matching ``query``"""
+        query = normalize(query or "").strip()
+        if not query:
+            return self.ranked[:limit]
+        # Names with a word starting with the query come first
+        start = bisect_left(self.words, query)
+        stop = bisect_left(self.words, query + "\uffff")
+        found = self._in_rank_order(
+            self.word_indices[start:stop])[:limit].tolist()
+        if len(found) == limit:
+            return np.array(found, dtype=np.intp)
+
+        postings = [self.grams.get(query[offset:offset + GRAM])
+                    for offset in range(max(1, len(query) - GRAM + 1))]
+        if any(indices is None for indices in postings):
+            return np.array(found, dtype=np.intp)
+        starts_word = set(found)
+        for index in self._in_rank_order(
+                reduce(np.intersect1d, sorted(postings, key=len))):
+            # Trigrams can match out of order, the substring decides
+            if index not in starts_word and query in self.names[index]:
+                found.append(index)
+                if len(found) == limit:
+                    break
+        return np.array(found, dtype=np.intp)
+
+    def options_for(self, query, selected=None, limit=DEFAULT_LIMIT):
+        """Options matching ``query``, after those of the selected values.
+
+        The selected options are always included so the dropdown can
+        keep showing them while the user searches for more.
+        """
+        if selected is None:
+            selected = []
+        elif not isinstance(selected, list):
+            selected = [selected]
+        options = [self.by_value[value] for value in selected
+                   if value in self.by_value]
+        kept = {option["value"] for option in options}
+        return options + [self.options[index]
+                          for index in self.search(query, limit)
+                          if self.options[index]["value"] not in kept]
@@ -1,5 +1,8 @@
+import os
+
 import pandas as pd
 
+from profiling import step
 from utils import wrap_text
 
 
@@ -14,45 +17,72 @@ __all__ = [
     "drivers_df",
     "races_df",
     "results_df",
+    "sprint_results_df",
     "lap_times_df",
+    "pit_stops_df",
+    "qualifying_df",
     "rule_changes_df",
+    "status_df",
     "driver_standings_df",
+    "constructor_standings_df",
 ]
 
 
-circuits_df = pd.read_csv("./dataset/circuits.csv")
-circuits_extras_df = pd.read_csv("./dataset/circuits_extra.csv")
-constructors_df = pd.read_csv("./dataset/constructors.csv")
-drivers_df = pd.read_csv("./dataset/drivers.csv")
-races_df = pd.read_csv("./dataset/races.csv")
-results_df = pd.read_csv("./dataset/results.csv", na_values=["\\N"])
-lap_times_df = pd.read_csv("./dataset/lap_times.csv")
-rule_changes_df = pd.read_csv("./dataset/rule_changes.csv")
-driver_standings_df = pd.read_csv("./dataset/driver_standings.csv")
-
-# Set for CIRCUITS
-circuit_names_wrapped = {}
-circuit_names = {}
-for _, row in circuits_df.iterrows():
-    circuit_names_wrapped[int(row["circuitId"])] = wrap_text(row["name"],
-                                                             width=15)
-    circuit_names[int(row["circuitId"])] = row["name"]
-
-# Set for CONSTRUCTORS
-constructor_names = {}
-for _, row in constructors_df.iterrows():
-    constructor_names[int(row["constructorId"])] = row["name"]
-
-# Set for DRIVERS
-driver_names = {}
-for _, row in drivers_df.iterrows():
-    if pd.notna(row["driverId"]):
-        driver_id = int(row["driverId"])
-        if "forename" in row and "surname" in row:
-            # Format as "Surname, N."
-            forename_initial = row['forename'][0] if row['forename'] else ""
-            driver_names[driver_id] = (f"{row['surname']}, {forename_initial}."
-                                       if forename_initial
-                                       else row['surname'])
-        else:
-            driver_names[driver_id] = str(driver_id)
+# Directory with the Ergast-schema CSVs; point it at a generated dataset
+# (see benchmarks/synthetic_data.py) to run the dashboard at scale.
+DATA_DIR = os.environ.get("DASHBOARD_DATA_DIR", "./dataset")
+
+
+def dataset_path(name):
+    return os.path.join(DATA_DIR, name)
+
+
+with step("read dataset CSVs"):
+    circuits_df = pd.read_csv(dataset_path("circuits.csv"))
+    circuits_extras_df = pd.read_csv(dataset_path("circuits_extra.csv"))
+    constructors_df = pd.read_csv(dataset_path("constructors.csv"))
+    drivers_df = pd.read_csv(dataset_path("drivers.csv"))
+    races_df = pd.read_csv(dataset_path("races.csv"))
+    results_df = pd.read_csv(dataset_path("results.csv"), na_values=["\\N"])
+    sprint_results_df = pd.read_csv(dataset_path("sprint_results.csv"),
+                                    na_values=["\\N"])
+    lap_times_df = pd.read_csv(dataset_path("lap_times.csv"))
+    pit_stops_df = pd.read_csv(dataset_path("pit_stops.csv"))
+    qualifying_df = pd.read_csv(dataset_path("qualifying.csv"),
+                                na_values=["\\N"])
+    rule_changes_df = pd.read_csv(dataset_path("rule_changes.csv"))
+    status_df = pd.read_csv(dataset_path("status.csv"))
+    driver_standings_df = pd.read_csv(dataset_path("driver_standings.csv"))
+    constructor_standings_df = pd.read_csv(
+        dataset_path("constructor_standings.csv"))
+
+with step("name lookups"):
+    # Set for CIRCUITS
+    circuit_names_wrapped = {}
+    circuit_names = {}
+    for _, row in circuits_df.iterrows():
+        circuit_names_wrapped[int(row["circuitId"])] = wrap_text(row["name"],
+                                                                 width=15)
+        circuit_names[int(row["circuitId"])] = row["name"]
+
+    # Set for CONSTRUCTORS
+    constructor_names = {}
+    for _, row in constructors_df.iterrows():
+        constructor_names[int(row["constructorId"])] = row["name"]
+
+    # Set for DRIVERS
+    driver_names = {}
+    for _, row in drivers_df.iterrows():
+        if pd.notna(row["driverId"]):
+            driver_id = int(row["driverId"])
+            if "forename" in row and "surname" in row:
+                # Format as "Surname, N."
+                forename_initial = (row['forename'][0]
+                                    if row['forename']
+                                    else "")
+                driver_names[driver_id] = (
+                    f"{row['surname']}, {forename_initial}."
+                    if forename_initial
+                    else row['surname'])
+            else:
+                driver_names[driver_id] = str(driver_id)
@@ -0,0 +1,100 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "StandingsTensor",
+    "build_champions",
+    "build_standings_tensor",
+]
+
+
+class StandingsTensor(NamedTuple):
+    """Driver standings, expanded to a dense tensor one season at a time.
+
+    The standings rows are grouped by season: those of ``years[i]`` are
+    ``offsets[i]:offsets[i + 1]``. ``rounds`` numbers the rounds with
+    standings of each season from 0. Only ``season`` builds the rounds x
+    drivers arrays, so memory stays bounded by the largest season rather
+    than by all seasons padded to the longest one.
+    """
+    years: np.ndarray
+    offsets: np.ndarray
+    rounds: np.ndarray
+    race_ids: np.ndarray
+    driver_ids: np.ndarray
+    points: np.ndarray
+    positions: np.ndarray
+
+    def season_index(self, year):
+        index = np.searchsorted(self.years, year)
+        if index == len(self.years) or self.years[index] != year:
+            return None
+        return index
+
+    def season(self, year):
+        """(driver ids, race ids, rounds x drivers points, positions).
+
+        Points are NaN and positions 0 before a driver's first standing
+        of ``year``; ``race_ids`` holds the race of each round.
+        """
+        index = self.season_index(year)
+        if index is None:
+            return (np.empty(0, dtype=self.driver_ids.dtype),
+                    np.empty(0, dtype=self.race_ids.dtype),
+                    np.empty((0, 0), dtype=self.points.dtype),
+                    np.empty((0, 0), dtype=self.positions.dtype))
+        rows = slice(self.offsets[index], self.offsets[index + 1])
+        rounds = self.rounds[rows]
+        slots, driver_ids = pd.factorize(self.driver_ids[rows])
+        shape = (int(rounds.max()) + 1, len(driver_ids))
+
+        race_ids = np.zeros(shape[0], dtype=self.race_ids.dtype)
+        race_ids[rounds] = self.race_ids[rows]
+        points = np.full(shape, np.nan, dtype=self.points.dtype)
+        points[rounds, slots] = self.points[rows]
+        positions = np.zeros(shape, dtype=self.positions.dtype)
+        positions[rounds, slots] = self.positions[rows]
+        return driver_ids, race_ids, points, positions
+
+
+def _with_rounds(standings, races, columns):
+    return standings[["raceId", *columns]].merge(
+        races[["raceId", "year", "round"]], on="raceId", how="inner")
+
+
+def build_standings_tensor(standings: pd.DataFrame,
+                           races: pd.DataFrame) -> StandingsTensor:
+    standings = _with_rounds(standings, races,
+                             ["driverId", "points", "position"])
+    standings = standings.sort_values("year", kind="stable")
+    years, counts = np.unique(standings["year"], return_counts=True)
+    # Rounds without standings (cancelled) do not leave gaps
+    rounds = standings.groupby("year")["round"].rank(method="dense")
+
+    return StandingsTensor(
+        years=years.astype(np.int16),
+        offsets=np.append(0, np.cumsum(counts)),
+        rounds=rounds.to_numpy(dtype=np.intp) - 1,
+        race_ids=standings["raceId"].to_numpy(dtype=np.int32),
+        driver_ids=standings["driverId"].to_numpy(dtype=np.int32),
+        points=standings["points"].to_numpy(dtype=np.float32),
+        positions=standings["position"].to_numpy(dtype=np.int16),
+    )
+
+
+def build_champions(standings: pd.DataFrame,
+                    races: pd.DataFrame) -> pd.Series:
+    """driverId leading the standings after each season's last round"""
+    standings = _with_rounds(standings, races, ["driverId", "position"])
+    last_round = standings.groupby("year")["round"].transform("max")
+    leaders = (standings[(standings["round"] == last_round)
+                         & (standings["position"] == 1)]
+               .drop_duplicates("year")
+               .sort_values("year"))
+    return pd.Series(leaders["driverId"].to_numpy(),
+                     index=pd.Index(leaders["year"].to_numpy(),
+                                    name="year"),
+                     name="driverId")
@@ -0,0 +1,141 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from head_to_head import teammate_pairs
+
+
+__all__ = [
+    "TeammateGraph",
+    "build_teammate_graph",
+]
+
+
+class TeammateGraph(NamedTuple):
+    """Every driver linked to their teammates, as a CSR adjacency.
+
+    The teammates of the driver in slot ``i`` of ``driver_ids`` are the
+    slots ``indices[indptr[i]:indptr[i + 1]]``, in ascending order;
+    ``slots`` maps a driverId to its slot. ``years`` and
+    ``constructor_ids`` hold the first season and constructor of each
+    link.
+    """
+    driver_ids: np.ndarray
+    slots: dict
+    indptr: np.ndarray
+    indices: np.ndarray
+    years: np.ndarray
+    constructor_ids: np.ndarray
+
+    def _expand(self, frontier):
+        """(teammate, origin) slots of every link out of ``frontier``"""
+        starts = self.indptr[frontier]
+        lengths = self.indptr[frontier + 1] - starts
+        ends = np.cumsum(lengths)
+        links = (np.repeat(starts - ends + lengths, lengths)
+                 + np.arange(ends[-1] if len(ends) else 0))
+        return self.indices[links], np.repeat(frontier, lengths)
+
+    def link(self, driver_id, teammate_id):
+        """(first year, constructorId) the two drivers were teammates"""
+        slot = self.slots[driver_id]
+        start = self.indptr[slot]
+        position = start + np.searchsorted(
+            self.indices[start:self.indptr[slot + 1]],
+            self.slots[teammate_id])
+        return int(self.years[position]), int(self.constructor_ids[position])
+
+    def neighbourhood(self, driver_id, hops):
+        """(driverIds, hops) of the drivers within ``hops`` teammate links.
+
+        The driver itself is left out; the result is ordered by distance.
+        """
+        source = self.slots.get(driver_id)
+        if source is None:
+            return np.empty(0, dtype=self.driver_ids.dtype), np.empty(0, int)
+        distances = np.full(len(self.driver_ids), -1, dtype=np.int16)
+        distances[source] = 0
+        frontier = np.array([source])
+        reached = []
+        for hop in range(1, hops + 1):
+            teammates, _ = self._expand(frontier)
+            frontier = np.unique(teammates[distances[teammates] < 0])
+            if not len(frontier):
+                break
+            distances[frontier] = hop
+            reached.append(frontier)
+        reached = np.concatenate(reached or [np.empty(0, dtype=np.intp)])
+        return self.driver_ids[reached], distances[reached]
+
+    def shortest_path(self, source_id, target_id):
+        """driverIds of a shortest teammate chain between two drivers.
+
+        A bidirectional BFS expands whole levels of the smaller frontier
+        at a time. None when the drivers are not connected.
+        """
+        source = self.slots.get(source_id)
+        target = self.slots.get(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [int(source_id)]
+
+        count = len(self.driver_ids)
+        parents = [np.full(count, -1, dtype=np.int32) for _ in range(2)]
+        distances = [np.full(count, -1, dtype=np.int32) for _ in range(2)]
+        frontiers = [np.array([source]), np.array([target])]
+        for side, slot in enumerate((source, target)):
+            parents[side][slot] = slot
+            distances[side][slot] = 0
+
+        while len(frontiers[0]) and len(frontiers[1]):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            other = 1 - side
+            teammates, origins = self._expand(frontiers[side])
+            new = distances[side][teammates] < 0
+            teammates, first = np.unique(teammates[new], return_index=True)
+            parents[side][teammates] = origins[new][first]
+            distances[side][teammates] = (
+                distances[side][frontiers[side][0]] + 1)
+
+            met = teammates[distances[other][teammates] >= 0]
+            if len(met):
+                # The meeting point closest to the other end
+                middle = met[np.argmin(distances[other][met])]
+                return self._path(parents, middle)
+            frontiers[side] = teammates
+        return None
+
+    def _path(self, parents, middle):
+        chain = [middle]
+        while parents[0][chain[0]] != chain[0]:
+            chain.insert(0, parents[0][chain[0]])
+        while parents[1][chain[-1]] != chain[-1]:
+            chain.append(parents[1][chain[-1]])
+        return [int(driver_id) for driver_id in self.driver_ids[chain]]
+
+
+def build_teammate_graph(results: pd.DataFrame,
+                         races: pd.DataFrame) -> TeammateGraph:
+    pairs = teammate_pairs(results[
+        ["raceId", "constructorId", "driverId", "positionOrder"]].rename(
+        columns={"positionOrder": "position"}))
+    pairs = pairs.merge(races[["raceId", "year", "date"]], on="raceId")
+    # One link per pair of drivers, from their first race together
+    links = (pairs.sort_values(["driverId", "teammateId", "date"])
+             .drop_duplicates(["driverId", "teammateId"]))
+
+    driver_ids = np.unique(results["driverId"].to_numpy(dtype=np.int32))
+    sources = np.searchsorted(driver_ids, links["driverId"].to_numpy())
+    return TeammateGraph(
+        driver_ids=driver_ids,
+        slots={int(driver_id): slot
+               for slot, driver_id in enumerate(driver_ids)},
+        indptr=np.append(0, np.cumsum(
+            np.bincount(sources, minlength=len(driver_ids)))),
+        indices=np.searchsorted(
+            driver_ids, links["teammateId"].to_numpy()).astype(np.int32),
+        years=links["year"].to_numpy(dtype=np.int16),
+        constructor_ids=links["constructorId"].to_numpy(dtype=np.int32),
+    )
@@ -0,0 +1,142 @@
+from dash import Input, Output, dcc, html
+import numpy as np
+import plotly.graph_objects as go
+
+from app import app, HEAVY_CALLBACK_OPTIONS, memoize_heavy
+from figure_dicts import figure, validated
+from lazy_sections import gate, initial, loaded, section
+from metrics import instrument
+from profiling import step
+from source import driver_names, driver_standings_df, races_df
+from standings_tensor import build_standings_tensor
+from utils import Colors
+
+
+# Drivers in the replay: the top of the final standings
+TITLE_FIGHT_DRIVERS = 10
+FRAME_MS = 400
+
+with step("standings tensor"):
+    standings_tensor = build_standings_tensor(driver_standings_df, races_df)
+
+race_names = dict(zip(races_df["raceId"],
+                      races_df["name"].str.replace(" Grand Prix", "")))
+
+TITLE_FIGHT_LAYOUT = validated(go.Layout(
+    xaxis=dict(title_text="Points", showgrid=True),
+    yaxis=dict(autorange="reversed", automargin=True, showgrid=False),
+    hoverlabel_font_color=Colors.SECONDARY,
+    showlegend=False,
+    margin_t=80,
+    updatemenus=[dict(
+        type="buttons",
+        direction="left",
+        x=0, y=1.15, xanchor="left", yanchor="top",
+        showactive=False,
+        buttons=[
+            dict(label="Play", method="animate",
+                 args=[None, dict(frame=dict(duration=FRAME_MS,
+                                             redraw=False),
+                                  transition=dict(duration=FRAME_MS // 2),
+                                  fromcurrent=True)]),
+            dict(label="Pause", method="animate",
+                 args=[[None], dict(frame=dict(duration=0, redraw=False),
+                                    mode="immediate")]),
+        ],
+    )],
+))
+
+
+def _bar(points, positions):
+    points = np.nan_to_num(points)
+    return {
+        "type": "bar",
+        "x": np.round(points, 1).tolist(),
+        "text": [f"{value:g}" for value in points],
+        "marker": {"color": np.where(positions == 1, Colors.PRIMARY,
+                                     Colors.SECONDARY).tolist()},
+    }
+
+
+def _round_label(year, race_id, round_number):
+    return f"{year}, Round {round_number}: {race_names.get(race_id, '')}"
+
+
+def draw_title_fight(year=None):
+    """Standings bar race of a season, one animation frame per round"""
+    year = year or int(standings_tensor.years[-1])
+    driver_ids, race_ids, points, positions = standings_tensor.season(year)
+    if len(driver_ids) == 0:
+        return figure([], TITLE_FIGHT_LAYOUT,
+                      {"title": {"text": f"No standings for {year}"}})
+
+    final = np.where(positions[-1] > 0, positions[-1], np.iinfo(np.int16).max)
+    shown = np.argsort(final, kind="stable")[:TITLE_FIGHT_DRIVERS]
+    names = [driver_names.get(int(driver_id), str(driver_id))
+             for driver_id in driver_ids[shown]]
+
+    frames = [{
+        "name": str(round_index + 1),
+        "data": [_bar(points[round_index, shown],
+                      positions[round_index, shown])],
+        "traces": [0],
+        "layout": {"title": {"text": _round_label(
+            year, race_ids[round_index], round_index + 1)}},
+    } for round_index in range(len(points))]
+
+    trace = dict(_bar(points[0, shown], positions[0, shown]),
+                 orientation="h",
+                 y=names,
+                 textposition="outside",
+                 cliponaxis=False,
+                 hovertemplate="<b>%{y}</b><br>%{x} pts<extra></extra>")
+    fig = figure([trace], TITLE_FIGHT_LAYOUT, {
+        "title": {"text": _round_label(year, race_ids[0], 1)},
+        "xaxis": {"range": [0, float(np.nanmax(points[:, shown])) * 1.1]},
+        "height": max(400, 40 * len(names) + 150),
+        "sliders": [{
+            "active": 0,
+            "currentvalue": {"prefix": "Round "},
+            "pad": {"t": 40},
+            "steps": [{"label": frame["name"],
+                       "method": "animate",
+                       "args": [[frame["name"]],
+                                {"frame": {"duration": 0, "redraw": False},
+                                 "mode": "immediate"}]}
+                      for frame in frames],
+        }],
+    })
+    fig["frames"] = frames
+    return fig
+
+
+app.callback(
+    Output("title-fight-chart", "figure"),
+    loaded("title-fight"),
+    Input("title-fight-season", "value"),
+    **HEAVY_CALLBACK_OPTIONS,
+)(instrument(gate(memoize_heavy(draw_title_fight))))
+
+
+with step("initial title fight figure"):
+    initial_title_fight_figure = initial(draw_title_fight)
+
+layout = section(
+    "title-fight",
+    [
+        html.H1("Title Fight"),
+        dcc.Dropdown(
+            id="title-fight-season",
+            options=[{"label": str(year), "value": int(year)}
+                     for year in standings_tensor.years[::-1]],
+            value=int(standings_tensor.years[-1]),
+            clearable=False,
+            style={"width": "10rem"},
+        ),
+        dcc.Graph(
+            figure=initial_title_fight_figure,
+            id="title-fight-chart",
+        ),
+    ],
+    className="title-fight-container",
+)
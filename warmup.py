@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import Response
+
+from cache import cached_callbacks
+
+
+__all__ = [
+    "ENABLED",
+    "init_app",
+    "is_ready",
+    "load_scenarios",
+    "start",
+]
+
+
+# DASHBOARD_WARMUP=1 precomputes the most common dashboard states at
+# startup. DASHBOARD_WARMUP_SCENARIOS may point at a JSON list of
+# {"callback": ..., "args": [...]} scenarios, or at a JSON-lines file of
+# recorded traffic (DASHBOARD_WARMUP_RECORD in cache.py), in which case
+# the DASHBOARD_WARMUP_TOP most frequent states are warmed.
+ENABLED = os.environ.get("DASHBOARD_WARMUP", "").lower() in ("1",
+                                                             "true",
+                                                             "yes",
+                                                             "on")
+SCENARIOS_PATH = os.environ.get("DASHBOARD_WARMUP_SCENARIOS")
+TOP_RECORDED = int(os.environ.get("DASHBOARD_WARMUP_TOP", "50"))
+# Warm in the importing thread instead of in the background, e.g. for
+# gunicorn --preload where background threads do not survive the fork.
+BLOCKING = os.environ.get("DASHBOARD_WARMUP_BLOCKING", "").lower() in (
+    "1", "true", "yes", "on")
+
+_ready = threading.Event()
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def load_scenarios(path):
+    """Read warming scenarios from a JSON list or recorded JSON lines"""
+    with open(path, encoding="utf-8") as file:
+        if not path.endswith(".jsonl"):
+            return [(scenario["callback"], scenario["args"])
+                    for scenario in json.load(file)]
+        counts = Counter(line.strip() for line in file if line.strip())
+
+    scenarios = []
+    for line, _ in counts.most_common(TOP_RECORDED):
+        recorded = json.loads(line)
+        scenarios.append((recorded["callback"], recorded["args"]))
+    return scenarios
+
+
+def _warm(scenarios):
+    callbacks = cached_callbacks()
+    start = time.perf_counter()
+    warmed = 0
+    for name, args in scenarios:
+        if name not in callbacks:
+            # Not cached in this process (see app.memoize_heavy)
+            continue
+        try:
+            callbacks[name](*args)
+            warmed += 1
+        except Exception as e:
+            print(f"Warming {name}{tuple(args)} failed: {e}",
+                  file=sys.stderr)
+    print(f"Warmed {warmed} dashboard states in "
+          f"{time.perf_counter() - start:.1f} s", file=sys.stderr)
+    _ready.set()
+
+
+def start(default_scenarios):
+    """Warm the figure caches, then report ready on /ready"""
+    if not ENABLED:
+        _ready.set()
+        return
+
+    scenarios = (load_scenarios(SCENARIOS_PATH)
+                 if SCENARIOS_PATH
+                 else list(default_scenarios))
+    if BLOCKING:
+        _warm(scenarios)
+    else:
+        threading.Thread(target=_warm,
+                         args=(scenarios,),
+                         name="dashboard-warmup",
+                         daemon=True).start()
+
+
+def init_app(app):
+    """Expose ``/ready``, returning 503 until warming has finished"""
+    app.server.add_url_rule(
+        "/ready",
+        "ready",
+        lambda: (Response("OK", mimetype="text/plain")
+                 if is_ready()
+                 else Response("warming", status=503,
+                               mimetype="text/plain")),
+    )
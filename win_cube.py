@@ -0,0 +1,80 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    "WinCube",
+    "build_win_cube",
+]
+
+
+class WinCube(NamedTuple):
+    """Race wins per (year, circuitId, constructorId, driverId).
+
+    The cube keeps one row per circuit, constructor and driver
+    combination with any win, in the order of its first win; the
+    ``circuit_ids``, ``constructor_ids`` and ``driver_ids`` arrays index
+    the rows. ``cumulative[i, k]`` counts the wins of row ``i`` in the
+    seasons before ``years[k]``, so the wins within any season range are
+    the difference of two columns.
+    """
+    years: np.ndarray
+    circuit_ids: np.ndarray
+    constructor_ids: np.ndarray
+    driver_ids: np.ndarray
+    cumulative: np.ndarray
+
+    def wins(self, season_filter=None):
+        """Wins of every row within the seasons"""
+        if not season_filter:
+            return self.cumulative[:, -1]
+        first = np.searchsorted(self.years, season_filter[0], side="left")
+        last = np.searchsorted(self.years, season_filter[1], side="right")
+        return self.cumulative[:, last] - self.cumulative[:, first]
+
+    def cells(self, season_filter=None, circuit_ids=None,
+              constructor_ids=None, driver_ids=None):
+        """(rows, wins) of the combinations with wins within the filters.
+
+        A filter of None selects everything on its axis.
+        """
+        wins = self.wins(season_filter)
+        mask = wins > 0
+        for ids, selected in ((self.circuit_ids, circuit_ids),
+                              (self.constructor_ids, constructor_ids),
+                              (self.driver_ids, driver_ids)):
+            if selected is not None:
+                mask &= np.isin(ids, selected)
+        rows = np.flatnonzero(mask)
+        return rows, wins[rows]
+
+
+def build_win_cube(results: pd.DataFrame, races: pd.DataFrame) -> WinCube:
+    winners = results.loc[results["position"] == 1,
+                          ["raceId", "constructorId", "driverId"]].dropna()
+    winners = winners.merge(races[["raceId", "year", "circuitId"]].dropna(),
+                            on="raceId", how="inner").astype(int)
+
+    keys = ["circuitId", "constructorId", "driverId"]
+    groups = winners.groupby(keys, sort=True).ngroup().to_numpy()
+    _, first = np.unique(groups, return_index=True)
+    # Rows in the order of each combination's first win in the results
+    order = np.argsort(first, kind="stable")
+    rows = np.empty_like(order)
+    rows[order] = np.arange(len(order))
+    winner_rows = rows[groups]
+
+    years, year_index = np.unique(winners["year"], return_inverse=True)
+    counts = np.zeros((len(order), len(years) + 1), dtype=np.uint16)
+    np.add.at(counts, (winner_rows, year_index + 1), 1)
+
+    firsts = winners.iloc[first[order]]
+    return WinCube(
+        years=years.astype(np.int16),
+        circuit_ids=firsts["circuitId"].to_numpy(dtype=np.int32),
+        constructor_ids=firsts["constructorId"].to_numpy(dtype=np.int32),
+        driver_ids=firsts["driverId"].to_numpy(dtype=np.int32),
+        cumulative=np.cumsum(counts, axis=1, dtype=np.uint16),
+    )